@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+import shared_cache
+
+
+# Batas jumlah titik outlier per kategori yang dikirim ke browser.
+MAX_OUTLIERS = 200
+CACHE_SIZE = 32
+
+_summaries = shared_cache.SharedCache('aggregates', CACHE_SIZE)
+
+
+def nice_bin_width(lo, hi, nbins):
+    """Lebar bin 'bulat' (1, 2, 2.5, 5 x 10^k) dengan jumlah bin <= nbins"""
+    span = hi - lo
+    if not np.isfinite(span) or span <= 0:
+        return 1.0
+    raw = span / nbins
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for step in (1, 2, 2.5, 5, 10):
+        if step * magnitude >= raw:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def histogram_from_sorted(sorted_values, nbins):
+    """(counts, edges) dari nilai yang sudah terurut, memakai binary search per tepi bin"""
+    if len(sorted_values) == 0:
+        return np.zeros(0, dtype='int64'), np.zeros(1)
+    lo, hi = float(sorted_values[0]), float(sorted_values[-1])
+    width = nice_bin_width(lo, hi, nbins)
+    start = math.floor(lo / width) * width
+    n_bins = max(1, int(math.floor((hi - start) / width)) + 1)
+    edges = start + width * np.arange(n_bins + 1)
+    cuts = np.searchsorted(sorted_values, edges, side='left')
+    cuts[-1] = len(sorted_values)
+    return np.diff(cuts), edges
+
+
+def five_number_summary(sorted_values):
+    """Statistik box plot (kuartil metode linear, pagar Tukey 1.5 IQR)"""
+    n = len(sorted_values)
+    q1, median, q3 = np.quantile(sorted_values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lo_idx = np.searchsorted(sorted_values, q1 - 1.5 * iqr, side='left')
+    hi_idx = np.searchsorted(sorted_values, q3 + 1.5 * iqr, side='right') - 1
+    below = sorted_values[:lo_idx]
+    above = sorted_values[hi_idx + 1:]
+    return {
+        'n': n,
+        'min': float(sorted_values[0]),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'max': float(sorted_values[-1]),
+        'mean': float(sorted_values.mean()),
+        'lowerfence': float(sorted_values[lo_idx]),
+        'upperfence': float(sorted_values[hi_idx]),
+        'outliers': np.concatenate((below[:MAX_OUTLIERS // 2], above[-(MAX_OUTLIERS // 2):]
+                                    if len(above) else above)),
+    }
+
+
+def sort_by_group(values, codes, n_groups):
+    """Satu sort nilai lalu regroup stabil per kode kategori.
+
+    Mengembalikan (sorted_values, grouped, bounds): nilai terurut seluruhnya,
+    nilai terurut per grup, dan batas grup g = grouped[bounds[g]:bounds[g + 1]].
+    Kode < 0 (kategori kosong) hanya ikut di sorted_values.
+    """
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    # Sort stabil kode kategori (radix sort, O(n)) menjaga urutan nilai di tiap grup.
+    sorted_codes = codes[order]
+    group_order = np.argsort(sorted_codes, kind='stable')
+    grouped = sorted_values[group_order]
+    bounds = np.searchsorted(sorted_codes[group_order], np.arange(n_groups + 1))
+    return sorted_values, grouped, bounds
+
+
+def column_summary(data, column, by='Roughness Condition'):
+    """Nilai terurut dan statistik box per kategori dari satu kali sort per kolom.
+
+    Histogram diambil dari 'sorted' lewat histogram_from_sorted (tanpa sort ulang).
+    """
+    values = data[column].to_numpy(dtype='float64')
+    categorical = data[by].astype('category')
+    codes = categorical.cat.codes.to_numpy()
+
+    valid = ~np.isnan(values)
+    values, codes = values[valid], codes[valid]
+    sorted_values, grouped, bounds = sort_by_group(values, codes, len(categorical.cat.categories))
+
+    boxes = {}
+    for i, category in enumerate(categorical.cat.categories):
+        group = grouped[bounds[i]:bounds[i + 1]]
+        if len(group):
+            boxes[category] = five_number_summary(group)
+
+    return {
+        'column': column,
+        'n': len(values),
+        'mean': float(values.mean()) if len(values) else float('nan'),
+        'sorted': sorted_values,
+        'boxes': boxes,
+    }
+
+
+def get_column_summary(key, data, column):
+    """column_summary dengan cache per key (dataset + filter) dan kolom, dipakai histogram dan box plot"""
+    if key is None:
+        return column_summary(data, column)
+    return _summaries.get_or_build(key + (column,), lambda: column_summary(data, column))
@@ -1,12 +1,35 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import folium
-from streamlit_folium import folium_static
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
+import os
+import time
+
+from lazy import lazy_import
+
+# Modul berat baru di-import saat tampilan yang membutuhkannya dirender.
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+folium = lazy_import('folium')
+streamlit_folium = lazy_import('streamlit_folium')
+
+import aggregates
+import data_store
+import downsample
+import export
+import figure_cache
+import filter_index
+import instrument
+import intervals
+import lod
+import map_layer
+import paging
+import regression
+import report
+import shared_cache
+import spatial
+import sql_store
+import summary
+import temporal
 
 
 st.set_page_config(
@@ -22,20 +45,9 @@ def local_css():
         .main {
             background-color: #f5f7f9;
         }
-        .stTabs [data-baseweb="tab-list"] {
+        div[role="radiogroup"] {
             gap: 10px;
         }
-        
-        .stTabs [data-baseweb="tab"] {
-            padding: 8px 16px;
-            margin: 0;
-            height: auto;
-        }
-        
-        .stTabs [aria-selected="true"] {
-            background-color: #4e8df5;
-            color: white;
-        }
         .stButton>button {
             background-color: #4e8df5;
             color: white;
@@ -61,10 +73,16 @@ def local_css():
     </style>
     """, unsafe_allow_html=True)
 
-def load_data(file_path='dummy_data_yogyakarta.csv'):
-    """Load data dari file CSV"""
+DATA_FILE = os.environ.get('ROAD_DATA_FILE', 'dummy_data_yogyakarta.csv')
+
+def load_data(file_path=DATA_FILE):
+    """Load data dari file CSV (di-cache di memori dan sidecar Parquet)"""
     try:
-        data = pd.read_csv(file_path)
+        with instrument.span('load_data'):
+            data = data_store.load_dataset(file_path)
+        if len(data) == 0:
+            st.info("Store survei belum berisi data; jalankan ingest.py untuk menambahkan log survei.")
+            return None
         return data
     except FileNotFoundError:
         st.error(f"File {file_path} tidak ditemukan. Pastikan file CSV tersedia di direktori yang benar.")
@@ -73,7 +91,9 @@ def load_data(file_path='dummy_data_yogyakarta.csv'):
         st.error(f"Terjadi kesalahan saat membaca file: {e}")
         return None
 
-def sidebar():
+SURVEY_LABELS = {data_store.LATEST_SURVEY: "Terbaru per rute", None: "Semua survei"}
+
+def sidebar(route_options=(), survey_options=()):
     """Fungsi untuk membuat sidebar"""
     with st.sidebar:
         st.title("Road Surface Tracking System")
@@ -87,6 +107,19 @@ def sidebar():
         st.subheader("Filter IRI (m/km)")
         min_iri, max_iri = st.slider("Range IRI:", 0.0, 10.0, (0.0, 10.0), 0.1)
         
+        route_filter = []
+        if len(route_options) > 1:
+            st.subheader("Rute")
+            route_filter = st.multiselect("Rute:", route_options, placeholder="Semua rute")
+        
+        survey_filter = None
+        if len(survey_options) > 1:
+            st.subheader("Survei")
+            survey_filter = st.selectbox("Survei:", [data_store.LATEST_SURVEY, None] + list(survey_options),
+                                         format_func=lambda survey: SURVEY_LABELS.get(survey, survey),
+                                         key='survei',
+                                         help="Tampilan Perbandingan selalu memakai semua survei")
+        
         st.markdown("---")
         
         st.markdown("### Tentang Aplikasi")
@@ -103,50 +136,62 @@ def sidebar():
             3. Gunakan tab di halaman utama untuk melihat visualisasi yang berbeda
             """)
     
-    return kondisi_filter, min_iri, max_iri
+    return kondisi_filter, min_iri, max_iri, route_filter, survey_filter
 
-def filter_data(data, kondisi_filter, min_iri, max_iri):
-    """Filter data berdasarkan kondisi dan IRI"""
-    filtered_data = data.copy()
-    
+def filter_positions(data, kondisi_filter, min_iri, max_iri, route_filter=(), survey=None):
+    """Posisi baris yang lolos filter kondisi, IRI, rute dan survei (None = semua baris)"""
+    categories = None
     if 'Semua' not in kondisi_filter and kondisi_filter:
-        filtered_data = filtered_data[filtered_data['Roughness Condition'].isin(kondisi_filter)]
-    
-    filtered_data = filtered_data[(filtered_data['IRI (m/km)'] >= min_iri) & (filtered_data['IRI (m/km)'] <= max_iri)]
-    
-    return filtered_data
-
-def create_map(data):
-    """Membuat peta dengan marker untuk setiap segmen jalan"""
-    m = folium.Map(location=[data['Latitude'].mean(), data['Longitude'].mean()], zoom_start=14)
-    
-    color_dict = {
-        'Sangat Baik': 'green',
-        'Baik': 'blue',
-        'Sedang': 'orange',
-        'Buruk': 'red'
-    }
-    
-    for idx, row in data.iterrows():
-        tooltip_text = f"""
-        <strong>Segmen:</strong> {row['Start Point (m)']} - {row['End Point (m)']} m<br>
-        <strong>IRI:</strong> {row['IRI (m/km)']} m/km<br>
-        <strong>Kondisi:</strong> {row['Roughness Condition']}<br>
-        <strong>Retak:</strong> {row['Total Crack Area (%)']}%<br>
-        <strong>Lubang:</strong> {row['Number of Potholes (per km)']} per km
-        """
-        
-        color = color_dict.get(row['Roughness Condition'], 'gray')
-        
-        folium.Circle(
-            location=[row['Latitude'], row['Longitude']],
-            radius=50,
-            color=color,
-            fill=True,
-            fill_color=color,
-            fill_opacity=0.7,
-            tooltip=folium.Tooltip(tooltip_text)
-        ).add_to(m)
+        categories = kondisi_filter
+    
+    positions = filter_index.get_index(data).query(ranges={'IRI (m/km)': (min_iri, max_iri)},
+                                                   categories=categories)
+    if route_filter:
+        in_route = data['Route'].isin(route_filter).to_numpy()
+        positions = np.flatnonzero(in_route) if positions is None else positions[in_route[positions]]
+    if survey is not None:
+        in_survey = data_store.survey_mask(data, survey)
+        positions = np.flatnonzero(in_survey) if positions is None else positions[in_survey[positions]]
+    return positions
+
+def filter_data(data, kondisi_filter, min_iri, max_iri, route_filter=(), survey=None, columns=None):
+    """Filter data berdasarkan kondisi, IRI, rute dan survei (memakai FilterIndex, hanya kolom columns)"""
+    positions = filter_positions(data, kondisi_filter, min_iri, max_iri, route_filter, survey)
+    return filter_index.take(data, positions, columns)
+
+FILTER_CACHE_SIZE = 16
+
+def load_database_info(db_path=DATA_FILE):
+    """(fingerprint, daftar rute) database SQLite; (None, []) bila gagal dibuka"""
+    try:
+        return sql_store.database_info(db_path)
+    except FileNotFoundError:
+        st.error(f"Database {db_path} tidak ditemukan. Bangun dulu dengan sql_store.py.")
+    except Exception as e:
+        st.error(f"Terjadi kesalahan saat membuka database {db_path}: {e}")
+    return None, []
+
+def query_data(db_path, kondisi_filter, min_iri, max_iri, route_filter=(), columns=None, survey=None):
+    """Filter yang sama dengan filter_data(), dijalankan sebagai query di database SQLite"""
+    kondisi = None if 'Semua' in kondisi_filter or not kondisi_filter else kondisi_filter
+    try:
+        return sql_store.get_filtered(db_path, kondisi, (min_iri, max_iri), route_filter or None, columns,
+                                       survey)
+    except sql_store.QueryTooLarge:
+        st.warning(f"Filter ini mencakup lebih dari {sql_store.MAX_ROWS:,} segmen. "
+                   "Persempit filter rute atau IRI di sidebar.")
+        return None
+    except Exception as e:
+        st.error(f"Terjadi kesalahan saat membaca database {db_path}: {e}")
+        return None
+
+MAP_WIDTH, MAP_HEIGHT = 1200, 500
+
+def create_map(data, with_segments=True):
+    """Membuat peta dengan satu layer GeoJSON untuk semua segmen jalan"""
+    m = map_layer.base_map(data)
+    if with_segments:
+        map_layer.segment_layer(map_layer.segment_features(data)).add_to(m)
     
     legend_html = """
     <div style="position: fixed; bottom: 50px; left: 50px; z-index:9999; background-color:white; 
@@ -162,30 +207,224 @@ def create_map(data):
     
     return m
 
-def dashboard_overview(data):
+def map_view(data, state):
+    """Zoom, center dan bounds peta terakhir dari st_folium (atau default awal)"""
+    state = state or {}
+    center = state.get('center') or {}
+    zoom = state.get('zoom')
+    if center.get('lat') is None or zoom is None:
+        center = {'lat': data['Latitude'].mean(), 'lng': data['Longitude'].mean()}
+        zoom = 14
+    
+    bounds = state.get('bounds') or {}
+    south_west = bounds.get('_southWest') or {}
+    north_east = bounds.get('_northEast') or {}
+    if None in (south_west.get('lat'), south_west.get('lng'), north_east.get('lat'), north_east.get('lng')):
+        bounds = lod.viewport_bounds((center['lat'], center['lng']), zoom, MAP_WIDTH, MAP_HEIGHT)
+    else:
+        bounds = (south_west['lat'], south_west['lng'], north_east['lat'], north_east['lng'])
+    
+    return (center['lat'], center['lng']), zoom, bounds
+
+def lod_map_layer(data, zoom, bounds, cache_key=None):
+    """Layer peta untuk viewport: sel agregat saat zoom jauh, segmen saat zoom dekat"""
+    bounds = lod.snap_bounds(bounds, zoom)
+    
+    def build():
+        kind, result = lod.get_pyramid(cache_key, data).query(zoom, bounds)
+        if len(result) == 0:
+            return {'kind': kind, 'features': None}
+        if kind == 'segments':
+            return {'kind': kind, 'features': map_layer.segment_features(data.iloc[result])}
+        return {'kind': kind, 'features': map_layer.cell_features(result)}
+    
+    layer_key = None if cache_key is None else cache_key + ('peta', zoom, bounds)
+    with instrument.span('map_layer', zoom=zoom) as span:
+        layer = figure_cache.get_json(layer_key, build)
+        span.set_payload(None if layer_key is None else figure_cache.get_cache().size(layer_key))
+    
+    group = folium.FeatureGroup(name='Kondisi Jalan')
+    if layer['features'] is not None:
+        if layer['kind'] == 'segments':
+            map_layer.segment_layer(layer['features']).add_to(group)
+        else:
+            map_layer.cell_layer(layer['features']).add_to(group)
+    return group
+
+CLICK_MAX_DISTANCE_M = 200
+NEIGHBOR_RADIUS_M = 250
+
+def clicked_point(map_state):
+    """(lat, lng) titik/objek terakhir yang diklik di peta, atau None"""
+    map_state = map_state or {}
+    clicked = map_state.get('last_object_clicked') or map_state.get('last_clicked') or {}
+    if clicked.get('lat') is None or clicked.get('lng') is None:
+        return None
+    return clicked['lat'], clicked['lng']
+
+def segment_details(data, point, cache_key=None):
+    """Detail segmen terdekat dari titik yang diklik (lewat SpatialIndex)"""
+    index = spatial.get_index(cache_key, data)
+    positions, distances = index.nearest(*point, k=1, max_distance=CLICK_MAX_DISTANCE_M)
+    if len(positions) == 0:
+        st.info(f"Tidak ada segmen dalam {CLICK_MAX_DISTANCE_M} m dari titik yang diklik.")
+        return
+    
+    segment = data.iloc[positions[0]]
+    nearby, _ = index.radius(segment['Latitude'], segment['Longitude'], NEIGHBOR_RADIUS_M)
+    nearby_iri = data['IRI (m/km)'].to_numpy()[nearby]
+    
+    st.markdown(f"""
+    **Segmen {segment['Start Point (m)']} - {segment['End Point (m)']} m** ({distances[0]:.0f} m dari titik klik)
+    
+    - **Kondisi**: {segment['Roughness Condition']} (IRI {segment['IRI (m/km)']:.2f} m/km)
+    - **Retak**: {segment['Total Crack Area (%)']:.2f}% (lebar rata-rata {segment['Average Crack Width (mm)']:.2f} mm)
+    - **Lubang**: {segment['Number of Potholes (per km)']} per km
+    - **Kedalaman Alur**: {segment['Average Rut Depth (cm)']:.2f} cm
+    - **Dalam radius {NEIGHBOR_RADIUS_M} m**: {len(nearby)} segmen, IRI rata-rata {nearby_iri.mean():.2f} m/km (maks {nearby_iri.max():.2f})
+    """)
+
+KONDISI_COLORS = {'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 'Sedang': '#f39c12', 'Buruk': '#e74c3c'}
+
+def cached_chart(cache_key, builder, data, *args, **kwargs):
+    """Tampilkan figure Plotly; dipakai ulang dari cache bila dataset dan filter sama.
+    
+    args ikut menjadi key cache, kwargs hanya diteruskan ke builder."""
+    key = None if cache_key is None else cache_key + (builder.__name__,) + args
+    with instrument.span('chart', chart=builder.__name__):
+        with instrument.span('figure'):
+            fig = figure_cache.get_figure(key, lambda: builder(data, *args, **kwargs))
+        with instrument.span('plotly_chart') as span:
+            st.plotly_chart(fig, use_container_width=True)
+            span.set_payload(None if key is None else figure_cache.get_cache().size(key))
+
+def kondisi_pie_figure(stats):
+    """Pie distribusi Roughness Condition (dari Summary)"""
+    kondisi_count = pd.DataFrame([(kondisi, jumlah) for kondisi, jumlah in stats.kondisi_counts.items() if jumlah > 0],
+                                 columns=['Kondisi', 'Jumlah'])
+    
+    fig = px.pie(kondisi_count, values='Jumlah', names='Kondisi', 
+                 color='Kondisi', color_discrete_map=KONDISI_COLORS,
+                 hole=0.4)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=350, margin=dict(l=20, r=20, t=30, b=0))
+    return fig
+
+def histogram_figure(data, column, nbins, color, unit='', height=400, margin_bottom=30, summary_key=None):
+    """Histogram satu kolom dengan garis rata-rata; bin dihitung di server"""
+    summary = aggregates.get_column_summary(summary_key, data, column)
+    counts, edges = aggregates.histogram_from_sorted(summary['sorted'], nbins)
+    
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts,
+                           width=np.diff(edges), marker_color=color,
+                           customdata=np.column_stack([edges[:-1], edges[1:]]),
+                           hovertemplate=f"{column}=%{{customdata[0]:.2f}} - %{{customdata[1]:.2f}}"
+                                         "<br>count=%{y}<extra></extra>"))
+    fig.add_vline(x=summary['mean'], line_dash="dash", line_color="red",
+                  annotation_text=f"Rata-rata: {summary['mean']:.2f}{unit}")
+    fig.update_layout(height=height, margin=dict(l=20, r=20, t=30, b=margin_bottom),
+                      bargap=0, xaxis_title=column, yaxis_title='count')
+    return fig
+
+def line_figure(data, column, color, full_resolution=False):
+    """Grafik garis kolom sepanjang Start Point (m), di-downsample kecuali full_resolution"""
+    if not full_resolution:
+        data = downsample.downsample(data, 'Start Point (m)', column)
+    fig = px.line(data, x='Start Point (m)', y=column, 
+                  markers=True, line_shape='linear',
+                  color_discrete_sequence=[color])
+    fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
+    return fig
+
+def box_figure(data, column, summary_key=None):
+    """Box plot kolom per Roughness Condition dari statistik yang dihitung di server"""
+    summary = aggregates.get_column_summary(summary_key, data, column)
+    
+    fig = go.Figure()
+    for kondisi, box in summary['boxes'].items():
+        color = KONDISI_COLORS.get(kondisi)
+        fig.add_trace(go.Box(x=[kondisi], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+                             lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+                             mean=[box['mean']], name=kondisi, marker_color=color,
+                             legendgroup=kondisi))
+        if len(box['outliers']):
+            fig.add_trace(go.Scatter(x=[kondisi] * len(box['outliers']), y=box['outliers'],
+                                     mode='markers', marker_color=color, name=kondisi,
+                                     legendgroup=kondisi, showlegend=False))
+    fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30), boxmode='overlay',
+                      xaxis_title='Roughness Condition', yaxis_title=column,
+                      legend_title_text='Roughness Condition')
+    return fig
+
+def scatter_figure(data, x, y, size, trendline=None, fit_key=None):
+    """Scatter dua kolom per Roughness Condition, dengan garis tren dari modul regression"""
+    fig = px.scatter(data, x=x, y=y, 
+                     color='Roughness Condition', size=size,
+                     color_discrete_map=KONDISI_COLORS)
+    
+    if trendline is not None:
+        fits = regression.get_fits(fit_key, data, x, y, trendline)
+        for kondisi, fit in fits.items():
+            if 'slope' in fit:
+                hover = (f"<b>{regression.METHODS[trendline]} ({kondisi})</b><br>"
+                         f"{y} = {fit['slope']:.4g} * {x} + {fit['intercept']:.4g}<br>"
+                         f"R<sup>2</sup>={fit['r2']:.4f}<br>n={fit['n']}<extra></extra>")
+            else:
+                hover = f"<b>{regression.METHODS[trendline]} ({kondisi})</b><br>n={fit['n']}<extra></extra>"
+            fig.add_trace(go.Scatter(x=fit['x'], y=fit['y'], mode='lines', name=kondisi,
+                                     legendgroup=kondisi, showlegend=False,
+                                     line_color=KONDISI_COLORS.get(kondisi), hovertemplate=hover))
+    
+    fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
+    return fig
+
+def trend_scatter_chart(data, x, y, size, cache_key=None):
+    """Scatter dengan pilihan metode garis tren"""
+    method = st.selectbox("Garis tren:", list(regression.METHODS),
+                          format_func=regression.METHODS.get, key=f"tren_{y}")
+    cached_chart(cache_key, scatter_figure, data, x, y, size, method, fit_key=cache_key)
+
+def chainage_chart(data, column, color, cache_key=None):
+    """Grafik garis sepanjang chainage dengan toggle resolusi penuh"""
+    full_resolution = st.toggle("Resolusi penuh", key=f"resolusi_penuh_{column}")
+    cached_chart(cache_key, line_figure, data, column, color, full_resolution)
+    if not full_resolution and len(data) > downsample.LINE_POINT_BUDGET:
+        st.caption(f"Menampilkan maks. {downsample.LINE_POINT_BUDGET} dari {len(data)} titik "
+                   "(min/max per bucket, puncak tetap utuh)")
+
+def pothole_bar_figure(data):
+    """Jumlah lubang per segmen"""
+    fig = px.bar(data, x='Start Point (m)', y='Number of Potholes (per km)',
+                 color='Roughness Condition',
+                 color_discrete_map=KONDISI_COLORS)
+    fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
+    return fig
+
+def dashboard_overview(data, cache_key=None):
     """Menampilkan dashboard overview"""
     st.markdown("<h2 class='section-title'>Dashboard Monitoring Jalan</h2>", unsafe_allow_html=True)
     
+    stats = summary.get_summary(cache_key, data)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        st.metric("Panjang Jalan Total", f"{(data['End Point (m)'].max() - data['Start Point (m)'].min()) / 1000:.2f} km")
+        st.metric("Panjang Jalan Total", f"{stats.length_m / 1000:.2f} km")
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        st.metric("IRI Rata-rata", f"{data['IRI (m/km)'].mean():.2f} m/km")
+        st.metric("IRI Rata-rata", f"{stats.overall['IRI (m/km)']['mean']:.2f} m/km")
 
     
     with col3:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        st.metric("Retak Rata-rata", f"{data['Total Crack Area (%)'].mean():.2f}%")
+        st.metric("Retak Rata-rata", f"{stats.overall['Total Crack Area (%)']['mean']:.2f}%")
 
     
     with col4:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        st.metric("Lubang Rata-rata", f"{data['Number of Potholes (per km)'].mean():.1f} per km")
+        st.metric("Lubang Rata-rata", f"{stats.overall['Number of Potholes (per km)']['mean']:.1f} per km")
 
     
     col1, col2 = st.columns(2)
@@ -193,36 +432,34 @@ def dashboard_overview(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Distribusi Kondisi Jalan")
-        kondisi_count = data['Roughness Condition'].value_counts().reset_index()
-        kondisi_count.columns = ['Kondisi', 'Jumlah']
-        
-        colors = {'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 'Sedang': '#f39c12', 'Buruk': '#e74c3c'}
-        fig = px.pie(kondisi_count, values='Jumlah', names='Kondisi', 
-                     color='Kondisi', color_discrete_map=colors,
-                     hole=0.4)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=350, margin=dict(l=20, r=20, t=30, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, kondisi_pie_figure, stats)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Distribusi IRI (m/km)")
-        fig = px.histogram(data, x='IRI (m/km)', nbins=20, 
-                          color_discrete_sequence=['#4e8df5'])
-        fig.add_vline(x=data['IRI (m/km)'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Rata-rata: {data['IRI (m/km)'].mean():.2f}")
-        fig.update_layout(height=350, margin=dict(l=20, r=20, t=30, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, histogram_figure, data, 'IRI (m/km)', 20, '#4e8df5', '', 350, 0,
+                     summary_key=cache_key)
 
     
     st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
     st.subheader("Peta Kondisi Jalan")
-    map_obj = create_map(data)
-    folium_static(map_obj, width=1200, height=500)
+    center, zoom, bounds = map_view(data, st.session_state.get('peta_kondisi'))
+    with instrument.span('create_map'):
+        map_obj = create_map(data, with_segments=False)
+    layer = lod_map_layer(data, zoom, bounds, cache_key)
+    with instrument.span('st_folium'):
+        map_state = streamlit_folium.st_folium(map_obj, key='peta_kondisi', width=MAP_WIDTH, height=MAP_HEIGHT,
+                                               center=center, zoom=zoom, feature_group_to_add=layer,
+                                               returned_objects=['zoom', 'bounds', 'center',
+                                                                 'last_clicked', 'last_object_clicked'])
+    point = clicked_point(map_state)
+    if point is not None:
+        with instrument.span('segment_details'):
+            segment_details(data, point, cache_key)
     st.markdown("</div>", unsafe_allow_html=True)
 
-def crack_analysis(data):
+def crack_analysis(data, cache_key=None):
     """Analisis detail retak"""
     st.markdown("<h2 class='section-title'>Analisis Retak Jalan</h2>", unsafe_allow_html=True)
     
@@ -231,22 +468,14 @@ def crack_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Area Retak sepanjang Segmen Jalan")
-        fig = px.line(data, x='Start Point (m)', y='Total Crack Area (%)', 
-                      markers=True, line_shape='linear',
-                      color_discrete_sequence=['#f39c12'])
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        chainage_chart(data, 'Total Crack Area (%)', '#f39c12', cache_key)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Distribusi Lebar Retak")
-        fig = px.histogram(data, x='Average Crack Width (mm)', nbins=15,
-                           color_discrete_sequence=['#f39c12'])
-        fig.add_vline(x=data['Average Crack Width (mm)'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Rata-rata: {data['Average Crack Width (mm)'].mean():.2f} mm")
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, histogram_figure, data, 'Average Crack Width (mm)', 15, '#f39c12', ' mm',
+                     summary_key=cache_key)
 
     
     col1, col2 = st.columns(2)
@@ -254,26 +483,16 @@ def crack_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Hubungan Area Retak dan Lebar Retak")
-        fig = px.scatter(data, x='Total Crack Area (%)', y='Average Crack Width (mm)', 
-                         color='Roughness Condition', size='IRI (m/km)',
-                         color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                           'Sedang': '#f39c12', 'Buruk': '#e74c3c'})
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, scatter_figure, data, 'Total Crack Area (%)', 'Average Crack Width (mm)', 'IRI (m/km)')
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Area Retak berdasarkan Kondisi Jalan")
-        fig = px.box(data, x='Roughness Condition', y='Total Crack Area (%)', 
-                     color='Roughness Condition',
-                     color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                       'Sedang': '#f39c12', 'Buruk': '#e74c3c'})
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, box_figure, data, 'Total Crack Area (%)', summary_key=cache_key)
 
 
-def pothole_analysis(data):
+def pothole_analysis(data, cache_key=None):
     """Analisis detail lubang"""
     st.markdown("<h2 class='section-title'>Analisis Lubang Jalan</h2>", unsafe_allow_html=True)
     
@@ -282,23 +501,14 @@ def pothole_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Jumlah Lubang sepanjang Segmen Jalan")
-        fig = px.bar(data, x='Start Point (m)', y='Number of Potholes (per km)',
-                     color='Roughness Condition',
-                     color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                       'Sedang': '#f39c12', 'Buruk': '#e74c3c'})
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, pothole_bar_figure, data)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Distribusi Jumlah Lubang")
-        fig = px.histogram(data, x='Number of Potholes (per km)', nbins=15,
-                           color_discrete_sequence=['#e74c3c'])
-        fig.add_vline(x=data['Number of Potholes (per km)'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Rata-rata: {data['Number of Potholes (per km)'].mean():.2f} per km")
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, histogram_figure, data, 'Number of Potholes (per km)', 15, '#e74c3c', ' per km',
+                     summary_key=cache_key)
 
     
     col1, col2 = st.columns(2)
@@ -306,27 +516,16 @@ def pothole_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Jumlah Lubang berdasarkan Kondisi Jalan")
-        fig = px.box(data, x='Roughness Condition', y='Number of Potholes (per km)', 
-                     color='Roughness Condition',
-                     color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                       'Sedang': '#f39c12', 'Buruk': '#e74c3c'})
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, box_figure, data, 'Number of Potholes (per km)', summary_key=cache_key)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Hubungan IRI dengan Jumlah Lubang")
-        fig = px.scatter(data, x='IRI (m/km)', y='Number of Potholes (per km)', 
-                         color='Roughness Condition', size='Total Crack Area (%)',
-                         color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                           'Sedang': '#f39c12', 'Buruk': '#e74c3c'},
-                         trendline="ols")
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        trend_scatter_chart(data, 'IRI (m/km)', 'Number of Potholes (per km)', 'Total Crack Area (%)', cache_key)
 
 
-def rut_analysis(data):
+def rut_analysis(data, cache_key=None):
     """Analisis detail alur roda (rutting)"""
     st.markdown("<h2 class='section-title'>Analisis Alur Roda (Rutting)</h2>", unsafe_allow_html=True)
     
@@ -335,22 +534,14 @@ def rut_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Kedalaman Alur sepanjang Segmen Jalan")
-        fig = px.line(data, x='Start Point (m)', y='Average Rut Depth (cm)', 
-                      markers=True, line_shape='linear',
-                      color_discrete_sequence=['#8e44ad'])
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        chainage_chart(data, 'Average Rut Depth (cm)', '#8e44ad', cache_key)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Distribusi Kedalaman Alur")
-        fig = px.histogram(data, x='Average Rut Depth (cm)', nbins=15,
-                           color_discrete_sequence=['#8e44ad'])
-        fig.add_vline(x=data['Average Rut Depth (cm)'].mean(), line_dash="dash", line_color="red",
-                     annotation_text=f"Rata-rata: {data['Average Rut Depth (cm)'].mean():.2f} cm")
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, histogram_figure, data, 'Average Rut Depth (cm)', 15, '#8e44ad', ' cm',
+                     summary_key=cache_key)
 
     
     col1, col2 = st.columns(2)
@@ -358,134 +549,68 @@ def rut_analysis(data):
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Kedalaman Alur berdasarkan Kondisi Jalan")
-        fig = px.box(data, x='Roughness Condition', y='Average Rut Depth (cm)', 
-                     color='Roughness Condition',
-                     color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                       'Sedang': '#f39c12', 'Buruk': '#e74c3c'})
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, box_figure, data, 'Average Rut Depth (cm)', summary_key=cache_key)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
         st.subheader("Hubungan IRI dengan Kedalaman Alur")
-        fig = px.scatter(data, x='IRI (m/km)', y='Average Rut Depth (cm)', 
-                         color='Roughness Condition', size='Speed (km/h)',
-                         color_discrete_map={'Sangat Baik': '#2ecc71', 'Baik': '#3498db', 
-                                           'Sedang': '#f39c12', 'Buruk': '#e74c3c'},
-                         trendline="ols")
-        fig.update_layout(height=400, margin=dict(l=20, r=20, t=30, b=30))
-        st.plotly_chart(fig, use_container_width=True)
+        trend_scatter_chart(data, 'IRI (m/km)', 'Average Rut Depth (cm)', 'Speed (km/h)', cache_key)
 
 
-def report_tab(data):
+def report_tab(data, cache_key=None):
     """Tab untuk laporan"""
     st.markdown("<h2 class='section-title'>Laporan Kondisi Jalan</h2>", unsafe_allow_html=True)
     
     st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
     st.header("Rangkuman Kondisi Jalan")
     
-    kondisi_count = data['Roughness Condition'].value_counts()
-    persentase = (kondisi_count / len(data) * 100).round(2)
+    stats = summary.get_summary(cache_key, data)
+    kondisi_count = stats.kondisi_counts
+    iri = stats.overall['IRI (m/km)']
+    crack = stats.overall['Total Crack Area (%)']
+    potholes = stats.overall['Number of Potholes (per km)']
+    rut = stats.overall['Average Rut Depth (cm)']
     
     st.markdown(f"""
     ### Distribusi Kondisi Jalan
     
-    - **Sangat Baik**: {persentase.get('Sangat Baik', 0)}% ({kondisi_count.get('Sangat Baik', 0)} segmen)
-    - **Baik**: {persentase.get('Baik', 0)}% ({kondisi_count.get('Baik', 0)} segmen)
-    - **Sedang**: {persentase.get('Sedang', 0)}% ({kondisi_count.get('Sedang', 0)} segmen)
-    - **Buruk**: {persentase.get('Buruk', 0)}% ({kondisi_count.get('Buruk', 0)} segmen)
+    - **Sangat Baik**: {stats.kondisi_percent('Sangat Baik')}% ({kondisi_count.get('Sangat Baik', 0)} segmen)
+    - **Baik**: {stats.kondisi_percent('Baik')}% ({kondisi_count.get('Baik', 0)} segmen)
+    - **Sedang**: {stats.kondisi_percent('Sedang')}% ({kondisi_count.get('Sedang', 0)} segmen)
+    - **Buruk**: {stats.kondisi_percent('Buruk')}% ({kondisi_count.get('Buruk', 0)} segmen)
     
     ### Statistik Kerusakan
     
-    - **Rata-rata IRI**: {data['IRI (m/km)'].mean():.2f} m/km (Minimum: {data['IRI (m/km)'].min():.2f}, Maksimum: {data['IRI (m/km)'].max():.2f})
-    - **Rata-rata Area Retak**: {data['Total Crack Area (%)'].mean():.2f}% (Minimum: {data['Total Crack Area (%)'].min():.2f}%, Maksimum: {data['Total Crack Area (%)'].max():.2f}%)
-    - **Rata-rata Jumlah Lubang**: {data['Number of Potholes (per km)'].mean():.2f} per km (Minimum: {data['Number of Potholes (per km)'].min():.2f}, Maksimum: {data['Number of Potholes (per km)'].max():.2f})
-    - **Rata-rata Kedalaman Alur**: {data['Average Rut Depth (cm)'].mean():.2f} cm (Minimum: {data['Average Rut Depth (cm)'].min():.2f} cm, Maksimum: {data['Average Rut Depth (cm)'].max():.2f} cm)
+    - **Rata-rata IRI**: {iri['mean']:.2f} m/km (Minimum: {iri['min']:.2f}, Maksimum: {iri['max']:.2f})
+    - **Rata-rata Area Retak**: {crack['mean']:.2f}% (Minimum: {crack['min']:.2f}%, Maksimum: {crack['max']:.2f}%)
+    - **Rata-rata Jumlah Lubang**: {potholes['mean']:.2f} per km (Minimum: {potholes['min']:.2f}, Maksimum: {potholes['max']:.2f})
+    - **Rata-rata Kedalaman Alur**: {rut['mean']:.2f} cm (Minimum: {rut['min']:.2f} cm, Maksimum: {rut['max']:.2f} cm)
     """)
     st.markdown("</div>", unsafe_allow_html=True)
     
+    gap_m = st.number_input("Toleransi celah paket perbaikan (m):", min_value=0,
+                            value=intervals.DEFAULT_GAP_M, step=50, key='toleransi_celah',
+                            help="Segmen berprioritas sama yang terpisah celah sejauh ini digabung dalam satu paket")
+    packages = intervals.get_packages(cache_key, data, gap_m)
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        fig = go.Figure()
-        
-        categories = ['IRI (m/km)', 'Total Crack Area (%)', 'Avg Crack Width (mm)', 
-                     'Potholes (per km)', 'Rut Depth (cm)']
-        
-        for kondisi in ['Sangat Baik', 'Baik', 'Sedang', 'Buruk']:
-            if kondisi in data['Roughness Condition'].unique():
-                kondisi_data = data[data['Roughness Condition'] == kondisi]
-                
-                values = [
-                    kondisi_data['IRI (m/km)'].mean(),
-                    kondisi_data['Total Crack Area (%)'].mean(),
-                    kondisi_data['Average Crack Width (mm)'].mean(),
-                    kondisi_data['Number of Potholes (per km)'].mean(),
-                    kondisi_data['Average Rut Depth (cm)'].mean()
-                ]
-                
-                fig.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=categories,
-                    fill='toself',
-                    name=kondisi
-                ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, max([
-                        data['IRI (m/km)'].max(),
-                        data['Total Crack Area (%)'].max() / 3,
-                        data['Average Crack Width (mm)'].max(),
-                        data['Number of Potholes (per km)'].max() / 5,
-                        data['Average Rut Depth (cm)'].max()
-                    ])]
-                )),
-            showlegend=True,
-            height=500
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        cached_chart(cache_key, report.radar_figure, stats)
 
     
     with col2:
         st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-        need_repair = data[data['IRI (m/km)'] > 8]
-        repair_percent = len(need_repair) / len(data) * 100
+        need_repair = packages[packages['Prioritas'] == 'tinggi'].drop(columns='Prioritas').reset_index(drop=True)
         
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = repair_percent,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Segmen Memerlukan Perbaikan (%)"},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "#e74c3c"},
-                'steps': [
-                    {'range': [0, 20], 'color': "#2ecc71"},
-                    {'range': [20, 40], 'color': "#f1c40f"},
-                    {'range': [40, 60], 'color': "#f39c12"},
-                    {'range': [60, 100], 'color': "#e74c3c"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 30
-                }
-            }
-        ))
+        cached_chart(cache_key, report.repair_gauge_figure, stats)
         
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        st.subheader("Segmen yang Perlu Diperbaiki")
+        st.subheader("Paket yang Perlu Diperbaiki")
         if len(need_repair) > 0:
-            st.dataframe(need_repair[['Start Point (m)', 'End Point (m)', 'IRI (m/km)', 
-                                     'Roughness Condition', 'Number of Potholes (per km)']])
+            table = paging.get_table(None if cache_key is None else cache_key + ('perbaikan', gap_m), need_repair)
+            paged_table(table, 'tabel_perbaikan')
         else:
             st.info("Tidak ada segmen yang memerlukan perbaikan mendesak.")
 
@@ -493,84 +618,275 @@ def report_tab(data):
     st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
     st.subheader("Rekomendasi Perbaikan")
     
-    high_priority = data[data['IRI (m/km)'] > 8]
-    medium_priority = data[(data['IRI (m/km)'] > 5) & (data['IRI (m/km)'] <= 8)]
-    low_priority = data[(data['IRI (m/km)'] > 3) & (data['IRI (m/km)'] <= 5)]
-    
-    high_panjang = (high_priority['End Point (m)'].max() - high_priority['Start Point (m)'].min()) if len(high_priority) > 0 else 0
-    medium_panjang = (medium_priority['End Point (m)'].max() - medium_priority['Start Point (m)'].min()) if len(medium_priority) > 0 else 0
-    low_panjang = (low_priority['End Point (m)'].max() - low_priority['Start Point (m)'].min()) if len(low_priority) > 0 else 0
-    
-    st.markdown(f"""
-    ### Prioritas Perbaikan
-    
-    1. **Prioritas Tinggi** (IRI > 8 m/km):
-       - Jumlah Segmen: {len(high_priority)}
-       - Panjang Total: {high_panjang/1000:.2f} km
-       - Tindakan: Rekonstruksi jalan atau overlay tebal
-    
-    2. **Prioritas Menengah** (5 < IRI ≤ 8 m/km):
-       - Jumlah Segmen: {len(medium_priority)}
-       - Panjang Total: {medium_panjang/1000:.2f} km
-       - Tindakan: Overlay tipis atau penambalan lubang masif
-    
-    3. **Prioritas Rendah** (3 < IRI ≤ 5 m/km):
-       - Jumlah Segmen: {len(low_priority)}
-       - Panjang Total: {low_panjang/1000:.2f} km
-       - Tindakan: Pemeliharaan rutin, penambalan lubang
-    """)
+    st.markdown(report.priority_markdown(intervals.package_summary(packages)))
     st.markdown("</div>", unsafe_allow_html=True)
 
-def data_table(data):
-    """Tab untuk menampilkan data dalam bentuk tabel"""
+def paged_table(table, key, default_columns=None, height='auto'):
+    """Tabel berhalaman; urut, pilih kolom dan potong halaman dilakukan di server"""
+    columns = list(table.data.columns)
+    col1, col2, col3, col4 = st.columns([4, 3, 2, 2])
+    with col1:
+        shown = st.multiselect("Kolom:", columns, default=default_columns or columns, key=f"{key}_kolom")
+    with col2:
+        sort_by = st.selectbox("Urutkan:", [None] + columns, key=f"{key}_urut",
+                               format_func=lambda column: "(urutan asli)" if column is None else column)
+    with col3:
+        size = st.selectbox("Baris/halaman:", paging.PAGE_SIZES, key=f"{key}_ukuran")
+    with col4:
+        page = st.number_input("Halaman:", min_value=1, max_value=table.page_count(size), step=1,
+                               key=f"{key}_halaman")
+    descending = st.toggle("Urutan menurun", key=f"{key}_turun")
+    
+    with instrument.span('paged_table', rows=table.n) as span:
+        frame = table.page(page - 1, size, sort_by, descending, shown or columns)
+        st.dataframe(frame, height=height)
+        span.set_payload(frame.memory_usage(deep=True).sum())
+    first = (page - 1) * size
+    st.caption(f"Baris {first + 1:,}-{min(first + size, table.n):,} dari {table.n:,}")
+
+
+def export_data(data, fmt, rows=None):
+    """Isi file unduhan (dipanggil saat tombol diklik, dicatat sebagai trace 'export')"""
+    with instrument.trace('export', format=fmt, rows=len(data) if rows is None else len(rows)) as export_trace:
+        content = export.export_bytes(data, fmt, rows=rows)
+        export_trace.annotate(payload_bytes=len(content))
+    return content
+
+
+def data_table(data, cache_key=None, rows=None):
+    """Tab untuk menampilkan data dalam bentuk tabel (rows = posisi baris pada data, None = semua)"""
     st.markdown("<h2 class='section-title'>Data Kerataan Jalan</h2>", unsafe_allow_html=True)
     
     st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
-    csv = data.to_csv(index=False)
+    fmt = st.selectbox(
+        "Format unduhan:",
+        list(export.FORMATS),
+        format_func=lambda key: export.FORMATS[key][0],
+        key="format_unduhan",
+    )
+    label, mime, extension = export.FORMATS[fmt]
+    # Ekspor dibuat saat tombol diklik, bukan di setiap rerun.
     st.download_button(
-        label="Download Data CSV",
-        data=csv,
-        file_name="road_condition_data.csv",
-        mime="text/csv",
+        label=f"Download Data {label}",
+        data=lambda: export_data(data, fmt, rows),
+        file_name=f"road_condition_data{extension}",
+        mime=mime,
     )
     
-    st.dataframe(data, height=500)
+    paged_table(paging.get_table(cache_key, data, rows), 'tabel_data', height=500)
     st.markdown("</div>", unsafe_allow_html=True)
 
+def temporal_tab(data, cache_key=None):
+    """Tab perbandingan dua survei: laju kerusakan per segmen"""
+    st.markdown("<h2 class='section-title'>Perbandingan Survei</h2>", unsafe_allow_html=True)
+    
+    dates = temporal.survey_dates(data)
+    if len(dates) < 2:
+        st.info("Perbandingan membutuhkan minimal dua survei (store survei dengan beberapa tanggal).")
+        return
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        before = st.selectbox("Survei awal:", dates[:-1], key='survei_awal')
+    with col2:
+        later = [date for date in dates if date > before]
+        after = st.selectbox("Survei akhir:", later, index=len(later) - 1, key='survei_akhir')
+    with col3:
+        tolerance = st.number_input("Toleransi chainage (m):", min_value=0, value=temporal.DEFAULT_TOLERANCE_M,
+                                    step=10, key='toleransi_chainage')
+    
+    comparison = temporal.get_comparison(cache_key, data, before, after, tolerance)
+    if len(comparison) == 0:
+        st.warning("Tidak ada segmen yang cocok antara kedua survei (rute atau chainage berbeda).")
+        return
+    pair_key = None if cache_key is None else cache_key + ('banding', before, after, tolerance)
+    
+    columns = st.columns(len(temporal.METRICS))
+    for col, (column, label) in zip(columns, temporal.METRICS.items()):
+        with col:
+            st.metric(f"Laju {label} rata-rata", f"{comparison[f'Laju {label} (/tahun)'].mean():+.2f} /tahun",
+                      help=f"Perubahan {column} per tahun")
+    st.caption(f"{len(comparison):,} segmen survei akhir dipasangkan dengan survei awal")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
+        st.subheader("Laju IRI sepanjang Segmen Jalan")
+        chainage_chart(comparison, 'Laju IRI (/tahun)', '#c0392b', pair_key)
+    
+    with col2:
+        st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
+        st.subheader("Distribusi Laju IRI")
+        cached_chart(pair_key, histogram_figure, comparison, 'Laju IRI (/tahun)', 30, '#c0392b', ' /tahun',
+                     summary_key=pair_key)
+    
+    st.markdown("<div class='sized-box'></div>", unsafe_allow_html=True)
+    st.subheader("Perubahan per Segmen")
+    paged_table(paging.get_table(pair_key, comparison), 'tabel_perbandingan')
+    st.markdown("</div>", unsafe_allow_html=True)
+
+VIEW_NAMES = ["Dashboard", "Analisis Retak", "Analisis Lubang", "Analisis Alur", "Laporan", "Perbandingan",
+              "Data"]
+# Kolom yang dibaca per tampilan, dari database SQLite atau dari data yang dimuat
+# (None = semua kolom SCHEMA).
+VIEW_COLUMNS = {
+    "Dashboard": ['Start Point (m)', 'End Point (m)', 'Latitude', 'Longitude',
+                  'Roughness Condition'] + summary.METRIC_COLUMNS,
+    "Analisis Retak": ['Start Point (m)', 'IRI (m/km)', 'Roughness Condition', 'Total Crack Area (%)',
+                       'Average Crack Width (mm)'],
+    "Analisis Lubang": ['Start Point (m)', 'IRI (m/km)', 'Roughness Condition', 'Total Crack Area (%)',
+                        'Number of Potholes (per km)'],
+    "Analisis Alur": ['Start Point (m)', 'IRI (m/km)', 'Roughness Condition', 'Speed (km/h)',
+                      'Average Rut Depth (cm)'],
+    "Laporan": ['Start Point (m)', 'End Point (m)', 'Roughness Condition'] + summary.METRIC_COLUMNS,
+    "Perbandingan": ['Start Point (m)', 'End Point (m)', 'Roughness Condition'] + list(temporal.METRICS),
+}
+
+STORE_REFRESH_SECONDS = float(os.environ.get('ROAD_STORE_REFRESH', 10))
+
+@st.fragment(run_every=STORE_REFRESH_SECONDS)
+def watch_store(store_dir):
+    """Cek manifest store secara berkala; rerun app bila ada part baru hasil ingest"""
+    if data_store.is_stale(store_dir):
+        st.rerun()
+
+def store_info(store_dir):
+    """Ringkasan store terpartisi di sidebar, dari agregat manifest"""
+    manifest = data_store.store_manifest(store_dir)
+    totals = manifest['totals'] if manifest else None
+    if totals is None:
+        st.sidebar.caption("Store survei masih kosong.")
+        return
+    dates = sorted({part['date'] for part in manifest['parts']})
+    st.sidebar.caption(f"Store: {totals['rows']:,} segmen, {len(manifest['parts'])} part, "
+                       f"{len(manifest['routes'])} rute, survei {dates[0]} s/d {dates[-1]}")
+
+def record_rerun_latency(view, elapsed):
+    """Simpan waktu rerun terakhir per sesi dan tampilkan di sidebar"""
+    history = st.session_state.setdefault('rerun_latency', [])
+    history.append((view, elapsed))
+    del history[:-50]
+    st.sidebar.caption(f"Waktu render '{view}': {elapsed * 1000:.0f} ms")
+    
+    stats = figure_cache.get_cache().stats()
+    st.sidebar.caption(f"Cache figur: {stats['hits']} hit, {stats['misses']} miss, "
+                       f"{stats['bytes'] / 1e6:.1f} MB")
+    st.sidebar.caption(f"Cache bersama: {shared_cache.total_bytes() / 2**20:.1f} / "
+                       f"{shared_cache.MAX_BYTES / 2**20:.0f} MB")
+
+def performance_panel(record):
+    """Panel performa opsional di sidebar: span rerun ini dan statistik semua sesi"""
+    with st.sidebar:
+        if not st.toggle("Panel performa", key='panel_performa'):
+            return
+        if record is None:
+            st.caption("Instrumentasi dimatikan (ROAD_PERF=0).")
+            return
+        rss = f", RSS {record['rss_bytes'] / 2**20:.0f} MB" if record['rss_bytes'] is not None else ""
+        st.caption(f"Rerun ini: {record['ms']:.0f} ms{rss}")
+        spans = pd.DataFrame(record['spans'], columns=['name', 'depth', 'ms', 'rss_delta', 'payload_bytes'])
+        st.dataframe(pd.DataFrame({
+            'Tahap': ['· ' * depth + name for depth, name in zip(spans['depth'], spans['name'])],
+            'ms': spans['ms'].round(1),
+            'ΔRSS MB': (pd.to_numeric(spans['rss_delta']) / 2**20).round(1),
+            'Payload KB': (pd.to_numeric(spans['payload_bytes']) / 1024).round(1),
+        }), hide_index=True)
+        
+        reruns = instrument.history('rerun')
+        stats = pd.DataFrame(instrument.span_stats(reruns)).T
+        if len(stats):
+            st.caption(f"{len(reruns)} rerun terakhir (semua sesi)")
+            st.dataframe(stats[['count', 'p50_ms', 'p95_ms', 'max_ms']].round(1))
+        st.download_button("Unduh log (JSONL)", data=lambda: instrument.export_jsonl(),
+                           file_name="road_dashboard_perf.jsonl", mime="application/x-ndjson")
+
 def main():
     """Fungsi utama aplikasi"""
+    with instrument.trace('rerun') as rerun:
+        dashboard(rerun)
+    performance_panel(rerun.record)
+
+def scope_survey(survey_filter, view):
+    """Pilihan survei untuk tampilan: Perbandingan selalu memakai semua survei"""
+    return None if view == "Perbandingan" else survey_filter
+
+def dashboard(rerun):
+    """Isi halaman untuk satu rerun"""
+    start_time = time.perf_counter()
     local_css()
     
     st.title("🛣️ Road Surface Tracking System")
     st.markdown("Aplikasi untuk monitoring dan analisis kerataan permukaan jalan")
     
-    kondisi_filter, min_iri, max_iri = sidebar()
-    
-    data = load_data()
-    
-    if data is not None:
-        filtered_data = filter_data(data, kondisi_filter, min_iri, max_iri)
-        
-        tabs = st.tabs(["Dashboard", "Analisis Retak", "Analisis Lubang", "Analisis Alur", "Laporan", "Data"])
-        
-        with tabs[0]:
-            dashboard_overview(filtered_data)
-        
-        with tabs[1]:
-            crack_analysis(filtered_data)
-        
-        with tabs[2]:
-            pothole_analysis(filtered_data)
+    # Hanya tampilan yang dipilih yang dihitung; tampilan lain dibangun saat dipilih.
+    view = st.radio("Tampilan:", VIEW_NAMES, horizontal=True, key='tampilan',
+                    label_visibility='collapsed')
+    
+    view_args = {}
+    if sql_store.is_database(DATA_FILE):
+        # Backend SQLite: data tidak dimuat utuh, filter sidebar menjadi query.
+        fingerprint, route_options = load_database_info(DATA_FILE)
+        survey_options = sql_store.survey_dates(DATA_FILE) if fingerprint is not None else []
+        kondisi_filter, min_iri, max_iri, route_filter, survey_filter = sidebar(route_options, survey_options)
+        survey_filter = scope_survey(survey_filter, view)
+        filtered_data = None
+        if fingerprint is not None:
+            with instrument.span('query_data'):
+                filtered_data = query_data(DATA_FILE, kondisi_filter, min_iri, max_iri, route_filter,
+                                           VIEW_COLUMNS.get(view), survey_filter)
+    else:
+        data = load_data()
+        route_options = list(data['Route'].cat.categories) if data is not None and 'Route' in data else []
+        fingerprint = data_store.dataset_fingerprint(DATA_FILE)
+        survey_options = []
+        if data is not None:
+            survey_options = shared_cache.get_cache('filter', FILTER_CACHE_SIZE).get_or_build(
+                (fingerprint, 'survei'), lambda: temporal.survey_dates(data))
+        kondisi_filter, min_iri, max_iri, route_filter, survey_filter = sidebar(route_options, survey_options)
+        survey_filter = scope_survey(survey_filter, view)
+        if os.path.isdir(DATA_FILE):
+            store_info(DATA_FILE)
+            with st.sidebar:
+                watch_store(DATA_FILE)
+        filtered_data = None
+        if data is not None:
+            # Posisi hasil filter dan kolom per tampilan dipakai bersama semua sesi.
+            filter_cache = shared_cache.get_cache('filter', FILTER_CACHE_SIZE)
+            filter_key = (fingerprint, tuple(kondisi_filter), min_iri, max_iri, tuple(route_filter), survey_filter)
+            with instrument.span('filter_data'):
+                positions = filter_cache.get_or_build(
+                    filter_key,
+                    lambda: filter_positions(data, kondisi_filter, min_iri, max_iri, route_filter, survey_filter))
+                if view == "Data":
+                    # Tabel dan ekspor membaca baris lewat posisi, tanpa salinan frame.
+                    filtered_data, view_args = data, {'rows': positions}
+                else:
+                    columns = VIEW_COLUMNS.get(view)
+                    filtered_data = filter_cache.get_or_build(
+                        filter_key + (None if columns is None else tuple(columns),),
+                        lambda: filter_index.take(data, positions, columns))
+    
+    if filtered_data is not None:
+        cache_key = (fingerprint, tuple(kondisi_filter), min_iri, max_iri, tuple(route_filter), survey_filter)
         
-        with tabs[3]:
-            rut_analysis(filtered_data)
+        views = {
+            "Dashboard": dashboard_overview,
+            "Analisis Retak": crack_analysis,
+            "Analisis Lubang": pothole_analysis,
+            "Analisis Alur": rut_analysis,
+            "Laporan": report_tab,
+            "Perbandingan": temporal_tab,
+            "Data": data_table,
+        }
         
-        with tabs[4]:
-            report_tab(filtered_data)
+        rows = view_args.get('rows')
+        rerun.annotate(view=view, rows=len(filtered_data) if rows is None else len(rows))
+        with instrument.span(f"view:{view}"):
+            views[view](filtered_data, cache_key, **view_args)
         
-        with tabs[5]:
-            data_table(filtered_data)
-    else:
+        record_rerun_latency(view, time.perf_counter() - start_time)
+    elif not sql_store.is_database(DATA_FILE):
+        # Kesalahan database sudah ditampilkan oleh load_database_info/query_data.
         st.error("Tidak dapat memuat data. Silakan periksa ketersediaan file CSV.")
         st.info("Untuk menjalankan aplikasi ini, pastikan file CSV tersedia di direktori yang benar.")
 
@@ -0,0 +1,252 @@
+"""Laporan kondisi jalan per rute sebagai HTML statis, dibuat batch di process pool.
+
+Contoh:
+    python batch_report.py survey_store --out laporan/
+    python batch_report.py road_network.sqlite --out laporan/2024-05 --month 2024-05 --workers 8
+
+Satu laporan per rute dari survei terakhirnya (dalam --month bila diberikan):
+ringkasan kondisi, statistik kerusakan, radar dan gauge (figure Plotly sebagai
+JSON tertanam, sama dengan tab Laporan) dan paket perbaikan per prioritas.
+HTML siap dicetak ke PDF dari browser. Data dimuat sekali di proses induk;
+dengan start method 'fork' worker mewarisinya copy-on-write tanpa menyalin.
+Laporan ditulis atomik, jadi run yang gagal di tengah dapat diulang dan hanya
+rute yang belum punya laporan yang dibuat (kecuali --force).
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import data_store
+import intervals
+import report
+import sql_store
+import summary
+
+
+WORKERS = int(os.environ.get('ROAD_BATCH_WORKERS', os.cpu_count() or 1))
+# Nama laporan untuk data tanpa kolom Route (CSV tunggal).
+ALL_ROUTES = 'semua'
+# Jumlah paket prioritas tinggi (IRI maks tertinggi) yang ditampilkan per laporan.
+TOP_PACKAGES = 50
+# Cara memuat plotly.js: 'directory' (satu plotly.min.js di folder output), 'cdn' atau 'inline'.
+PLOTLYJS = 'directory'
+
+# Diisi sebelum pool dibuat; worker 'fork' mewarisinya, worker 'spawn' memuat ulang.
+_data = None
+_order = None
+
+_CSS = """
+body { font-family: sans-serif; margin: 2em; color: #2c3e50; }
+h1 { border-bottom: 3px solid #3498db; padding-bottom: .3em; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+th { background: #ecf0f1; }
+.figures { display: flex; flex-wrap: wrap; gap: 1em; }
+.figures > div { flex: 1 1 45%; min-width: 400px; }
+section { page-break-inside: avoid; }
+@media print { body { margin: 0; } .figures > div { min-width: 0; } }
+"""
+
+
+def load_source(path):
+    """Seluruh data CSV, store atau database SQLite"""
+    if sql_store.is_database(path):
+        return sql_store.query(path)
+    return data_store.load_dataset(path)
+
+
+def plan_reports(data, month=None):
+    """(order, tasks): tugas (rute, tanggal survei, lo, hi) memakai baris data.iloc[order[lo:hi]].
+
+    Satu lexsort (rute, tanggal) untuk semua rute; per rute dipakai blok
+    survei terakhir. month 'YYYY-MM' membatasi ke survei bulan itu.
+    """
+    n = len(data)
+    if 'Route' in data:
+        route_codes = data['Route'].cat.codes.to_numpy()
+        route_names = list(data['Route'].cat.categories)
+    else:
+        route_codes = np.zeros(n, dtype='int8')
+        route_names = [ALL_ROUTES]
+    if 'Survey Date' in data:
+        days = data['Survey Date'].to_numpy().astype('datetime64[D]')
+    else:
+        days = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+
+    rows = np.flatnonzero(route_codes >= 0)
+    if month is not None:
+        rows = rows[days[rows].astype('datetime64[M]') == np.datetime64(month, 'M')]
+    day_keys = days.view('int64')
+    order = rows[np.lexsort((day_keys[rows], route_codes[rows]))]
+    if len(order) == 0:
+        return order, []
+    codes, keys = route_codes[order], day_keys[order]
+    bounds = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (keys[1:] != keys[:-1]), True])
+
+    tasks = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi == len(order) or codes[hi] != codes[lo]:
+            date = days[order[lo]]
+            tasks.append((route_names[codes[lo]], None if np.isnat(date) else str(date), int(lo), int(hi)))
+    return order, tasks
+
+
+def report_path(out_dir, route, survey_date):
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '-', route).strip('-') or 'rute'
+    return os.path.join(out_dir, f"{name}_{survey_date or 'semua'}.html")
+
+
+def _table(rows, header):
+    head = ''.join(f'<th>{html.escape(str(h))}</th>' for h in header)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(v))}</td>' for v in row) + '</tr>' for row in rows)
+    return f'<table><tr>{head}</tr>{body}</table>'
+
+
+def render_report(data, route, survey_date=None, gap_m=intervals.DEFAULT_GAP_M, plotlyjs=PLOTLYJS):
+    """HTML laporan satu rute: logika Summary, intervals dan figure yang sama dengan tab Laporan"""
+    stats = summary.Summary(data)
+    packages = intervals.repair_packages(data, gap_m)
+    package_stats = intervals.package_summary(packages)
+
+    kondisi = _table([(k, f"{stats.kondisi_counts.get(k, 0):,}", f"{stats.kondisi_percent(k)}%")
+                      for k in data_store.KONDISI_ORDER], ['Kondisi', 'Segmen', '%'])
+    damage = _table([(column, *(f"{stats.overall[column][s]:.2f}" for s in ('mean', 'min', 'max')))
+                     for column in report.RADAR_COLUMNS], ['Parameter', 'Rata-rata', 'Minimum', 'Maksimum'])
+    priorities = _table([(label, criteria, f"{package_stats[name]['packages']:,}",
+                          f"{package_stats[name]['segments']:,}", f"{package_stats[name]['length_m'] / 1000:.2f}",
+                          action)
+                         for name, label, criteria, action in report.PRIORITY_ACTIONS],
+                        ['Prioritas', 'Kriteria', 'Paket', 'Segmen', 'Panjang (km)', 'Tindakan'])
+    top = (packages[packages['Prioritas'] == 'tinggi']
+           .sort_values('IRI Maks (m/km)', ascending=False, kind='stable').head(TOP_PACKAGES))
+    columns = [column for column in intervals.PACKAGE_COLUMNS if column != 'Prioritas']
+    if len(top):
+        top_table = _table(top[columns].itertuples(index=False), columns)
+    else:
+        top_table = '<p>Tidak ada paket prioritas tinggi.</p>'
+
+    radar = report.radar_figure(stats).to_html(full_html=False, include_plotlyjs=plotlyjs, default_width='100%')
+    gauge = report.repair_gauge_figure(stats).to_html(full_html=False, include_plotlyjs=False, default_width='100%')
+
+    title = f"Laporan Kondisi Jalan: {route}" + (f" ({survey_date})" if survey_date else "")
+    return f"""<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>{html.escape(title)}</title><style>{_CSS}</style></head>
+<body>
+<h1>{html.escape(title)}</h1>
+<p>{stats.n:,} segmen, panjang {stats.length_m / 1000:.2f} km.</p>
+<section><h2>Distribusi Kondisi Jalan</h2>{kondisi}</section>
+<section><h2>Statistik Kerusakan</h2>{damage}</section>
+<section class="figures"><div>{radar}</div><div>{gauge}</div></section>
+<section><h2>Rekomendasi Perbaikan</h2>{priorities}</section>
+<section><h2>Paket Prioritas Tinggi (IRI maks tertinggi, maks. {TOP_PACKAGES})</h2>{top_table}</section>
+</body>
+</html>
+"""
+
+
+def _init_worker(source, month):
+    global _data, _order
+    if _data is None:
+        _data = load_source(source)
+        _order, _ = plan_reports(_data, month)
+
+
+def _run(task, out_dir, gap_m, plotlyjs):
+    """Buat dan tulis (atomik) satu laporan; mengembalikan durasi (detik)"""
+    route, survey_date, lo, hi = task
+    start = time.perf_counter()
+    content = render_report(_data.iloc[_order[lo:hi]], route, survey_date, gap_m, plotlyjs)
+    path = report_path(out_dir, route, survey_date)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return time.perf_counter() - start
+
+
+def write_index(out_dir):
+    names = sorted(name for name in os.listdir(out_dir) if name.endswith('.html') and name != 'index.html')
+    items = ''.join(f'<li><a href="{html.escape(name)}">{html.escape(name[:-5])}</a></li>' for name in names)
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><html lang="id"><head><meta charset="utf-8"><title>Laporan Kondisi Jalan</title>'
+                f'<style>{_CSS}</style></head><body><h1>Laporan Kondisi Jalan</h1><ul>{items}</ul></body></html>\n')
+
+
+def run_batch(source, out_dir, month=None, workers=WORKERS, gap_m=intervals.DEFAULT_GAP_M,
+              plotlyjs=PLOTLYJS, force=False):
+    """Buat laporan yang belum ada; mengembalikan (jumlah selesai, {rute: error}, detik)"""
+    global _data, _order
+    os.makedirs(out_dir, exist_ok=True)
+    _data = load_source(source)
+    _order, tasks = plan_reports(_data, month)
+    pending = [task for task in tasks if force or not os.path.exists(report_path(out_dir, task[0], task[1]))]
+    print(f"{len(tasks)} rute, {len(tasks) - len(pending)} laporan sudah ada, {len(pending)} dibuat "
+          f"({min(workers, len(pending)) or 1} worker)", flush=True)
+    if plotlyjs == 'directory' and pending:
+        import plotly.offline
+        with open(os.path.join(out_dir, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+            f.write(plotly.offline.get_plotlyjs())
+
+    done, errors = 0, {}
+    start = time.perf_counter()
+
+    def finished(task, seconds=None, error=None):
+        nonlocal done
+        if error is None:
+            done += 1
+            print(f"  [{done + len(errors)}/{len(pending)}] {task[0]} ({seconds:.2f} s)", flush=True)
+        else:
+            errors[task[0]] = error
+            print(f"  [{done + len(errors)}/{len(pending)}] {task[0]} GAGAL: {error}", flush=True)
+
+    if workers <= 1 or len(pending) <= 1:
+        for task in pending:
+            try:
+                finished(task, _run(task, out_dir, gap_m, plotlyjs))
+            except Exception as e:
+                finished(task, error=repr(e))
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(min(workers, len(pending)), mp_context=context,
+                                 initializer=_init_worker, initargs=(source, month)) as pool:
+            futures = {pool.submit(_run, task, out_dir, gap_m, plotlyjs): task for task in pending}
+            for future in as_completed(futures):
+                try:
+                    finished(futures[future], future.result())
+                except Exception as e:
+                    finished(futures[future], error=repr(e))
+    write_index(out_dir)
+    return done, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='CSV, direktori store ingest.py atau database SQLite')
+    parser.add_argument('--out', default='laporan')
+    parser.add_argument('--month', help='hanya survei bulan ini (YYYY-MM)')
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--gap', type=float, default=intervals.DEFAULT_GAP_M,
+                        help='toleransi celah paket perbaikan (m)')
+    parser.add_argument('--plotlyjs', choices=['directory', 'cdn', 'inline'], default=PLOTLYJS)
+    parser.add_argument('--force', action='store_true', help='buat ulang laporan yang sudah ada')
+    args = parser.parse_args()
+
+    plotlyjs = True if args.plotlyjs == 'inline' else args.plotlyjs
+    done, errors, seconds = run_batch(args.source, args.out, args.month, args.workers, args.gap,
+                                      plotlyjs, args.force)
+    rate = done / seconds * 60 if seconds > 0 else 0.0
+    print(f"{done} laporan dalam {seconds:.1f} s ({rate:.1f} rute/menit), {len(errors)} gagal -> {args.out}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
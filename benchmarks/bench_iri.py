@@ -0,0 +1,147 @@
+"""Benchmark dan uji kebenaran iri_engine (Golden Car).
+
+Uji kebenaran (--check):
+  - profil sinus: IRI dibandingkan dengan respons frekuensi analitik model
+    Golden Car kontinu (rata-rata |sin| = 2/pi), toleransi 1%;
+  - profil acak: IRI per segmen dibandingkan dengan rekursi state ASTM E1926
+    (loop Python, langsung dari ST/PR), toleransi 1e-6;
+  - profil datar/miring konstan harus menghasilkan IRI 0;
+  - hasil process pool harus sama dengan satu proses (toleransi 0.1%);
+  - rekaman akselerometer sintetis (30 km/h) dari profil acak: IRI hasil
+    rekonstruksi dalam 10% dari IRI profil.
+
+Contoh:
+    python benchmarks/bench_iri.py --check
+    python benchmarks/bench_iri.py --km 50 --workers 1 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import iri_engine  # noqa: E402
+
+
+def random_profile(km, seed=0, roughness=8e-6, dx=iri_engine.SAMPLE_M):
+    """Profil acak (slope white noise ~ kelas ISO 8608) dengan kekasaran berubah per 100 m"""
+    rng = np.random.default_rng(seed)
+    n = int(km * 1000 / dx)
+    scale = np.repeat(rng.uniform(0.3, 3.0, n // 400 + 1), 400)[:n]
+    slope = rng.normal(0, 1, n) * np.sqrt(roughness / dx) * scale
+    distance = np.arange(n) * dx
+    return pd.DataFrame({'Distance (m)': distance, 'Elevation (mm)': np.cumsum(slope) * dx * 1000})
+
+
+def reference_iri(slope, dx=iri_engine.SAMPLE_M, window_m=iri_engine.WINDOW_M):
+    """Rekursi state ASTM E1926 apa adanya (loop per sampel)"""
+    st, pr = iri_engine.golden_car_matrices(dx)
+    n_init = int(round(iri_engine.INIT_M / dx))
+    state = np.array([slope[:n_init].mean(), 0.0, slope[:n_init].mean(), 0.0])
+    rs = np.empty(len(slope))
+    for i, s in enumerate(slope):
+        state = st @ state + pr * s
+        rs[i] = abs(state[0] - state[2])
+    per_window = int(round(window_m / dx))
+    return rs[:len(rs) // per_window * per_window].reshape(-1, per_window).mean(axis=1) * 1000
+
+
+def analytic_sine_iri(wavelength, amplitude_m, dx=iri_engine.SAMPLE_M):
+    """IRI (m/km) steady-state profil sinus dari respons frekuensi Golden Car kontinu"""
+    p = iri_engine.GOLDEN_CAR
+    k1, k2, c, mu = p['k1'], p['k2'], p['c'], p['mu']
+    a = np.array([[0, 1, 0, 0], [-k2, -c, k2, c], [0, 0, 0, 1], [k2 / mu, c / mu, -(k1 + k2) / mu, -c / mu]])
+    b = np.array([0, 0, 0, k1 / mu])
+    omega = 2 * np.pi * (iri_engine.SIM_SPEED_KMH / 3.6) / wavelength
+    gain = abs(np.array([1, 0, -1, 0]) @ np.linalg.solve(1j * omega * np.eye(4) - a, b))
+    # Profil tersampel diinterpolasi linear (slope konstan per dx): gain sinc^2.
+    slope_amplitude = amplitude_m * 2 * np.pi / wavelength * np.sinc(dx / wavelength) ** 2
+    return 2 / np.pi * gain * slope_amplitude * 1000
+
+
+def check():
+    failures = []
+
+    def expect(name, ok, detail):
+        print(f"{'OK ' if ok else 'GAGAL'} {name}: {detail}")
+        if not ok:
+            failures.append(name)
+
+    for wavelength in (1.55, 2.4, 5.0, 10.0, 15.4, 30.0):
+        distance = np.arange(0, 2000, iri_engine.SAMPLE_M)
+        trace = pd.DataFrame({'Distance (m)': distance,
+                              'Elevation (mm)': 5.0 * np.sin(2 * np.pi * distance / wavelength)})
+        segments = iri_engine.compute_segments(trace)
+        computed = segments['IRI (m/km)'].iloc[2:].mean()
+        expected = analytic_sine_iri(wavelength, 0.005)
+        error = abs(computed - expected) / expected
+        expect(f"sinus {wavelength:g} m", error < 0.01, f"{computed:.3f} vs analitik {expected:.3f} ({error:.2%})")
+
+    trace = random_profile(5, seed=1)
+    grid, slope = iri_engine.slopes_from_profile(trace['Distance (m)'].to_numpy(), trace['Elevation (mm)'].to_numpy())
+    _, fast, _ = iri_engine.window_iri(grid, slope)
+    slow = reference_iri(slope)
+    n = min(len(fast), len(slow))
+    error = np.max(np.abs(fast[:n] - slow[:n]) / slow[:n])
+    expect("rekursi ASTM", error < 1e-6, f"selisih relatif maks {error:.1e} pada {n} segmen")
+
+    distance = np.arange(0, 1000, iri_engine.SAMPLE_M)
+    flat = iri_engine.compute_segments(pd.DataFrame({'Distance (m)': distance, 'Elevation (mm)': distance * 20.0}))
+    expect("profil miring konstan", flat['IRI (m/km)'].abs().max() < 1e-6, f"IRI maks {flat['IRI (m/km)'].max()}")
+
+    trace = random_profile(120, seed=2)
+    single = iri_engine.compute_segments(trace, workers=1)
+    pooled = iri_engine.compute_segments(trace, workers=2)
+    error = np.max(np.abs(single['IRI (m/km)'].to_numpy() - pooled['IRI (m/km)'].to_numpy())
+                   / single['IRI (m/km)'].to_numpy())
+    expect("process pool", len(single) == len(pooled) and error < 1e-3, f"{len(pooled)} segmen, selisih maks {error:.2e}")
+
+    trace = random_profile(3, seed=3)
+    profile_iri = iri_engine.compute_segments(trace)['IRI (m/km)'].to_numpy()
+    speed_kmh = 30.0
+    fs = 200.0
+    t = np.arange(0, trace['Distance (m)'].iloc[-1] / (speed_kmh / 3.6), 1 / fs)
+    x = t * speed_kmh / 3.6
+    elevation = np.interp(x, trace['Distance (m)'], trace['Elevation (mm)']) / 1000
+    acceleration = np.gradient(np.gradient(elevation, t), t) + 9.81
+    accel_trace = pd.DataFrame({'Time (s)': t, 'Acceleration (m/s2)': acceleration, 'Speed (km/h)': speed_kmh})
+    accel_iri = iri_engine.compute_segments(accel_trace)['IRI (m/km)'].to_numpy()
+    n = min(len(accel_iri), len(profile_iri))
+    error = abs(accel_iri[1:n - 1].mean() - profile_iri[1:n - 1].mean()) / profile_iri[1:n - 1].mean()
+    expect("akselerometer 30 km/h", error < 0.10,
+           f"IRI rata-rata {accel_iri[1:n - 1].mean():.2f} vs profil {profile_iri[1:n - 1].mean():.2f} ({error:.1%})")
+
+    return 1 if failures else 0
+
+
+def bench(km, workers_list):
+    trace = random_profile(km)
+    iri_engine.compute_segments(random_profile(1))  # import scipy + desain filter, di luar pengukuran
+    print(f"{km:g} km profil ({len(trace)} sampel, {int(km * 10)} segmen)")
+    print(f"{'workers':>8} {'waktu':>9} {'segmen/s':>10} {'segmen/s/core':>14}")
+    for workers in workers_list:
+        t0 = time.perf_counter()
+        segments = iri_engine.compute_segments(trace, workers=workers)
+        elapsed = time.perf_counter() - t0
+        rate = len(segments) / elapsed
+        print(f"{workers:>8} {elapsed * 1000:>7.0f}ms {rate:>10.0f} {rate / workers:>14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--check', action='store_true', help='jalankan uji kebenaran saja')
+    parser.add_argument('--km', type=float, default=200.0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count()])
+    args = parser.parse_args()
+
+    if args.check:
+        return check()
+    bench(args.km, args.workers)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Benchmark pembuatan peta: loop folium.Circle lama vs layer GeoJSON.
+
+Contoh:
+    python benchmarks/bench_map.py --rows 1000 100000 1000000 --legacy-max 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import folium
+
+from synthetic import synthetic_survey
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import map_layer  # noqa: E402
+
+
+def legacy_create_map(data):
+    """Salinan create_map() sebelum layer GeoJSON (satu folium.Circle per baris)"""
+    m = folium.Map(location=[data['Latitude'].mean(), data['Longitude'].mean()], zoom_start=14)
+    for idx, row in data.iterrows():
+        tooltip_text = f"""
+        <strong>Segmen:</strong> {row['Start Point (m)']} - {row['End Point (m)']} m<br>
+        <strong>IRI:</strong> {row['IRI (m/km)']} m/km<br>
+        <strong>Kondisi:</strong> {row['Roughness Condition']}<br>
+        <strong>Retak:</strong> {row['Total Crack Area (%)']}%<br>
+        <strong>Lubang:</strong> {row['Number of Potholes (per km)']} per km
+        """
+        color = map_layer.KONDISI_COLORS.get(row['Roughness Condition'], 'gray')
+        folium.Circle(
+            location=[row['Latitude'], row['Longitude']],
+            radius=50,
+            color=color,
+            fill=True,
+            fill_color=color,
+            fill_opacity=0.7,
+            tooltip=folium.Tooltip(tooltip_text)
+        ).add_to(m)
+    return m
+
+
+def batched_create_map(data):
+    m = map_layer.base_map(data)
+    map_layer.segment_layer(map_layer.segment_features(data)).add_to(m)
+    return m
+
+
+def measure(build, data):
+    t0 = time.perf_counter()
+    m = build(data)
+    t1 = time.perf_counter()
+    html = m.get_root().render()
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1, len(html.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--legacy-max', type=int, default=100000,
+                        help='lewati loop lama di atas jumlah baris ini')
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'path':>8} {'build s':>9} {'render s':>9} {'html MB':>9}")
+    for n in args.rows:
+        data = synthetic_survey(n)
+        paths = [('geojson', batched_create_map)]
+        if n <= args.legacy_max:
+            paths.insert(0, ('legacy', legacy_create_map))
+        for name, build in paths:
+            build_s, render_s, size = measure(build, data)
+            print(f"{n:>9} {name:>8} {build_s:>9.3f} {render_s:>9.3f} {size / 1e6:>9.2f}")
+        if n > args.legacy_max:
+            print(f"{n:>9} {'legacy':>8} {'skipped (--legacy-max)':>29}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark filter sidebar: jalur pandas (FilterIndex) vs pushdown SQLite.
+
+Jalur pandas memuat seluruh store ke memori sekali lalu memfilter di sana;
+backend SQLite hanya membaca baris yang lolos filter. Kolom "memori" adalah
+ukuran DataFrame yang harus tinggal di RAM untuk melayani query tersebut.
+
+Contoh:
+    python benchmarks/bench_query.py --rows 100000 1000000 --routes 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import synthetic_survey
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_store  # noqa: E402
+import filter_index  # noqa: E402
+import ingest  # noqa: E402
+import sql_store  # noqa: E402
+
+
+def build(workdir, rows, routes):
+    """Store ingest.py dengan `routes` rute dan database SQLite dari store itu"""
+    store = os.path.join(workdir, 'store')
+    os.makedirs(store, exist_ok=True)
+    per_route = rows // routes
+    for r in range(routes):
+        path = os.path.join(workdir, f"rute{r:02d}_2024-05-01.csv")
+        synthetic_survey(per_route, seed=r).to_csv(path, index=False)
+        ingest.ingest_file(path, store)
+        os.remove(path)
+    db_path = os.path.join(workdir, 'network.sqlite')
+    sql_store.build_database([store], db_path)
+    return store, db_path
+
+
+def pandas_filter(data, kondisi, iri_range, routes):
+    positions = filter_index.get_index(data).query(ranges={'IRI (m/km)': iri_range}, categories=kondisi)
+    if routes:
+        in_route = data['Route'].isin(routes).to_numpy()
+        positions = np.flatnonzero(in_route) if positions is None else positions[in_route[positions]]
+    return filter_index.take(data, positions)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--routes', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    filters = {
+        'semua': (None, (0.0, 10.0), None),
+        'Buruk': (['Buruk'], (0.0, 10.0), None),
+        'IRI 8-10': (None, (8.0, 10.0), None),
+        '1 rute': (None, (0.0, 10.0), ['rute00']),
+        '1 rute, Buruk': (['Buruk'], (6.0, 10.0), ['rute00']),
+    }
+
+    print(f"{'baris':>9} {'filter':>14} {'hasil':>9} {'pandas':>10} {'sqlite':>10} {'memori pandas':>14} {'memori sqlite':>14}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as workdir:
+            store, db_path = build(workdir, rows, args.routes)
+
+            data_store.clear_cache()
+            t0 = time.perf_counter()
+            data = data_store.load_store(store)
+            filter_index.get_index(data)
+            load = time.perf_counter() - t0
+            full_mb = data.memory_usage(deep=True).sum() / 1e6
+            print(f"{rows:>9} {'(muat store)':>14} {len(data):>9} {load * 1000:>8.0f}ms")
+
+            for name, (kondisi, iri_range, routes) in filters.items():
+                pandas_time, expected = timed(lambda: pandas_filter(data, kondisi, iri_range, routes), args.repeat)
+                sql_time, result = timed(lambda: sql_store.query(db_path, kondisi, iri_range, routes), args.repeat)
+                assert len(result) == len(expected), (name, len(result), len(expected))
+                result_mb = result.memory_usage(deep=True).sum() / 1e6
+                print(f"{rows:>9} {name:>14} {len(result):>9} {pandas_time * 1000:>8.1f}ms {sql_time * 1000:>8.1f}ms "
+                      f"{full_mb:>12.1f}MB {result_mb:>12.1f}MB")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
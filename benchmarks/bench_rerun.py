@@ -0,0 +1,113 @@
+"""Benchmark latensi rerun app.py per tampilan (headless, via AppTest).
+
+Sebelum render lazy, setiap rerun menjalankan keenam tampilan sekaligus di
+dalam st.tabs. Baris "baseline" menjalankan app.py dari commit --baseline-rev
+(default: commit pertama repo) di direktori sementara, dengan CSV sintetis
+sebagai dummy_data_yogyakarta.csv, dibandingkan dengan rerun app.py sekarang
+yang hanya menghitung tampilan aktif.
+
+Contoh:
+    python benchmarks/bench_rerun.py --rows 10000 100000
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from synthetic import write_survey_csv
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, 'app.py')
+VIEW_NAMES = ["Dashboard", "Analisis Retak", "Analisis Lubang", "Analisis Alur", "Laporan", "Data"]
+# Nama file data yang dibaca app.py lama (path relatif terhadap direktori kerja).
+BASELINE_DATA_NAME = 'dummy_data_yogyakarta.csv'
+
+
+def root_commit():
+    result = subprocess.run(['git', '-C', REPO_DIR, 'rev-list', '--max-parents=0', 'HEAD'],
+                            check=True, capture_output=True, text=True)
+    return result.stdout.split()[0]
+
+
+def baseline_workdir(rev, csv_path, data_dir):
+    """Direktori sementara berisi app.py dari commit rev dan csv_path sebagai data bawaannya"""
+    source = subprocess.run(['git', '-C', REPO_DIR, 'show', f'{rev}:app.py'],
+                            check=True, capture_output=True).stdout
+    workdir = tempfile.mkdtemp(prefix='bench_rerun_', dir=data_dir)
+    with open(os.path.join(workdir, 'app.py'), 'wb') as f:
+        f.write(source)
+    shutil.copyfile(csv_path, os.path.join(workdir, BASELINE_DATA_NAME))
+    return workdir
+
+
+def timed_run(at):
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def bench_baseline(csv_path, repeat, rev, data_dir):
+    """Median rerun app.py lama (keenam tab, tanpa cache) untuk csv_path"""
+    workdir = baseline_workdir(rev, csv_path, data_dir)
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        at = AppTest.from_file(os.path.join(workdir, 'app.py'), default_timeout=600)
+        timed_run(at)
+        return statistics.median(timed_run(at) for _ in range(repeat))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench(csv_path, repeat):
+    os.environ['ROAD_DATA_FILE'] = csv_path
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    timed_run(at)
+
+    results = {}
+    for view in VIEW_NAMES:
+        at.radio(key='tampilan').set_value(view)
+        timed_run(at)
+        results[view] = statistics.median(timed_run(at) for _ in range(repeat))
+
+    at.radio(key='tampilan').set_value("Dashboard")
+    timed_run(at)
+    slider = at.slider[0]
+    filter_times = []
+    for upper in (9.0, 8.0, 7.0)[:repeat]:
+        slider.set_value((0.0, upper))
+        filter_times.append(timed_run(at))
+    return results, statistics.median(filter_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=tempfile.gettempdir())
+    parser.add_argument('--baseline-rev', help='commit app.py pembanding (default: commit pertama)')
+    args = parser.parse_args()
+    baseline_rev = args.baseline_rev or root_commit()
+
+    for n in args.rows:
+        csv_path = write_survey_csv(os.path.join(args.data_dir, f'survey_{n}.csv'), n)
+        baseline_s = bench_baseline(csv_path, args.repeat, baseline_rev, args.data_dir)
+        results, filter_s = bench(csv_path, args.repeat)
+        print(f"\n{n} segmen")
+        for view, seconds in results.items():
+            print(f"  {view:<16} {seconds * 1000:>9.0f} ms")
+        print(f"  {'baseline':<16} {baseline_s * 1000:>9.0f} ms  (app.py {baseline_rev[:7]}, 6 tab per rerun)")
+        print(f"  {'filter berubah':<16} {filter_s * 1000:>9.0f} ms  (tampilan Dashboard)")
+
+
+if __name__ == '__main__':
+    main()
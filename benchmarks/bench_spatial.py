@@ -0,0 +1,75 @@
+"""Benchmark SpatialIndex: query bbox/radius/k-terdekat vs pindai seluruh frame.
+
+Contoh:
+    python benchmarks/bench_spatial.py --rows 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from synthetic import synthetic_survey
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spatial  # noqa: E402
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def scan_bbox(lat, lon, bounds):
+    south, west, north, east = bounds
+    return np.flatnonzero((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+
+
+def scan_nearest(lat, lon, point):
+    return np.argmin(np.hypot(lat - point[0], (lon - point[1]) * np.cos(np.radians(point[0]))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'baris':>9} {'build':>9} {'query':>10} {'index':>10} {'scan':>10}")
+    for rows in args.rows:
+        data = synthetic_survey(rows)
+        lat = data['Latitude'].to_numpy()
+        lon = data['Longitude'].to_numpy()
+
+        t0 = time.perf_counter()
+        index = spatial.SpatialIndex(data)
+        build = time.perf_counter() - t0
+
+        i = int(rng.integers(rows))
+        point = (lat[i] + 1e-5, lon[i] - 1e-5)
+        bounds = (point[0] - 0.004, point[1] - 0.008, point[0] + 0.004, point[1] + 0.008)
+        queries = {
+            'bbox': (lambda: index.bbox(bounds), lambda: scan_bbox(lat, lon, bounds)),
+            'radius 250m': (lambda: index.radius(*point, 250), None),
+            'k=1': (lambda: index.nearest(*point, k=1), lambda: scan_nearest(lat, lon, point)),
+            'k=10': (lambda: index.nearest(*point, k=10), None),
+        }
+        assert index.nearest(*point)[0][0] == scan_nearest(lat, lon, point)
+        assert np.array_equal(index.bbox(bounds), scan_bbox(lat, lon, bounds))
+
+        for name, (query, scan) in queries.items():
+            index_time = timed(query, args.repeat)
+            scan_time = f"{timed(scan, args.repeat) * 1000:>8.3f}ms" if scan else f"{'-':>10}"
+            print(f"{rows:>9} {build * 1000:>7.0f}ms {name:>10} {index_time * 1000:>8.3f}ms {scan_time}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Benchmark cold start: waktu import per modul dan time-to-first-render app.py.
+
+Setiap pengukuran dijalankan di interpreter baru agar cache sys.modules kosong.
+File data (ROAD_DATA_FILE atau dummy_data_yogyakarta.csv) disalin ke direktori
+sementara, jadi sidecar Parquet yang dihapus/dibuat hanya milik salinan itu.
+
+Contoh:
+    python benchmarks/bench_startup.py --repeat 3
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = [
+    'numpy', 'pandas', 'pyarrow.parquet', 'streamlit', 'plotly.io', 'plotly.graph_objects',
+    'plotly.express', 'folium', 'streamlit_folium', 'matplotlib.pyplot', 'seaborn', 'statsmodels.api',
+]
+
+FIRST_RENDER = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=600)
+if {view!r}:
+    at.session_state['tampilan'] = {view!r}
+at.run()
+t2 = time.perf_counter()
+heavy = [m for m in ('plotly.express', 'folium', 'streamlit_folium', 'matplotlib', 'seaborn', 'statsmodels')
+         if m in sys.modules]
+print(json.dumps({{'streamlit_import': t1 - t0, 'first_render': t2 - t1,
+                  'errors': [e.message for e in at.exception], 'loaded': heavy}}))
+"""
+
+
+def import_time(module):
+    """Waktu import kumulatif (detik) dari python -X importtime, None bila tidak terpasang"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        return None
+    names = {module, module.split('.')[0]}
+    total = 0
+    for line in proc.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() in names:
+            total = max(total, int(parts[1]))
+    return total / 1e6
+
+
+def first_render(view, sidecar, data_file):
+    """Render pertama untuk salinan data_file; tanpa sidecar = sidecar salinan dihapus dulu"""
+    env = dict(os.environ, ROAD_DATA_FILE=data_file)
+    sidecar_file = data_file + '.parquet'
+    if not sidecar and os.path.exists(sidecar_file):
+        os.remove(sidecar_file)
+    code = FIRST_RENDER.format(app=os.path.join(ROOT, 'app.py'), view=view)
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT, env=env)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', help='simpan hasil ke file JSON')
+    parser.add_argument('--data-dir', default=tempfile.gettempdir(), help='lokasi salinan file data')
+    args = parser.parse_args()
+
+    results = {'imports': {}, 'first_render': {}}
+    print('Import per modul (interpreter baru):')
+    for module in MODULES:
+        times = [import_time(module) for _ in range(args.repeat)]
+        if None in times:
+            print(f"  {module:<22} tidak terpasang")
+            continue
+        results['imports'][module] = statistics.median(times)
+        print(f"  {module:<22} {results['imports'][module] * 1000:>8.0f} ms")
+
+    print('\nTime-to-first-render app.py (AppTest, interpreter baru):')
+    source = os.path.join(ROOT, os.environ.get('ROAD_DATA_FILE', 'dummy_data_yogyakarta.csv'))
+    workdir = tempfile.mkdtemp(prefix='bench_startup_', dir=args.data_dir)
+    data_file = shutil.copy2(source, workdir)
+    try:
+        bench_first_render(data_file, args.repeat, results)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def bench_first_render(data_file, repeat, results):
+    for view in ('Dashboard', 'Data'):
+        for sidecar in (False, True):
+            runs = [first_render(view, sidecar, data_file) for _ in range(repeat)]
+            label = f"{view}, {'dengan' if sidecar else 'tanpa'} sidecar"
+            seconds = statistics.median(run['first_render'] for run in runs)
+            results['first_render'][label] = {'seconds': seconds, 'loaded': runs[-1]['loaded'],
+                                              'errors': runs[-1]['errors']}
+            print(f"  {label:<28} {seconds * 1000:>8.0f} ms  modul berat dimuat: "
+                  f"{', '.join(runs[-1]['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
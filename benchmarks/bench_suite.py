@@ -0,0 +1,202 @@
+"""Benchmark suite semua tampilan dashboard pada beberapa skala data sintetis.
+
+Setiap langkah (load_data, filter_data, create_map, setiap fungsi analisis,
+report_tab, data_table) dijalankan headless di AppTest terpisah dengan data
+survei sintetis (synthetic.py) dan dicatat:
+  - cold_s: median waktu langkah dengan cache bersama/figur dikosongkan (load_data:
+    cache memori juga dikosongkan, jadi membaca sidecar Parquet);
+  - warm_s: waktu langkah yang sama sesudahnya (cache terisi, seperti rerun);
+  - peak_mb: puncak alokasi Python/numpy selama langkah cold (tracemalloc,
+    run terpisah karena tracemalloc memperlambat);
+  - payload_bytes: ukuran protobuf elemen yang dikirim ke browser (untuk
+    create_map: HTML peta folium lengkap).
+Hasil ditulis sebagai JSON; dengan --baseline, langkah yang lebih lambat
+dari toleransi ditandai dan exit code 1.
+
+Contoh:
+    python benchmarks/bench_suite.py --scales 10000 1000000 --out hasil.json
+    python benchmarks/bench_suite.py --scales 10000 --baseline hasil.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+from synthetic import write_survey_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = [10_000, 1_000_000, 10_000_000]
+STEPS = ['load_data', 'filter_data', 'create_map', 'dashboard_overview', 'crack_analysis',
+         'pothole_analysis', 'rut_analysis', 'report_tab', 'data_table']
+# Filter untuk langkah filter_data: (kondisi, min IRI, max IRI).
+FILTER = (['Sedang', 'Buruk'], 2.0, 9.0)
+
+
+def step_script(root, path, step, mode, kondisi, min_iri, max_iri):
+    """Script AppTest untuk satu langkah; hasil di st.session_state['bench']"""
+    import sys
+    import time
+    import tracemalloc
+
+    import streamlit as st
+    # Modul yang di-import lazy oleh app.py di-import lebih dulu: yang diukur
+    # kerja langkahnya, bukan import pertama (tergantung urutan langkah).
+    import folium  # noqa: F401
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import streamlit_folium  # noqa: F401
+
+    sys.path.insert(0, root)
+    import app
+    import data_store
+    import figure_cache
+    import shared_cache
+
+    data = data_store.load_dataset(path)
+    key = (data_store.dataset_fingerprint(path), ('Semua',), 0.0, 10.0, ())
+    filtered = app.filter_data(data, ['Semua'], 0.0, 10.0)
+
+    def run():
+        if step == 'load_data':
+            return app.load_data(path)
+        if step == 'filter_data':
+            return app.filter_data(data, kondisi, min_iri, max_iri)
+        if step == 'create_map':
+            return len(app.create_map(filtered).get_root().render())
+        getattr(app, step)(filtered, key)
+
+    if mode != 'warm':
+        shared_cache.clear()
+        figure_cache.get_cache().clear()
+        if step == 'load_data':
+            data_store.clear_cache()
+    if mode == 'peak':
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - t0
+    peak = 0
+    if mode == 'peak':
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    st.session_state['bench'] = {
+        'seconds': elapsed,
+        'peak_bytes': peak,
+        'html_bytes': result if step == 'create_map' else 0,
+    }
+
+
+def payload_bytes(node):
+    """Jumlah ukuran protobuf elemen di bawah node tree AppTest"""
+    children = getattr(node, 'children', None)
+    if children is not None:
+        return sum(payload_bytes(child) for child in children.values())
+    proto = getattr(node, 'proto', None)
+    return proto.ByteSize() if proto is not None else 0
+
+
+def run_step(path, step, mode, timeout):
+    at = AppTest.from_function(step_script, default_timeout=timeout,
+                               args=(ROOT, path, step, mode) + FILTER)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{step} ({mode}): {at.exception[0].message}")
+    result = at.session_state['bench']
+    result['payload_bytes'] = result['html_bytes'] or payload_bytes(at.main) + payload_bytes(at.sidebar)
+    return result
+
+
+def bench_scale(path, steps, repeat, timeout):
+    # Run pertama membuat sidecar Parquet dan meng-import modul; tidak diukur.
+    run_step(path, 'filter_data', 'cold', timeout)
+    results = {}
+    for step in steps:
+        cold = [run_step(path, step, 'cold', timeout) for _ in range(repeat)]
+        warm = [run_step(path, step, 'warm', timeout) for _ in range(repeat)]
+        peak = run_step(path, step, 'peak', timeout)
+        results[step] = {
+            'cold_s': round(statistics.median(r['seconds'] for r in cold), 4),
+            'warm_s': round(statistics.median(r['seconds'] for r in warm), 4),
+            'peak_mb': round(peak['peak_bytes'] / 2**20, 1),
+            'payload_bytes': cold[0]['payload_bytes'],
+        }
+        print(f"  {step:<20} {results[step]['cold_s'] * 1000:>9.0f} ms {results[step]['warm_s'] * 1000:>9.0f} ms"
+              f" {results[step]['peak_mb']:>9.1f} MB {cold[0]['payload_bytes'] / 1024:>10.0f} KB", flush=True)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance, min_seconds=0.05):
+    """Daftar (skala, langkah, kolom, lama, baru) yang melambat lebih dari toleransi"""
+    regressions = []
+    for scale, steps in results['scales'].items():
+        for step, values in steps.items():
+            old = baseline.get('scales', {}).get(scale, {}).get(step)
+            if old is None:
+                continue
+            for column in ('cold_s', 'warm_s', 'peak_mb', 'payload_bytes'):
+                floor = min_seconds if column.endswith('_s') else 0
+                if values[column] > max(old[column] * (1 + tolerance), floor):
+                    regressions.append((scale, step, column, old[column], values[column]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    parser.add_argument('--steps', nargs='+', default=STEPS, choices=STEPS)
+    parser.add_argument('--repeat', type=int, default=3, help='ulangan per langkah (median)')
+    parser.add_argument('--data-dir', default=tempfile.gettempdir())
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--baseline', help='JSON hasil sebelumnya untuk deteksi regresi')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='batas perlambatan relatif')
+    parser.add_argument('--timeout', type=float, default=3600)
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'filter': FILTER,
+            'repeat': args.repeat,
+        },
+        'scales': {},
+    }
+    for n in args.scales:
+        path = write_survey_csv(os.path.join(args.data_dir, f'bench_suite_{n}.csv'), n)
+        print(f"\n{n} segmen ({path})")
+        print(f"  {'langkah':<20} {'cold':>12} {'warm':>12} {'puncak':>12} {'payload':>13}")
+        results['scales'][str(n)] = bench_scale(path, args.steps, args.repeat, args.timeout)
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    print(f"\nHasil: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for scale, step, column, old, new in regressions:
+            print(f"REGRESI {scale} {step} {column}: {old} -> {new}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
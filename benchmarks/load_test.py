@@ -0,0 +1,160 @@
+"""Load test: N sesi simulasi menjalankan app.py bersamaan dalam satu proses.
+
+Setiap sesi adalah AppTest sendiri (session_state terpisah) yang berjalan di
+thread-nya sendiri, seperti sesi browser di satu server Streamlit; cache
+modul (shared_cache, figure_cache, data_store) dipakai bersama. Tiap sesi
+memuat dashboard lalu melakukan sejumlah rerun dengan tampilan dan filter
+acak dari beberapa preset (staf yang meninjau insiden yang sama cenderung
+memakai filter yang sama). Dilaporkan p50/p95 latensi rerun dan RSS proses.
+
+Contoh:
+    python benchmarks/load_test.py --sessions 20 --reruns 10
+    python benchmarks/load_test.py --data survey_store --sessions 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from synthetic import write_survey_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+VIEW_NAMES = ["Dashboard", "Analisis Retak", "Analisis Lubang", "Analisis Alur", "Laporan", "Data"]
+IRI_PRESETS = [(0.0, 10.0), (4.0, 10.0), (6.0, 10.0), (0.0, 4.0)]
+
+sys.path.insert(0, ROOT)
+
+import shared_cache  # noqa: E402
+
+
+def rss_mb():
+    """RSS proses saat ini (MB), dari /proc; None bila tidak tersedia"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def share_server_state():
+    """Buat AppTest paralel berperilaku seperti satu server Streamlit.
+
+    AppTest memasang Runtime tiruan global di awal run dan menghapusnya di
+    akhir, jadi sesi lain kehilangan runtime di tengah run; runtime tiruan
+    terakhir dipakai bila global sedang kosong. AppTest juga meng-compile
+    app.py per run, sedangkan server memakai satu ScriptCache untuk semua
+    sesi (ast.parse paralel tidak aman di Python 3.11).
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    last = []
+
+    def current(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        return cls._instance or (last[0] if last else None)
+
+    def instance(cls):
+        runtime = current(cls)
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: current(cls) is not None)
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def session(seed, reruns, latencies, errors):
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    try:
+        for i in range(reruns + 1):
+            if i > 0:
+                at.radio(key='tampilan').set_value(rng.choice(VIEW_NAMES))
+                at.sidebar.slider[0].set_value(rng.choice(IRI_PRESETS))
+            t0 = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - t0
+            if at.exception:
+                errors.append(at.exception[0].message)
+                return
+            latencies.append((i == 0, elapsed))
+    except Exception as e:
+        errors.append(repr(e))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--reruns', type=int, default=10, help='rerun per sesi setelah load pertama')
+    parser.add_argument('--data', help='CSV, store atau database; default survei sintetis --rows')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--data-dir', default=tempfile.gettempdir(), help='lokasi CSV sintetis')
+    parser.add_argument('--ramp', type=float, default=0.0, help='jeda (detik) antar sesi yang mulai')
+    args = parser.parse_args()
+
+    data = args.data or write_survey_csv(os.path.join(args.data_dir, f'survey_{args.rows}.csv'), args.rows)
+    os.environ['ROAD_DATA_FILE'] = os.path.abspath(data)
+
+    share_server_state()
+
+    latencies, errors = [], []
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    threads = []
+    for seed in range(args.sessions):
+        thread = threading.Thread(target=session, args=(seed, args.reruns, latencies, errors))
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - t0
+
+    first = [elapsed for is_first, elapsed in latencies if is_first]
+    reruns = [elapsed for is_first, elapsed in latencies if not is_first]
+    print(f"{args.sessions} sesi x {args.reruns} rerun, data {data}, {wall:.1f} s total")
+    for name, values in (('load pertama', first), ('rerun', reruns)):
+        if values:
+            print(f"  {name:<13} n={len(values):<5} p50 {statistics.median(values) * 1000:>7.0f} ms"
+                  f"  p95 {percentile(values, 0.95) * 1000:>7.0f} ms  maks {max(values) * 1000:>7.0f} ms")
+    print(f"  RSS {rss_before:.0f} MB -> {rss_mb():.0f} MB (puncak {peak_rss_mb():.0f} MB)")
+    print(f"  memori terbatas {shared_cache.total_bytes() / 2**20:.1f} / {shared_cache.MAX_BYTES / 2**20:.0f} MB")
+    for name, nbytes in shared_cache.resident_bytes().items():
+        print(f"    {name:<12} resident {nbytes / 2**20:>7.1f} MB")
+    for name, stats in shared_cache.stats().items():
+        print(f"    {name:<11} {stats['entries']:>3} entri {stats['bytes'] / 2**20:>7.1f} MB"
+              f"  {stats['hits']:>5} hit {stats['misses']:>4} miss {stats['evictions']:>4} evict")
+    if errors:
+        print(f"  {len(errors)} sesi gagal: {errors[0]}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Data survei sintetis dengan skema dummy_data_yogyakarta.csv untuk benchmark.
+
+Satu lintasan survei kontinu: segmen 100 m berurutan, arah kendaraan berubah
+halus (random walk heading) dan lintasan dipantulkan di batas wilayah DIY,
+jadi titik yang berdekatan di chainage juga berdekatan di peta. IRI
+berkorelasi sepanjang chainage (AR(1) log-IRI + level per seksi ~5 km);
+retak, lubang, alur dan kecepatan mengikuti IRI dengan noise. Data dibuat
+per chunk dengan state yang dibawa antar chunk, jadi 10 juta segmen bisa
+ditulis ke CSV tanpa menahan seluruh frame di memori.
+"""
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import SCHEMA, classify_iri  # noqa: E402
+
+SEGMENT_M = 100
+# (south, west, north, east) kira-kira wilayah DIY.
+REGION = (-8.20, 110.00, -7.55, 110.85)
+START = (-7.77, 110.37)
+M_PER_DEG = 111_320.0
+# Korelasi log-IRI antar segmen (panjang korelasi ~1 km) dan panjang seksi perkerasan.
+IRI_PHI = 0.9
+SECTION_SEGMENTS = 50
+CHUNK_ROWS = 1_000_000
+
+
+def _fold(values, lo, hi):
+    """Pantulkan koordinat tak terbatas ke [lo, hi] (lintasan memantul di batas)"""
+    width = hi - lo
+    folded = np.mod(values - lo, 2 * width)
+    return lo + width - np.abs(folded - width)
+
+
+def iter_survey(n, seed=0, chunk_rows=CHUNK_ROWS):
+    """Chunk survei sintetis berurutan (total n segmen) dengan dtype sesuai SCHEMA"""
+    chunk_rows = max(SECTION_SEGMENTS, chunk_rows // SECTION_SEGMENTS * SECTION_SEGMENTS)
+    rng = np.random.default_rng(seed)
+    south, west, north, east = REGION
+    lat, lon = START
+    heading = rng.uniform(0, 2 * math.pi)
+    roughness = 0.0
+    lon_scale = M_PER_DEG * math.cos(math.radians((south + north) / 2))
+
+    for offset in range(0, n, chunk_rows):
+        m = min(chunk_rows, n - offset)
+        headings = heading + np.cumsum(rng.normal(0, 0.12, m))
+        lats = lat + np.cumsum(np.cos(headings)) * SEGMENT_M / M_PER_DEG
+        lons = lon + np.cumsum(np.sin(headings)) * SEGMENT_M / lon_scale
+        heading, lat, lon = headings[-1], lats[-1], lons[-1]
+
+        noise = rng.normal(0, 0.18, m)
+        log_iri, (roughness,) = lfilter([1.0], [1.0, -IRI_PHI], noise, zi=[IRI_PHI * roughness])
+        sections = np.repeat(rng.normal(0, 0.35, m // SECTION_SEGMENTS + 1), SECTION_SEGMENTS)[:m]
+        iri = np.clip(np.exp(1.55 + sections + log_iri), 0.5, 15).round(2)
+
+        start = (offset + np.arange(m, dtype='int64')) * SEGMENT_M
+        data = pd.DataFrame({
+            'No': offset + np.arange(1, m + 1),
+            'Start Point (m)': start,
+            'End Point (m)': start + SEGMENT_M,
+            'Latitude': _fold(lats, south, north),
+            'Longitude': _fold(lons, west, east),
+            'IRI (m/km)': iri,
+            'Roughness Condition': classify_iri(iri),
+            'Speed (km/h)': np.clip(40 - 2 * iri + rng.normal(0, 3, m), 15, 45).round(),
+            'Total Crack Area (%)': np.clip(3.5 * iri - 2 + rng.normal(0, 5, m), 0, 30).round(2),
+            'Average Crack Width (mm)': np.clip(0.4 * iri + rng.normal(0, 0.8, m), 0, 5).round(2),
+            'Number of Potholes (per km)': np.minimum(rng.poisson(np.clip(iri - 1, 0, None) * 5), 60),
+            'Average Rut Depth (cm)': np.clip(0.4 * iri + rng.normal(0, 0.8, m), 0, 5).round(2),
+        })
+        yield data.astype(SCHEMA)
+
+
+def synthetic_survey(n, seed=0):
+    """n segmen 100 m berurutan dengan kolom dan dtype sesuai SCHEMA"""
+    return pd.concat(iter_survey(n, seed), ignore_index=True)
+
+
+def write_survey_csv(path, n, seed=0):
+    """Tulis survei sintetis ke CSV per chunk (dilewati bila file sudah ada)"""
+    if not os.path.exists(path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            for i, chunk in enumerate(iter_survey(n, seed)):
+                chunk.to_csv(f, index=False, header=i == 0)
+        os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import instrument
+import shared_cache
+
+
+KONDISI_ORDER = ['Sangat Baik', 'Baik', 'Sedang', 'Buruk']
+KONDISI_DTYPE = pd.CategoricalDtype(KONDISI_ORDER, ordered=True)
+# Batas IRI (m/km) antar Roughness Condition: < 2 Sangat Baik, 2-4 Baik, 4-6 Sedang, >= 6 Buruk.
+KONDISI_IRI_EDGES = [2, 4, 6]
+
+# Latitude/Longitude tetap float64: float32 hanya presisi ~1 m di sekitar 110°.
+SCHEMA = {
+    'No': 'int32',
+    'Start Point (m)': 'int32',
+    'End Point (m)': 'int32',
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+    'IRI (m/km)': 'float32',
+    'Roughness Condition': KONDISI_DTYPE,
+    'Speed (km/h)': 'int32',
+    'Total Crack Area (%)': 'float32',
+    'Average Crack Width (mm)': 'float32',
+    'Number of Potholes (per km)': 'int32',
+    'Average Rut Depth (cm)': 'float32',
+}
+
+SIDECAR_SUFFIX = '.parquet'
+_META_KEY = b'road_dashboard_source'
+
+MANIFEST_NAME = 'manifest.json'
+# Pilihan survei default: survei terakhir setiap rute (chainage yang sama tidak dihitung dua kali).
+LATEST_SURVEY = 'terbaru'
+
+_cache = {}
+# Satu load per proses: sesi lain menunggu lalu memakai hasil cache.
+_lock = threading.RLock()
+
+
+def classify_iri(iri):
+    """Roughness Condition (Categorical) dari nilai IRI (m/km)"""
+    codes = np.digitize(np.asarray(iri, dtype='float64'), KONDISI_IRI_EDGES)
+    return pd.Categorical.from_codes(codes, dtype=KONDISI_DTYPE)
+
+
+def file_signature(file_path):
+    """Signature murah (mtime, ukuran) untuk mendeteksi perubahan file"""
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """Hash isi file secara streaming (blake2b)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def apply_schema(data):
+    """Validasi kolom dan cast ke dtype tetap sesuai SCHEMA"""
+    missing = [col for col in SCHEMA if col not in data.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+    return data[list(SCHEMA)].astype(SCHEMA)
+
+
+def read_csv_typed(file_path, **kwargs):
+    """Baca CSV survei langsung dengan dtype tetap"""
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing = [col for col in SCHEMA if col not in header]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan: {', '.join(missing)}")
+    return pd.read_csv(file_path, usecols=list(SCHEMA), dtype=SCHEMA, **kwargs)[list(SCHEMA)]
+
+
+def sidecar_path(file_path):
+    return file_path + SIDECAR_SUFFIX
+
+
+def _read_sidecar(file_path, signature):
+    """Baca sidecar Parquet bila masih sesuai dengan file sumber"""
+    path = sidecar_path(file_path)
+    if not os.path.exists(path):
+        return None, None
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None, None
+
+    try:
+        meta = pq.read_schema(path).metadata or {}
+        source = meta.get(_META_KEY, b'').decode().split(':')
+        mtime_ns, size, fingerprint = int(source[0]), int(source[1]), source[2]
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+    if (mtime_ns, size) != signature:
+        if size != signature[1] or file_hash(file_path) != fingerprint:
+            return None, None
+
+    data = pd.read_parquet(path)
+    return apply_schema(data), fingerprint
+
+
+def _write_sidecar(file_path, data, signature, fingerprint):
+    """Tulis sidecar Parquet secara atomik; dilewati bila pyarrow tidak ada"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return
+
+    path = sidecar_path(file_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    source = f"{signature[0]}:{signature[1]}:{fingerprint}".encode()
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: source})
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def manifest_path(store_dir):
+    return os.path.join(store_dir, MANIFEST_NAME)
+
+
+def empty_manifest():
+    return {'version': 1, 'fingerprint': None, 'routes': [], 'sources': {}, 'parts': [], 'totals': None}
+
+
+def read_manifest(store_dir):
+    """Manifest store survei terpartisi (lihat ingest.py); store baru = manifest kosong"""
+    path = manifest_path(store_dir)
+    if not os.path.exists(path):
+        return empty_manifest()
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _store_signature(store_dir):
+    path = manifest_path(store_dir)
+    return file_signature(path) if os.path.exists(path) else None
+
+
+def _read_part(store_dir, part, routes):
+    """Baca satu part Parquet dan tambahkan kolom partisi Route/Survey Date"""
+    data = apply_schema(pd.read_parquet(os.path.join(store_dir, part['path'])))
+    codes = np.full(len(data), routes.index(part['route']), dtype='int32')
+    data['Route'] = pd.Categorical.from_codes(codes, categories=routes)
+    data['Survey Date'] = pd.Timestamp(part['date'])
+    return data
+
+
+def load_store(store_dir):
+    """Load store survei terpartisi.
+
+    Manifest hanya bertambah, jadi bila part lama masih menjadi prefix dari
+    manifest baru, hanya part baru yang dibaca lalu disambung ke frame lama.
+    """
+    with _lock:
+        return _load_store(store_dir)
+
+
+def _load_store(store_dir):
+    key = os.path.abspath(store_dir)
+    signature = _store_signature(key)
+
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[2]
+
+    manifest = read_manifest(key)
+    routes = manifest['routes']
+    parts = manifest['parts']
+    if cached is not None and cached[3]['parts'] == parts[:len(cached[3]['parts'])]:
+        base = cached[2]
+        if list(base['Route'].cat.categories) != routes:
+            base = base.assign(Route=base['Route'].cat.set_categories(routes))
+        new_parts = parts[len(cached[3]['parts']):]
+    else:
+        base, new_parts = None, parts
+    with instrument.span('read_parts', parts=len(new_parts)):
+        frames = [_read_part(key, part, routes) for part in new_parts]
+    if base is not None:
+        frames.insert(0, base)
+
+    if not frames:
+        data = apply_schema(pd.DataFrame(columns=list(SCHEMA)))
+        data['Route'] = pd.Categorical([], categories=routes)
+        data['Survey Date'] = pd.Series(dtype='datetime64[ns]')
+    elif len(frames) == 1:
+        data = frames[0]
+    else:
+        data = pd.concat(frames, ignore_index=True)
+
+    _cache[key] = (signature, manifest['fingerprint'], data, manifest)
+    _update_resident()
+    return data
+
+
+def survey_mask(data, survey):
+    """Mask baris survei terpilih: LATEST_SURVEY (survei terakhir per rute) atau tanggal 'YYYY-MM-DD'"""
+    dates = data['Survey Date'].to_numpy()
+    if survey != LATEST_SURVEY:
+        return dates == np.datetime64(survey)
+    if 'Route' not in data:
+        return dates == dates.max() if len(dates) else np.zeros(0, dtype=bool)
+    codes = data['Route'].cat.codes.to_numpy()
+    latest = pd.Series(dates).groupby(codes).transform('max').to_numpy()
+    return dates == latest
+
+
+def store_manifest(store_dir):
+    """Manifest yang sedang di-cache untuk store (None bila belum dimuat)"""
+    cached = _cache.get(os.path.abspath(store_dir))
+    return cached[3] if cached is not None and len(cached) > 3 else None
+
+
+def is_stale(file_path):
+    """True bila file/store sumber berubah sejak terakhir dimuat"""
+    key = os.path.abspath(file_path)
+    cached = _cache.get(key)
+    if cached is None:
+        return True
+    try:
+        signature = _store_signature(key) if os.path.isdir(key) else file_signature(key)
+    except FileNotFoundError:
+        return True
+    return signature != cached[0]
+
+
+def load_dataset(file_path):
+    """Load data survei dengan cache memori dan sidecar Parquet bertipe tetap.
+
+    Direktori dianggap store survei terpartisi hasil ingest.py.
+    """
+    with _lock:
+        if os.path.isdir(file_path):
+            return _load_store(file_path)
+        return _load_file(file_path)
+
+
+def _load_file(file_path):
+    key = os.path.abspath(file_path)
+    signature = file_signature(key)
+
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[2]
+
+    with instrument.span('read_sidecar'):
+        data, fingerprint = _read_sidecar(key, signature)
+    if data is None:
+        with instrument.span('file_hash'):
+            fingerprint = file_hash(key)
+        if cached is not None and cached[1] == fingerprint:
+            _cache[key] = (signature, fingerprint, cached[2])
+            return cached[2]
+        with instrument.span('read_csv'):
+            data = read_csv_typed(key)
+        with instrument.span('write_sidecar'):
+            _write_sidecar(key, data, signature, fingerprint)
+
+    _cache[key] = (signature, fingerprint, data)
+    _update_resident()
+    return data
+
+
+def dataset_fingerprint(file_path):
+    """Fingerprint isi dataset yang sedang di-cache (None bila belum dimuat)"""
+    cached = _cache.get(os.path.abspath(file_path))
+    return cached[1] if cached is not None else None
+
+
+def _update_resident():
+    """Catat dataset yang di-cache sebagai memori resident di shared_cache (ikut MAX_BYTES)"""
+    frames = [entry[2] for entry in _cache.values()]
+    shared_cache.set_resident('dataset', sum(int(frame.memory_usage(index=True, deep=True).sum())
+                                             for frame in frames), frames)
+
+
+def clear_cache():
+    _cache.clear()
+    _update_resident()
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+
+
+# Jumlah titik maksimum per grafik garis sepanjang chainage.
+LINE_POINT_BUDGET = int(os.environ.get('ROAD_LINE_POINT_BUDGET', 2000))
+
+
+def _bucket_edges(n, n_buckets):
+    return np.linspace(0, n, n_buckets + 1).astype('int64')
+
+
+def _first_match_per_bucket(hit, bucket_id, n_buckets):
+    """Indeks pertama yang hit di setiap bucket (-1 bila tidak ada)"""
+    idx = np.flatnonzero(hit)
+    result = np.full(n_buckets, -1, dtype='int64')
+    buckets, first = np.unique(bucket_id[idx], return_index=True)
+    result[buckets] = idx[first]
+    return result
+
+
+def minmax_indices(y, budget=LINE_POINT_BUDGET):
+    """Indeks titik hasil min/max bucketing.
+
+    Data (terurut menurut x) dibagi ke (budget-2)/2 bucket berukuran sama; dari
+    tiap bucket diambil titik minimum dan maksimum, ditambah titik pertama
+    dan terakhir. Semua puncak lokal yang menjadi maksimum bucket-nya pasti
+    ikut, sehingga puncak global tidak pernah hilang.
+    """
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    n_buckets = max(1, (budget - 2) // 2)
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    bucket_id = np.repeat(np.arange(n_buckets), sizes)
+
+    y_max = np.fmax.reduceat(y, starts)
+    y_min = np.fmin.reduceat(y, starts)
+    argmax = _first_match_per_bucket(y == y_max[bucket_id], bucket_id, n_buckets)
+    argmin = _first_match_per_bucket(y == y_min[bucket_id], bucket_id, n_buckets)
+
+    keep = np.concatenate(([0, n - 1], argmax, argmin))
+    return np.unique(keep[keep >= 0])
+
+
+def lttb_indices(x, y, budget=LINE_POINT_BUDGET):
+    """Indeks titik hasil Largest-Triangle-Three-Buckets (Steinarsson, 2013)"""
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, budget - 1).astype('int64')
+    keep = np.empty(budget, dtype='int64')
+    keep[0] = 0
+    keep[-1] = n - 1
+    selected = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        selected = lo + int(np.argmax(area))
+        keep[i + 1] = selected
+    return keep
+
+
+def downsample(data, x, y, budget=LINE_POINT_BUDGET, method='minmax'):
+    """Baris data yang dipertahankan untuk grafik garis y terhadap x"""
+    if len(data) <= budget:
+        return data
+    if not data[x].is_monotonic_increasing:
+        data = data.sort_values(x, kind='stable')
+    if method == 'lttb':
+        idx = lttb_indices(data[x].to_numpy(), data[y].to_numpy(), budget)
+    else:
+        idx = minmax_indices(data[y].to_numpy(), budget)
+    return data.iloc[idx]
@@ -0,0 +1,134 @@
+import tempfile
+
+import numpy as np
+
+
+# format -> (label, mime, ekstensi)
+FORMATS = {
+    'csv': ('CSV', 'text/csv', '.csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet', '.parquet'),
+    'geojson_points': ('GeoJSON (titik)', 'application/geo+json', '.geojson'),
+    'geojson_lines': ('GeoJSON (garis chainage)', 'application/geo+json', '.geojson'),
+}
+
+CHUNK_ROWS = 20_000
+# Fitur GeoJSON dirakit sebagai string per baris, jadi chunk-nya lebih kecil.
+GEOJSON_CHUNK_ROWS = 5_000
+# File ekspor di memori sampai ukuran ini, selebihnya di-spill ke disk.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _row_count(data, rows):
+    return len(data) if rows is None else len(rows)
+
+
+def _column(data, column, rows):
+    values = data[column].to_numpy()
+    return values if rows is None else values[rows]
+
+
+def _chunks(data, chunk_rows, rows=None):
+    """Potongan baris data; rows (posisi iloc) dibaca per chunk, bukan disalin sekaligus"""
+    for start in range(0, _row_count(data, rows), chunk_rows):
+        if rows is None:
+            yield data.iloc[start:start + chunk_rows]
+        else:
+            yield data.iloc[rows[start:start + chunk_rows]]
+
+
+def iter_csv(data, chunk_rows=CHUNK_ROWS, rows=None):
+    """CSV dalam potongan bytes; header sekali di awal"""
+    yield data.iloc[:0].to_csv(index=False).encode()
+    for chunk in _chunks(data, chunk_rows, rows):
+        yield chunk.to_csv(index=False, header=False).encode()
+
+
+def _line_ends(data, rows=None):
+    """Posisi titik akhir garis per segmen: segmen berikutnya bila bersambung, -1 bila tidak"""
+    n = _row_count(data, rows)
+    start = _column(data, 'Start Point (m)', rows)
+    end = _column(data, 'End Point (m)', rows)
+    nxt = np.arange(1, n + 1)
+    joined = np.zeros(n, dtype=bool)
+    joined[:-1] = start[1:] == end[:-1]
+    if 'Route' in data:
+        route = data['Route'].cat.codes.to_numpy()
+        route = route if rows is None else route[rows]
+        joined[:-1] &= route[1:] == route[:-1]
+    return np.where(joined, nxt, -1)
+
+
+def iter_geojson(data, lines=False, chunk_rows=GEOJSON_CHUNK_ROWS, rows=None):
+    """FeatureCollection GeoJSON dalam potongan bytes.
+
+    lines=False: satu Point per segmen. lines=True: LineString dari titik
+    segmen ke titik segmen berikutnya sepanjang chainage; segmen tanpa
+    sambungan (akhir rute atau terpotong filter) tetap sebagai Point.
+    """
+    lat = _column(data, 'Latitude', rows)
+    lon = _column(data, 'Longitude', rows)
+    ends = _line_ends(data, rows) if lines else None
+
+    yield b'{"type": "FeatureCollection", "features": ['
+    first = True
+    for offset, chunk in zip(range(0, len(lat), chunk_rows), _chunks(data, chunk_rows, rows)):
+        properties = chunk.to_json(orient='records', lines=True, date_format='iso',
+                                double_precision=7).splitlines()
+        features = []
+        for i, props in enumerate(properties, start=offset):
+            point = f"[{lon[i]:.7f}, {lat[i]:.7f}]"
+            if lines and ends[i] >= 0:
+                geometry = f'{{"type": "LineString", "coordinates": [{point}, [{lon[ends[i]]:.7f}, {lat[ends[i]]:.7f}]]}}'
+            else:
+                geometry = f'{{"type": "Point", "coordinates": {point}}}'
+            features.append(f'{{"type": "Feature", "geometry": {geometry}, "properties": {props}}}')
+        yield (('' if first else ', ') + ', '.join(features)).encode()
+        first = False
+    yield b']}'
+
+
+def write_parquet(data, fileobj, chunk_rows=CHUNK_ROWS, rows=None):
+    """Parquet dengan satu row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for chunk in _chunks(data, chunk_rows, rows):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(fileobj, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        pq.write_table(pa.Table.from_pandas(data.iloc[:0], preserve_index=False), fileobj)
+    else:
+        writer.close()
+
+
+def write_export(data, fmt, fileobj, chunk_rows=None, rows=None):
+    """Tulis data (atau baris rows saja) ke fileobj dalam format fmt, chunk demi chunk"""
+    if fmt == 'parquet':
+        write_parquet(data, fileobj, chunk_rows or CHUNK_ROWS, rows)
+        return
+    if fmt == 'csv':
+        parts = iter_csv(data, chunk_rows or CHUNK_ROWS, rows)
+    elif fmt in ('geojson_points', 'geojson_lines'):
+        parts = iter_geojson(data, lines=fmt == 'geojson_lines', chunk_rows=chunk_rows or GEOJSON_CHUNK_ROWS,
+                             rows=rows)
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {fmt}")
+    for part in parts:
+        fileobj.write(part)
+
+
+def export_bytes(data, fmt, chunk_rows=None, rows=None):
+    """Isi file ekspor data (baris rows, None = semua); dipanggil saat tombol unduh diklik.
+
+    Baris dibaca dan diserialisasi chunk demi chunk ke file sementara (spill
+    ke disk di atas SPOOL_MAX_BYTES), jadi selain hasil akhir hanya satu chunk
+    yang ada di memori. Hasil akhir tetap satu bytes utuh: st.download_button
+    hanya menerima bytes/file dan menyimpannya utuh di media storage Streamlit.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as fileobj:
+        write_export(data, fmt, fileobj, chunk_rows, rows)
+        fileobj.seek(0)
+        return fileobj.read()
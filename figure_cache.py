@@ -0,0 +1,42 @@
+import json
+
+import shared_cache
+from lazy import lazy_import
+
+pio = lazy_import('plotly.io')
+
+
+CACHE_SIZE = 1024
+
+# Figure/peta disimpan sebagai string JSON sehingga ukurannya bisa dihitung dan
+# tidak ada objek Plotly/folium yang ikut tertahan di memori. Ukurannya ikut
+# batas memori bersama shared_cache.MAX_BYTES.
+_cache = shared_cache.SharedCache('figure', CACHE_SIZE)
+
+
+def get_cache():
+    return _cache
+
+
+def get_figure(key, build):
+    """Figure Plotly dari cache; build() hanya dipanggil saat miss"""
+    if key is None:
+        return build()
+    value = _cache.get(key)
+    if value is not None:
+        return pio.from_json(value, skip_invalid=True)
+    fig = build()
+    _cache.put(key, fig.to_json())
+    return fig
+
+
+def get_json(key, build):
+    """Objek JSON (mis. FeatureCollection peta) dari cache; build() saat miss"""
+    if key is None:
+        return build()
+    value = _cache.get(key)
+    if value is not None:
+        return json.loads(value)
+    obj = build()
+    _cache.put(key, json.dumps(obj, separators=(',', ':')))
+    return obj
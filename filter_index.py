@@ -0,0 +1,170 @@
+import threading
+import weakref
+
+import numpy as np
+
+import shared_cache
+
+
+class _RangeIndex:
+    """Urutan baris terurut menurut satu kolom numerik"""
+
+    def __init__(self, values):
+        self.values = values
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+
+    def span(self, lo, hi):
+        """Rentang [a, b) pada urutan terurut untuk lo <= nilai <= hi"""
+        if np.issubdtype(self.sorted_values.dtype, np.floating):
+            # Bandingkan dalam dtype kolom, sama seperti perbandingan Series biasa.
+            cast = self.sorted_values.dtype.type
+            lo = None if lo is None else cast(lo)
+            hi = None if hi is None else cast(hi)
+        a = 0 if lo is None else np.searchsorted(self.sorted_values, lo, side='left')
+        b = len(self.sorted_values) if hi is None else np.searchsorted(self.sorted_values, hi, side='right')
+        return a, max(a, b)
+
+    def contains(self, positions, lo, hi):
+        values = self.values[positions]
+        mask = np.ones(len(positions), dtype=bool)
+        if lo is not None:
+            mask &= values >= lo
+        if hi is not None:
+            mask &= values <= hi
+        return mask
+
+
+class FilterIndex:
+    """Index filter untuk satu DataFrame.
+
+    Range query memakai binary search pada kolom yang sudah diurutkan, kondisi
+    memakai bitmap baris per kategori. Dimensi filter tambahan cukup dipanggil
+    lewat ``query(ranges=...)``; index kolomnya dibangun sekali saat pertama
+    dipakai, dan hanya dimensi paling selektif yang dipindai dari urutannya.
+    """
+
+    def __init__(self, data, category_column='Roughness Condition', range_columns=('IRI (m/km)',)):
+        self._data = weakref.ref(data)
+        self.n = len(data)
+        self._ranges = {}
+        for column in range_columns:
+            self.range_index(column)
+
+        categorical = data[category_column].astype('category')
+        codes = categorical.cat.codes.to_numpy()
+        self.categories = list(categorical.cat.categories)
+        self._bitmaps = {cat: np.packbits(codes == i) for i, cat in enumerate(self.categories)}
+
+    def range_index(self, column):
+        index = self._ranges.get(column)
+        if index is None:
+            index = _RangeIndex(self._data()[column].to_numpy())
+            self._ranges[column] = index
+            _update_resident()
+        return index
+
+    @property
+    def nbytes(self):
+        """Byte urutan range index dan bitmap kategori (array nilai kolom milik dataset)"""
+        ranges = sum(index.order.nbytes + index.sorted_values.nbytes for index in self._ranges.values())
+        return ranges + sum(bitmap.nbytes for bitmap in self._bitmaps.values())
+
+    def category_bitmap(self, categories):
+        """Bitmap (packed) baris dengan kategori di dalam categories"""
+        bitmap = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        for cat in categories:
+            if cat in self._bitmaps:
+                bitmap |= self._bitmaps[cat]
+        return bitmap
+
+    def query(self, ranges=None, categories=None):
+        """Posisi baris (terurut naik) yang lolos filter; None berarti semua baris.
+
+        ranges: dict kolom -> (lo, hi), batas inklusif, None = tanpa batas.
+        categories: daftar kategori yang diterima, None = semua.
+        """
+        spans = []
+        for column, (lo, hi) in (ranges or {}).items():
+            index = self.range_index(column)
+            a, b = index.span(lo, hi)
+            if b - a < self.n:
+                spans.append((b - a, column, index, a, b, lo, hi))
+
+        bitmap = None
+        if categories is not None and not set(self.categories) <= set(categories):
+            bitmap = self.category_bitmap(categories)
+
+        if not spans and bitmap is None:
+            return None
+
+        spans.sort(key=lambda span: span[0])
+        bitmap_count = None if bitmap is None else int(np.unpackbits(bitmap, count=self.n).sum())
+
+        if spans and (bitmap_count is None or spans[0][0] <= bitmap_count):
+            _, _, index, a, b, _, _ = spans.pop(0)
+            positions = index.order[a:b]
+        else:
+            positions = np.flatnonzero(np.unpackbits(bitmap, count=self.n))
+            bitmap = None
+
+        for _, _, index, _, _, lo, hi in spans:
+            positions = positions[index.contains(positions, lo, hi)]
+        if bitmap is not None:
+            bits = (bitmap[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1
+            positions = positions[bits.astype(bool)]
+
+        if len(positions) > self.n // 16:
+            # Untuk hasil besar, scatter ke mask O(n) lebih murah daripada sort O(k log k).
+            mask = np.zeros(self.n, dtype=bool)
+            mask[positions] = True
+            return np.flatnonzero(mask)
+        return np.sort(positions)
+
+
+PARTITION_COLUMNS = ('Route', 'Survey Date')
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_index(data):
+    """FilterIndex untuk objek DataFrame ini, dibangun sekali (dipakai bersama semua sesi)"""
+    with _lock:
+        entry = _indexes.get(id(data))
+        if entry is not None and entry[0]() is data:
+            return entry[1]
+
+        index = FilterIndex(data)
+        key = id(data)
+        _indexes[key] = (weakref.ref(data, lambda _: _forget(key)), index)
+    _update_resident()
+    return index
+
+
+def _forget(key):
+    _indexes.pop(key, None)
+    _update_resident()
+
+
+def _update_resident():
+    """Catat ukuran semua FilterIndex sebagai memori resident di shared_cache"""
+    shared_cache.set_resident('filter_index', sum(index.nbytes for _, index in list(_indexes.values())))
+
+
+def take(data, positions, columns=None):
+    """Baris pada positions, hanya kolom columns (None = semua kolom).
+
+    positions None = semua baris; potongan kontigu memakai slice. Pilihan kolom
+    berbagi buffer dengan data (copy-on-write), jadi yang disalin hanya kolom
+    yang dipakai pada baris yang lolos. Kolom partisi (Route, Survey Date)
+    selalu ikut bila ada.
+    """
+    if columns is not None:
+        data = data[list(columns) + [col for col in PARTITION_COLUMNS if col in data and col not in columns]]
+    if positions is None:
+        return data
+    if len(positions) == 0 or positions[-1] - positions[0] + 1 == len(positions):
+        start = positions[0] if len(positions) else 0
+        return data.iloc[start:start + len(positions)]
+    return data.iloc[positions]
@@ -0,0 +1,253 @@
+"""Ingest log survei CSV ke store Parquet terpartisi per rute dan tanggal survei.
+
+Contoh:
+    python ingest.py --store survey_store logs/ring-road_2024-05-01.csv
+    python ingest.py --store survey_store --watch incoming/ --interval 10
+
+File dibaca per chunk sehingga memori tetap terbatas berapa pun ukurannya.
+Setiap chunk divalidasi dan di-cast ke data_store.SCHEMA, lalu ditulis sebagai
+part Parquet di <store>/route=<rute>/date=<YYYY-MM-DD>/. Manifest hanya
+bertambah (append-only) dan ditulis ulang secara atomik setelah semua part
+sebuah file selesai, jadi dashboard tidak pernah melihat file setengah jadi.
+Diasumsikan hanya ada satu penulis (satu proses ingest/watch) per store.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import date as Date
+
+import pandas as pd
+
+import data_store
+from summary import METRIC_COLUMNS
+
+
+STORE_DIR = os.environ.get('ROAD_STORE_DIR', 'survey_store')
+CHUNK_ROWS = int(os.environ.get('ROAD_INGEST_CHUNK_ROWS', 250_000))
+
+NUMERIC_COLUMNS = [col for col in data_store.SCHEMA if col != 'Roughness Condition']
+
+# Nama file log van survei: <rute>_<YYYY-MM-DD>.csv atau <rute>-<YYYYMMDD>.csv
+_NAME_PATTERN = re.compile(r'^(?P<route>.+?)[_-](?P<date>\d{4}-?\d{2}-?\d{2})$')
+
+
+def partition_for(file_path, route=None, survey_date=None):
+    """(rute, tanggal ISO) partisi: argumen eksplisit, pola nama file, atau nama file + mtime"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    match = _NAME_PATTERN.match(stem)
+    if route is None:
+        route = match.group('route') if match else stem
+    if survey_date is None:
+        if match:
+            survey_date = match.group('date')
+        else:
+            survey_date = Date.fromtimestamp(os.stat(file_path).st_mtime)
+    route = re.sub(r'[^A-Za-z0-9_.-]+', '-', str(route)).strip('-') or 'rute'
+    return route, pd.Timestamp(survey_date).date().isoformat()
+
+
+def validate_chunk(chunk):
+    """Cast satu chunk ke SCHEMA; baris kosong/tidak valid dibuang.
+
+    Mengembalikan (data, jumlah baris ditolak).
+    """
+    frame = pd.DataFrame({col: pd.to_numeric(chunk[col], errors='coerce') for col in NUMERIC_COLUMNS})
+    frame['Roughness Condition'] = chunk['Roughness Condition'].astype(data_store.KONDISI_DTYPE)
+    valid = frame.notna().all(axis=1) & (frame['End Point (m)'] > frame['Start Point (m)'])
+    return frame.loc[valid, list(data_store.SCHEMA)].astype(data_store.SCHEMA), int((~valid).sum())
+
+
+def part_stats(data):
+    """Agregat part yang bisa digabung: jumlah per kondisi, rentang chainage, count/sum/min/max per metrik"""
+    kondisi = data['Roughness Condition'].value_counts(sort=False)
+    metrics = {}
+    for col in METRIC_COLUMNS:
+        values = data[col].to_numpy(dtype='float64')
+        metrics[col] = {'count': len(values), 'sum': float(values.sum()),
+                        'min': float(values.min()), 'max': float(values.max())}
+    return {
+        'rows': len(data),
+        'kondisi': {k: int(v) for k, v in kondisi.items()},
+        'start_min': int(data['Start Point (m)'].min()),
+        'end_max': int(data['End Point (m)'].max()),
+        'metrics': metrics,
+    }
+
+
+def merge_stats(a, b):
+    """Gabungkan dua agregat part_stats (a boleh None)"""
+    if a is None:
+        return b
+    return {
+        'rows': a['rows'] + b['rows'],
+        'kondisi': {k: a['kondisi'].get(k, 0) + b['kondisi'].get(k, 0) for k in data_store.KONDISI_ORDER},
+        'start_min': min(a['start_min'], b['start_min']),
+        'end_max': max(a['end_max'], b['end_max']),
+        'metrics': {
+            col: {
+                'count': a['metrics'][col]['count'] + b['metrics'][col]['count'],
+                'sum': a['metrics'][col]['sum'] + b['metrics'][col]['sum'],
+                'min': min(a['metrics'][col]['min'], b['metrics'][col]['min']),
+                'max': max(a['metrics'][col]['max'], b['metrics'][col]['max']),
+            }
+            for col in METRIC_COLUMNS
+        },
+    }
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_manifest(store_dir, manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+    _write_atomic(data_store.manifest_path(store_dir), write)
+
+
+def _chain_fingerprint(previous, part_paths):
+    """Fingerprint store baru = hash(fingerprint lama + part baru)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update((previous or '').encode())
+    for path in part_paths:
+        h.update(path.encode())
+    return h.hexdigest()
+
+
+def ingest_file(file_path, store_dir=STORE_DIR, route=None, survey_date=None, chunk_rows=CHUNK_ROWS):
+    """Append satu CSV survei ke store. Mengembalikan entri source di manifest.
+
+    File dengan isi yang sama (hash) dengan file yang sudah di-ingest dilewati.
+    File di path yang sama yang isinya berubah (diedit atau bertambah) setelah
+    di-ingest ke partisi yang sama ditolak, karena part lamanya tidak dihapus
+    dan segmennya akan terhitung dua kali.
+    """
+    source = os.path.abspath(file_path)
+    signature = data_store.file_signature(source)
+    digest = data_store.file_hash(source)
+    manifest = data_store.read_manifest(store_dir)
+    if digest in manifest['sources']:
+        return dict(manifest['sources'][digest], skipped=True)
+
+    header = pd.read_csv(source, nrows=0, skipinitialspace=True).columns
+    missing = [col for col in data_store.SCHEMA if col not in header]
+    if missing:
+        raise ValueError(f"{file_path}: kolom tidak ditemukan: {', '.join(missing)}")
+
+    route, survey_date = partition_for(source, route, survey_date)
+    for previous in manifest['sources'].values():
+        if previous['path'] == source and (previous['route'], previous['date']) == (route, survey_date):
+            raise ValueError(f"{file_path}: isi berubah sejak di-ingest ke route={route}/date={survey_date}; "
+                             "simpan sebagai file survei baru")
+    partition = f"route={route}/date={survey_date}"
+    os.makedirs(os.path.join(store_dir, partition), exist_ok=True)
+
+    parts = []
+    rows = rejected = 0
+    reader = pd.read_csv(source, usecols=list(data_store.SCHEMA), chunksize=chunk_rows,
+                         dtype={'Roughness Condition': 'string'}, skipinitialspace=True)
+    for i, chunk in enumerate(reader):
+        data, bad = validate_chunk(chunk)
+        rejected += bad
+        if not len(data):
+            continue
+        path = f"{partition}/part-{digest[:12]}-{i:05d}.parquet"
+        _write_atomic(os.path.join(store_dir, path),
+                      lambda tmp_path: data.to_parquet(tmp_path, index=False))
+        parts.append({'path': path, 'route': route, 'date': survey_date, 'source': digest,
+                      'stats': part_stats(data)})
+        rows += len(data)
+
+    entry = {'path': source, 'signature': list(signature), 'route': route, 'date': survey_date,
+             'rows': rows, 'rejected': rejected, 'ingested_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    manifest['sources'][digest] = entry
+    manifest['parts'].extend(parts)
+    if parts and route not in manifest['routes']:
+        manifest['routes'].append(route)
+    for part in parts:
+        manifest['totals'] = merge_stats(manifest['totals'], part['stats'])
+    manifest['fingerprint'] = _chain_fingerprint(manifest['fingerprint'], [part['path'] for part in parts])
+    write_manifest(store_dir, manifest)
+    return entry
+
+
+def watch(directory, store_dir=STORE_DIR, interval=10.0, pattern='*.csv', once=False):
+    """Pantau direktori dan ingest file baru.
+
+    File baru di-ingest setelah (mtime, ukuran)-nya stabil selama satu interval,
+    supaya log yang masih disalin tidak terbaca setengah. File dilacak per path:
+    file yang berubah setelah di-ingest ditolak oleh ingest_file (sekali, tidak
+    diulang setiap interval).
+    """
+    manifest = data_store.read_manifest(store_dir)
+    done = {entry['path']: tuple(entry['signature']) for entry in manifest['sources'].values()}
+    pending = {}
+    while True:
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            path = os.path.abspath(path)
+            try:
+                signature = data_store.file_signature(path)
+            except FileNotFoundError:
+                continue
+            if done.get(path) == signature:
+                continue
+            if pending.get(path) != signature and not once:
+                pending[path] = signature
+                continue
+            pending.pop(path, None)
+            try:
+                report(path, ingest_file(path, store_dir))
+            except (ValueError, pd.errors.ParserError) as e:
+                print(f"{path}: gagal di-ingest: {e}", file=sys.stderr)
+            done[path] = signature
+        if once:
+            return
+        time.sleep(interval)
+
+
+def report(path, entry):
+    if entry.get('skipped'):
+        print(f"{path}: sudah ada di store (sama dengan {entry['path']}), dilewati")
+    else:
+        print(f"{path}: {entry['rows']} segmen -> route={entry['route']}/date={entry['date']}"
+              f" ({entry['rejected']} baris ditolak)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--route', help='rute untuk semua file (default: dari nama file)')
+    parser.add_argument('--date', help='tanggal survei YYYY-MM-DD (default: dari nama file)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--watch', metavar='DIR', help='pantau direktori untuk file CSV baru')
+    parser.add_argument('--interval', type=float, default=10.0)
+    args = parser.parse_args()
+
+    os.makedirs(args.store, exist_ok=True)
+    for file_path in args.files:
+        report(file_path, ingest_file(file_path, args.store, args.route, args.date, args.chunk_rows))
+    if args.watch:
+        print(f"Memantau {args.watch} setiap {args.interval:g} s (Ctrl+C untuk berhenti)")
+        try:
+            watch(args.watch, args.store, args.interval)
+        except KeyboardInterrupt:
+            pass
+    elif not args.files:
+        parser.error('berikan file CSV atau --watch DIR')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
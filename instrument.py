@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# ROAD_PERF=0 mematikan semua span (tanpa biaya selain satu pengecekan).
+ENABLED = os.environ.get('ROAD_PERF', '1') != '0'
+# Jumlah trace terakhir (seluruh proses) yang disimpan untuk panel dan ekspor.
+HISTORY_SIZE = int(os.environ.get('ROAD_PERF_HISTORY', 500))
+
+logger = logging.getLogger('road_dashboard.perf')
+
+_local = threading.local()
+_history = deque(maxlen=HISTORY_SIZE)
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes():
+    """RSS proses saat ini dari /proc (Linux); None bila tidak tersedia"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _page_size
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Span:
+    """Satu tahap yang diukur: durasi, selisih RSS dan ukuran payload (opsional)"""
+
+    __slots__ = ('name', 'attrs', 'depth', 'start', 'seconds', 'rss_delta', 'payload_bytes')
+
+    def __init__(self, name, attrs, depth, start):
+        self.name = name
+        self.attrs = attrs
+        self.depth = depth
+        self.start = start
+        self.seconds = None
+        self.rss_delta = None
+        self.payload_bytes = None
+
+    def set_payload(self, size):
+        self.payload_bytes = None if size is None else int(size)
+
+    def as_dict(self, origin):
+        return {
+            'name': self.name,
+            'depth': self.depth,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'ms': round(self.seconds * 1000, 3),
+            'rss_delta': self.rss_delta,
+            'payload_bytes': self.payload_bytes,
+            **self.attrs,
+        }
+
+
+class _NullSpan:
+    def set_payload(self, size):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Ukur satu tahap di dalam trace aktif thread ini; tanpa trace aktif tidak mencatat apa pun"""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield _NULL_SPAN
+        return
+    stack = trace['stack']
+    current = Span(name, attrs, len(stack), time.perf_counter())
+    stack.append(current)
+    rss = rss_bytes()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - current.start
+        after = rss_bytes()
+        current.rss_delta = None if rss is None or after is None else after - rss
+        stack.pop()
+        trace['spans'].append(current)
+
+
+@contextmanager
+def trace(name, **attrs):
+    """Trace akar (satu rerun, satu ekspor, ...) yang mengumpulkan span di thread ini.
+
+    Saat selesai, trace disimpan di riwayat proses dan ditulis ke logger
+    'road_dashboard.perf' sebagai satu baris JSON. Hasilnya (dict) tersedia
+    lewat .record objek yang di-yield.
+    """
+    if not ENABLED:
+        yield _Trace(None)
+        return
+    state = {'spans': [], 'stack': [], 'attrs': dict(attrs)}
+    previous = getattr(_local, 'trace', None)
+    _local.trace = state
+    handle = _Trace(state)
+    wall = time.time()
+    rss = rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        seconds = time.perf_counter() - start
+        _local.trace = previous
+        after = rss_bytes()
+        record = {
+            'trace': name,
+            'time': wall,
+            'ms': round(seconds * 1000, 3),
+            'rss_bytes': after,
+            'rss_delta': None if rss is None or after is None else after - rss,
+            **state['attrs'],
+            'spans': [s.as_dict(start) for s in sorted(state['spans'], key=lambda s: s.start)],
+        }
+        handle.record = record
+        _history.append(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, default=str))
+
+
+class _Trace:
+    def __init__(self, state):
+        self._state = state
+        self.record = None
+
+    def annotate(self, **attrs):
+        """Tambahkan atribut ke trace (mis. tampilan yang dipilih)"""
+        if self._state is not None:
+            self._state['attrs'].update(attrs)
+
+
+def history(name=None):
+    """Trace terakhir di proses ini (terlama dulu), opsional hanya trace bernama name"""
+    records = list(_history)
+    return records if name is None else [r for r in records if r['trace'] == name]
+
+
+def span_stats(records):
+    """{nama span: {count, p50_ms, p95_ms, max_ms}} dari daftar trace"""
+    durations = {}
+    for record in records:
+        for s in record['spans']:
+            durations.setdefault(s['name'], []).append(s['ms'])
+    stats = {}
+    for name, values in durations.items():
+        values = np.asarray(values)
+        stats[name] = {
+            'count': len(values),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'max_ms': float(values.max()),
+        }
+    return stats
+
+
+def export_jsonl(records=None):
+    """Riwayat trace sebagai JSON Lines (satu trace per baris)"""
+    records = history() if records is None else records
+    return ''.join(json.dumps(record, default=str) + '\n' for record in records)
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+import shared_cache
+from summary import PRIORITIES, PRIORITY_EDGES
+
+
+# Segmen berprioritas sama yang terpisah celah <= toleransi ini digabung jadi satu paket.
+DEFAULT_GAP_M = 0
+# Paket dihitung per rute dan per survei (kolom yang tidak ada dilewati).
+GROUP_COLUMNS = ('Route', 'Survey Date')
+PACKAGE_COLUMNS = ['Prioritas', 'Start Point (m)', 'End Point (m)', 'Jumlah Segmen', 'Panjang (m)',
+                   'IRI Rata-rata (m/km)', 'IRI Maks (m/km)']
+
+CACHE_SIZE = 32
+
+_packages = shared_cache.SharedCache('intervals', CACHE_SIZE)
+
+
+def _group_codes(data, columns):
+    """Kode grup gabungan (int64) untuk kolom grup yang ada di data"""
+    columns = [column for column in columns if column in data]
+    if not columns:
+        return np.zeros(len(data), dtype='int64'), columns
+    return data.groupby(columns, observed=True, sort=False).ngroup().to_numpy(dtype='int64'), columns
+
+
+def repair_packages(data, gap_m=DEFAULT_GAP_M, by=GROUP_COLUMNS):
+    """Paket perbaikan: segmen berurutan dengan prioritas IRI sama dalam satu rute/survei.
+
+    Satu lexsort (grup, prioritas, Start Point), lalu paket baru dimulai bila
+    Start Point melewati End Point terjauh paket berjalan + gap_m. Panjang
+    paket adalah jumlah panjang segmennya, bukan rentang awal-akhir, jadi
+    celah yang ditoleransi tidak ikut dihitung.
+    """
+    iri = data['IRI (m/km)'].to_numpy(dtype='float64')
+    bucket = np.digitize(iri, PRIORITY_EDGES, right=True)
+    bucket[np.isnan(iri)] = 0
+    rows = np.flatnonzero(bucket > 0)
+    groups, group_columns = _group_codes(data, by)
+
+    start = data['Start Point (m)'].to_numpy(dtype='float64')[rows]
+    end = data['End Point (m)'].to_numpy(dtype='float64')[rows]
+    iri, bucket, groups = iri[rows], bucket[rows], groups[rows]
+    order = np.lexsort((start, bucket, groups))
+    rows = rows[order]
+    start, end, iri, bucket, groups = start[order], end[order], iri[order], bucket[order], groups[order]
+
+    n = len(order)
+    if n == 0:
+        return pd.DataFrame(columns=group_columns + PACKAGE_COLUMNS)
+    # Geser tiap (grup, prioritas) sejauh width agar End Point terjauh bisa
+    # dihitung dengan satu cummax tanpa bocor ke grup sebelumnya.
+    run = np.r_[True, (groups[1:] != groups[:-1]) | (bucket[1:] != bucket[:-1])]
+    width = end.max() - start.min() + gap_m + 1
+    offset = np.cumsum(run) * width
+    reach = np.maximum.accumulate(end + offset) - offset
+    first = np.flatnonzero(run | np.r_[True, start[1:] > reach[:-1] + gap_m])
+
+    counts = np.diff(np.r_[first, n])
+    packages = pd.DataFrame({
+        'Prioritas': pd.Categorical.from_codes(bucket[first] - 1, categories=PRIORITIES),
+        'Start Point (m)': start[first],
+        'End Point (m)': np.maximum.reduceat(end, first),
+        'Jumlah Segmen': counts,
+        'Panjang (m)': np.add.reduceat(end - start, first),
+        'IRI Rata-rata (m/km)': (np.add.reduceat(iri, first) / counts).round(2),
+        'IRI Maks (m/km)': np.maximum.reduceat(iri, first),
+    })
+    if group_columns:
+        labels = data[group_columns].iloc[rows[first]].reset_index(drop=True)
+        packages = pd.concat([labels, packages], axis=1)
+    return packages
+
+
+def package_summary(packages):
+    """{prioritas: {'packages', 'segments', 'length_m'}} dari frame repair_packages"""
+    grouped = packages.groupby('Prioritas', observed=False)
+    counts = grouped.size()
+    segments = grouped['Jumlah Segmen'].sum()
+    lengths = grouped['Panjang (m)'].sum()
+    return {
+        name: {
+            'packages': int(counts.get(name, 0)),
+            'segments': int(segments.get(name, 0)),
+            'length_m': float(lengths.get(name, 0.0)),
+        }
+        for name in PRIORITIES
+    }
+
+
+def get_packages(key, data, gap_m=DEFAULT_GAP_M):
+    """repair_packages untuk data, di-cache per key (dataset + filter) dan toleransi celah"""
+    return _packages.get_or_build(None if key is None else key + (gap_m,),
+                                  lambda: repair_packages(data, gap_m))
@@ -0,0 +1,270 @@
+"""Hitung IRI per segmen 100 m dari profil memanjang atau rekaman akselerometer.
+
+Contoh:
+    python iri_engine.py profil_ring-road.csv --out iri_ring-road.csv
+    python iri_engine.py akselerometer.csv --survey dummy_data_yogyakarta.csv --out survei_baru.csv --workers 4
+
+Masukan (CSV/Parquet), dideteksi dari kolomnya:
+  - profil: 'Distance (m)', 'Elevation (mm)'
+  - akselerometer: 'Time (s)', 'Acceleration (m/s2)', 'Speed (km/h)'
+Kolom 'Latitude', 'Longitude' dan 'Speed (km/h)' bersifat opsional untuk profil.
+
+IRI dihitung dengan model quarter-car Golden Car (ASTM E1926, Sayers 1995):
+profil diubah menjadi slope per 0.25 m, dihaluskan moving average 250 mm, lalu
+dilewatkan ke filter IIR hasil diskretisasi eksak model Golden Car pada
+80 km/h. Simulasi berjalan kontinu sepanjang rekaman (bukan per jendela), dan
+rectified slope dirata-ratakan per jendela 100 m sejajar chainage.
+"""
+import argparse
+import functools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import data_store
+from lazy import lazy_import
+
+scipy_linalg = lazy_import('scipy.linalg')
+scipy_signal = lazy_import('scipy.signal')
+
+
+# Parameter Golden Car ternormalisasi massa sprung (ASTM E1926).
+GOLDEN_CAR = {'k1': 653.0, 'k2': 63.3, 'c': 6.0, 'mu': 0.15}
+SIM_SPEED_KMH = 80.0
+SAMPLE_M = 0.25
+BASE_M = 0.25
+INIT_M = 11.0
+WINDOW_M = 100.0
+# Rekaman akselerometer: slope hasil integrasi di-high-pass di atas panjang gelombang ini
+# (rentang panjang gelombang yang relevan untuk IRI kira-kira 1.3-30 m).
+HIGHPASS_WAVELENGTH_M = 60.0
+MIN_SPEED_KMH = 5.0
+# Tiap chunk pool dimulai LEAD_IN_M sebelum jendela pertamanya agar state model sudah stabil.
+LEAD_IN_M = 50.0
+CHUNK_WINDOWS = 500
+
+PROFILE_COLUMNS = ['Distance (m)', 'Elevation (mm)']
+ACCELERATION_COLUMNS = ['Time (s)', 'Acceleration (m/s2)', 'Speed (km/h)']
+
+
+def golden_car_matrices(dx=SAMPLE_M, params=None, speed_kmh=SIM_SPEED_KMH):
+    """(ST, PR) diskret model Golden Car dengan input slope per langkah dx.
+
+    State berbentuk slope (Sayers): [z_s', z_s'', z_u', z_u''] / V; rectified
+    slope = |state[0] - state[2]|.
+    """
+    p = dict(GOLDEN_CAR, **(params or {}))
+    k1, k2, c, mu = p['k1'], p['k2'], p['c'], p['mu']
+    a = np.array([
+        [0.0, 1.0, 0.0, 0.0],
+        [-k2, -c, k2, c],
+        [0.0, 0.0, 0.0, 1.0],
+        [k2 / mu, c / mu, -(k1 + k2) / mu, -c / mu],
+    ])
+    b = np.array([0.0, 0.0, 0.0, k1 / mu])
+    dt = dx / (speed_kmh / 3.6)
+    st = scipy_linalg.expm(a * dt)
+    pr = np.linalg.solve(a, (st - np.eye(4)) @ b)
+    return st, pr
+
+
+@functools.lru_cache(maxsize=8)
+def golden_car_sos(dx=SAMPLE_M, speed_kmh=SIM_SPEED_KMH):
+    """Filter IIR (second-order sections) slope -> (z_s' - z_u'), identik dengan rekursi state"""
+    st, pr = golden_car_matrices(dx, speed_kmh=speed_kmh)
+    c = np.array([1.0, 0.0, -1.0, 0.0])
+    z, p, k = scipy_signal.ss2zpk(st, pr[:, None], (c @ st)[None, :], np.array([[c @ pr]]))
+    return scipy_signal.zpk2sos(z, p, k)
+
+
+def moving_average(values, n):
+    """Moving average n titik (terpusat ke belakang, panjang keluaran sama)"""
+    if n <= 1:
+        return values
+    csum = np.cumsum(np.r_[0.0, values])
+    out = np.empty_like(values, dtype='float64')
+    out[n - 1:] = (csum[n:] - csum[:-n]) / n
+    out[:n - 1] = csum[1:n] / np.arange(1, n)
+    return out
+
+
+def slopes_from_profile(distance, elevation_mm, dx=SAMPLE_M):
+    """(grid jarak, slope) dari profil elevasi, di-resample ke langkah dx dan dihaluskan 250 mm"""
+    grid = np.arange(distance[0], distance[-1], dx)
+    elevation = np.interp(grid, distance, np.asarray(elevation_mm, dtype='float64') / 1000.0)
+    # slope[i] = kemiringan interval (i-1, i); sampel pertama memakai interval pertama.
+    slope = np.diff(elevation) / dx
+    slope = np.r_[slope[:1], slope]
+    return grid, moving_average(slope, max(1, int(round(BASE_M / dx))))
+
+
+def travelled_distance(time, speed_kmh):
+    """Jarak tempuh (m) per sampel dari integral trapesium kecepatan"""
+    speed = np.asarray(speed_kmh, dtype='float64') / 3.6
+    return np.concatenate(([0.0], np.cumsum((speed[1:] + speed[:-1]) / 2 * np.diff(time))))
+
+
+def slopes_from_acceleration(time, acceleration, speed_kmh, dx=SAMPLE_M):
+    """(grid jarak, slope) dari akselerasi vertikal terhadap waktu dan kecepatan kendaraan.
+
+    Jarak = integral kecepatan. Slope profil = integral (a / v) dt, dihitung di
+    domain waktu sebelum di-resample ke grid jarak (integrasi sekaligus menjadi
+    anti-aliasing), lalu di-high-pass untuk membuang drift integrasi.
+    """
+    time = np.asarray(time, dtype='float64')
+    speed = np.asarray(speed_kmh, dtype='float64') / 3.6
+    distance = travelled_distance(time, speed_kmh)
+    moving = speed >= MIN_SPEED_KMH / 3.6
+    acceleration = np.asarray(acceleration, dtype='float64')
+    acceleration = acceleration - acceleration[moving].mean()
+    rate = np.where(moving, acceleration / np.maximum(speed, 1e-6), 0.0)
+    slope_t = np.concatenate(([0.0], np.cumsum((rate[1:] + rate[:-1]) / 2 * np.diff(time))))
+
+    keep = np.r_[True, np.diff(distance) > 0]
+    grid = np.arange(0.0, distance[-1], dx)
+    slope = np.interp(grid, distance[keep], slope_t[keep])
+    sos = scipy_signal.butter(2, 1.0 / HIGHPASS_WAVELENGTH_M, 'highpass', fs=1.0 / dx, output='sos')
+    if len(slope) > 3 * 2 * len(sos) + 1:
+        slope = scipy_signal.sosfiltfilt(sos, slope)
+    else:
+        slope = slope - slope.mean()
+    return grid, moving_average(slope, max(1, int(round(BASE_M / dx))))
+
+
+def rectified_slope(slope, dx=SAMPLE_M):
+    """|z_s' - z_u'| per sampel; state awal = slope rata-rata INIT_M pertama (ASTM E1926)"""
+    sos = golden_car_sos(dx)
+    n_init = max(1, min(len(slope), int(round(INIT_M / dx))))
+    zi = scipy_signal.sosfilt_zi(sos) * slope[:n_init].mean()
+    relative, _ = scipy_signal.sosfilt(sos, slope, zi=zi)
+    return np.abs(relative)
+
+
+def window_iri(grid, slope, dx=SAMPLE_M, window_m=WINDOW_M, first_window=None):
+    """(awal jendela m, IRI m/km, jumlah sampel) per jendela window_m sejajar chainage"""
+    rs = rectified_slope(slope, dx)
+    window = np.floor(grid / window_m).astype('int64')
+    if first_window is not None:
+        keep = window >= first_window
+        rs, window = rs[keep], window[keep]
+    if len(window) == 0:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype='int64')
+    starts = np.flatnonzero(np.r_[True, window[1:] != window[:-1]])
+    counts = np.diff(np.r_[starts, len(window)])
+    return window[starts] * window_m, np.add.reduceat(rs, starts) / counts * 1000.0, counts
+
+
+def _chunk_iri(args):
+    grid, slope, dx, window_m, first_window = args
+    return window_iri(grid, slope, dx, window_m, first_window)
+
+
+def compute_iri(grid, slope, dx=SAMPLE_M, window_m=WINDOW_M, workers=1, chunk_windows=CHUNK_WINDOWS):
+    """IRI per jendela untuk satu rekaman; rekaman panjang dibagi chunk ke process pool"""
+    if workers <= 1 or len(grid) * dx <= chunk_windows * window_m:
+        return window_iri(grid, slope, dx, window_m)
+
+    chunk_m = chunk_windows * window_m
+    first = np.floor(grid[0] / chunk_m) * chunk_m
+    jobs = []
+    for start in np.arange(first, grid[-1], chunk_m):
+        lo = np.searchsorted(grid, start - LEAD_IN_M)
+        hi = np.searchsorted(grid, start + chunk_m)
+        if hi > lo:
+            jobs.append((grid[lo:hi], slope[lo:hi], dx, window_m, int(round(start / window_m))))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_chunk_iri, jobs))
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def read_trace(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def trace_slopes(trace, dx=SAMPLE_M):
+    """(grid jarak, slope, chainage per sampel trace) sesuai jenis rekaman"""
+    if all(col in trace for col in PROFILE_COLUMNS):
+        distance = trace['Distance (m)'].to_numpy(dtype='float64')
+        grid, slope = slopes_from_profile(distance, trace['Elevation (mm)'].to_numpy(), dx)
+        return grid, slope, distance
+    if all(col in trace for col in ACCELERATION_COLUMNS):
+        time = trace['Time (s)'].to_numpy(dtype='float64')
+        speed = trace['Speed (km/h)'].to_numpy(dtype='float64')
+        grid, slope = slopes_from_acceleration(time, trace['Acceleration (m/s2)'].to_numpy(), speed, dx)
+        return grid, slope, travelled_distance(time, speed)
+    raise ValueError(f"Kolom rekaman tidak dikenali; butuh {PROFILE_COLUMNS} atau {ACCELERATION_COLUMNS}")
+
+
+def compute_segments(trace, dx=SAMPLE_M, window_m=WINDOW_M, workers=1):
+    """Segmen window_m dengan kolom SCHEMA yang bisa dihitung dari rekaman.
+
+    IRI dan Roughness Condition dari Golden Car; Speed (km/h), Latitude dan
+    Longitude (bila ada di rekaman) dirata-ratakan per segmen.
+    """
+    grid, slope, distance = trace_slopes(trace, dx)
+    starts, iri, counts = compute_iri(grid, slope, dx, window_m, workers)
+    # Jendela terakhir yang tidak penuh tidak dilaporkan.
+    full = counts >= int(round(window_m / dx * 0.95))
+    starts, iri = starts[full], iri[full]
+
+    segments = pd.DataFrame({
+        'Start Point (m)': starts,
+        'End Point (m)': starts + window_m,
+        'IRI (m/km)': iri.round(2),
+    })
+    segments['Roughness Condition'] = data_store.classify_iri(segments['IRI (m/km)'])
+    window = np.floor(distance / window_m).astype('int64')
+    for column in ('Latitude', 'Longitude', 'Speed (km/h)'):
+        if column in trace:
+            means = pd.Series(trace[column].to_numpy(dtype='float64')).groupby(window).mean()
+            segments[column] = means.reindex((starts / window_m).astype('int64')).to_numpy()
+    if 'Speed (km/h)' in segments:
+        segments['Speed (km/h)'] = segments['Speed (km/h)'].round()
+    return segments.astype({col: data_store.SCHEMA[col] for col in segments
+                            if col in data_store.SCHEMA and not segments[col].isna().any()})
+
+
+def apply_to_survey(survey, segments):
+    """Ganti IRI, Roughness Condition (dan Speed/posisi bila ada) survei dengan hasil hitung ulang.
+
+    Dicocokkan per Start Point (m); segmen survei tanpa pasangan dibiarkan.
+    """
+    updated = survey.copy()
+    lookup = segments.set_index('Start Point (m)')
+    matched = updated['Start Point (m)'].isin(lookup.index).to_numpy()
+    rows = lookup.loc[updated.loc[matched, 'Start Point (m)']]
+    for column in ('IRI (m/km)', 'Roughness Condition', 'Speed (km/h)', 'Latitude', 'Longitude'):
+        if column in rows:
+            values = rows[column].to_numpy()
+            valid = ~pd.isna(values)
+            target = np.flatnonzero(matched)[valid]
+            updated.iloc[target, updated.columns.get_loc(column)] = values[valid]
+    return data_store.apply_schema(updated), int(matched.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('trace', help='rekaman profil/akselerometer (CSV atau Parquet)')
+    parser.add_argument('--survey', help='CSV survei yang IRI-nya diganti hasil hitung')
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--window', type=float, default=WINDOW_M)
+    args = parser.parse_args()
+
+    segments = compute_segments(read_trace(args.trace), window_m=args.window, workers=args.workers)
+    if args.survey:
+        survey, matched = apply_to_survey(data_store.read_csv_typed(args.survey), segments)
+        survey.to_csv(args.out, index=False)
+        print(f"{args.out}: {matched} dari {len(survey)} segmen survei diperbarui")
+    else:
+        segments.to_csv(args.out, index=False)
+        print(f"{args.out}: {len(segments)} segmen, IRI rata-rata {segments['IRI (m/km)'].mean():.2f} m/km")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import importlib
+
+
+class LazyModule:
+    """Proxy modul yang baru di-import saat atributnya pertama kali dipakai.
+
+    Proxy ini sengaja tidak didaftarkan di sys.modules (berbeda dengan
+    importlib.util.LazyLoader): Streamlit memanggil inspect.stack(), yang
+    membaca __file__ setiap modul di sys.modules dan akan memicu import.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """Modul yang baru benar-benar di-import saat atributnya pertama kali dipakai"""
+    return LazyModule(name)
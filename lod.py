@@ -0,0 +1,150 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import shared_cache
+import spatial
+from data_store import KONDISI_DTYPE
+
+
+MIN_ZOOM = 5
+# Mulai zoom ini segmen individual dikirim ke browser (bila jumlahnya <= max_segments).
+DETAIL_ZOOM = 14
+MAX_CELL_ZOOM = 17
+# Ukuran sel grid dalam piksel layar pada zoom level-nya.
+CELL_PX = 32
+MAX_SEGMENTS = 20000
+CACHE_SIZE = 8
+
+_pyramids = shared_cache.SharedCache('lod', CACHE_SIZE)
+
+
+def cell_size(zoom):
+    """Ukuran sisi sel (derajat) untuk zoom tertentu"""
+    return 360.0 / 2 ** zoom * CELL_PX / 256
+
+
+def viewport_bounds(center, zoom, width, height):
+    """Perkiraan bounds (south, west, north, east) dari center, zoom dan ukuran peta"""
+    lat, lon = center
+    deg_per_px = 360.0 / (256 * 2 ** zoom)
+    half_w = width / 2 * deg_per_px
+    half_h = height / 2 * deg_per_px * math.cos(math.radians(lat))
+    return lat - half_h, lon - half_w, lat + half_h, lon + half_w
+
+
+def snap_bounds(bounds, zoom, tile_px=256):
+    """Perluas bounds ke grid tile agar pan kecil tetap memakai key cache yang sama"""
+    size = 360.0 / 2 ** zoom * tile_px / 256
+    south, west, north, east = bounds
+    return (math.floor(south / size) * size, math.floor(west / size) * size,
+            math.ceil(north / size) * size, math.ceil(east / size) * size)
+
+
+def _reduce(keys, count, sums, maxima, worst, lat_sum, lon_sum):
+    """Gabungkan baris dengan key yang sama (keys harus sudah terurut)"""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return (keys[starts],
+            np.add.reduceat(count, starts),
+            np.add.reduceat(sums, starts),
+            np.maximum.reduceat(maxima, starts),
+            np.maximum.reduceat(worst, starts),
+            np.add.reduceat(lat_sum, starts),
+            np.add.reduceat(lon_sum, starts))
+
+
+class LodPyramid:
+    """Piramida grid Latitude/Longitude: tiap sel menyimpan jumlah segmen,
+    IRI rata-rata/maksimum dan Roughness Condition terburuk."""
+
+    def __init__(self, data, min_zoom=MIN_ZOOM, max_zoom=MAX_CELL_ZOOM,
+                 detail_zoom=DETAIL_ZOOM, max_segments=MAX_SEGMENTS, index=None):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.detail_zoom = detail_zoom
+        self.max_segments = max_segments
+        self.levels = {}
+        # Index dari spatial.get_index dihitung di cache 'spatial', bukan di sini.
+        self._owns_index = index is None
+        self.index = index if index is not None else spatial.SpatialIndex(data)
+
+        lat = data['Latitude'].to_numpy(dtype='float64')
+        lon = data['Longitude'].to_numpy(dtype='float64')
+        iri = data['IRI (m/km)'].to_numpy(dtype='float64')
+        codes = data['Roughness Condition'].cat.codes.to_numpy().astype('int64')
+
+        if len(data) == 0:
+            return
+
+        size = cell_size(max_zoom)
+        ix = np.floor((lon + 180.0) / size).astype('int64')
+        iy = np.floor((lat + 90.0) / size).astype('int64')
+        keys = (ix << 32) | iy
+        order = np.argsort(keys, kind='stable')
+        level = _reduce(keys[order], np.ones(len(order), dtype='int64'), iri[order], iri[order],
+                        codes[order], lat[order], lon[order])
+        self.levels[max_zoom] = self._to_frame(level, max_zoom)
+
+        for zoom in range(max_zoom - 1, min_zoom - 1, -1):
+            keys = level[0]
+            parent = ((keys >> 32) >> 1 << 32) | ((keys & 0xFFFFFFFF) >> 1)
+            order = np.argsort(parent, kind='stable')
+            level = _reduce(parent[order], *(column[order] for column in level[1:]))
+            self.levels[zoom] = self._to_frame(level, zoom)
+
+    @property
+    def nbytes(self):
+        """Byte frame semua level (+ index bila dibangun sendiri)"""
+        levels = sum(int(level.memory_usage(index=True, deep=True).sum()) for level in self.levels.values())
+        return levels + (self.index.nbytes if self._owns_index else 0)
+
+    @staticmethod
+    def _to_frame(level, zoom):
+        keys, count, sums, maxima, worst, lat_sum, lon_sum = level
+        size = cell_size(zoom)
+        ix = keys >> 32
+        iy = keys & 0xFFFFFFFF
+        return pd.DataFrame({
+            'west': ix * size - 180.0,
+            'south': iy * size - 90.0,
+            'east': (ix + 1) * size - 180.0,
+            'north': (iy + 1) * size - 90.0,
+            'lat': lat_sum / count,
+            'lon': lon_sum / count,
+            'count': count,
+            'iri_mean': sums / count,
+            'iri_max': maxima,
+            'kondisi': pd.Categorical.from_codes(np.where(worst < 0, -1, worst), dtype=KONDISI_DTYPE),
+        })
+
+    def cells(self, zoom, bounds):
+        """Sel pada level zoom yang beririsan dengan bounds (south, west, north, east)"""
+        zoom = int(min(max(zoom, self.min_zoom), self.max_zoom))
+        level = self.levels.get(zoom)
+        if level is None:
+            return pd.DataFrame()
+        south, west, north, east = bounds
+        lo = np.searchsorted(level['east'].to_numpy(), west, side='left')
+        level = level.iloc[lo:]
+        mask = (level['west'] <= east) & (level['north'] >= south) & (level['south'] <= north)
+        return level[mask]
+
+    def segment_positions(self, bounds):
+        """Posisi baris segmen di dalam bounds, lewat SpatialIndex (tanpa memindai seluruh frame)"""
+        return self.index.bbox(bounds)
+
+    def query(self, zoom, bounds):
+        """('segments', posisi) bila cukup dekat, selain itu ('cells', frame sel)"""
+        if zoom >= self.detail_zoom:
+            positions = self.segment_positions(bounds)
+            if len(positions) <= self.max_segments:
+                return 'segments', positions
+        return 'cells', self.cells(zoom, bounds)
+
+
+def get_pyramid(key, data):
+    """Piramida LOD untuk data, dibangun sekali per key lalu di-cache"""
+    if key is None:
+        return LodPyramid(data)
+    return _pyramids.get_or_build(key, lambda: LodPyramid(data, index=spatial.get_index(key, data)))
@@ -0,0 +1,116 @@
+import json
+import os
+
+import numpy as np
+
+from lazy import lazy_import
+
+folium = lazy_import('folium')
+
+
+KONDISI_COLORS = {
+    'Sangat Baik': 'green',
+    'Baik': 'blue',
+    'Sedang': 'orange',
+    'Buruk': 'red'
+}
+
+# Di atas jumlah segmen ini peta memakai renderer canvas Leaflet, bukan SVG.
+CANVAS_THRESHOLD = int(os.environ.get('ROAD_MAP_CANVAS_THRESHOLD', 20000))
+
+TOOLTIP_FIELDS = ['segmen', 'iri', 'kondisi', 'retak', 'lubang']
+TOOLTIP_ALIASES = ['Segmen:', 'IRI:', 'Kondisi:', 'Retak:', 'Lubang:']
+
+_STYLE_JS = """
+function(feature) {
+    var colors = %s;
+    var color = colors[feature.properties.kondisi] || 'gray';
+    return {color: color, fillColor: color, fillOpacity: 0.7, weight: 1};
+}
+""" % json.dumps(KONDISI_COLORS)
+
+
+def _format_column(values, fmt):
+    return np.char.mod(fmt, np.asarray(values))
+
+
+def segment_features(data):
+    """Membangun FeatureCollection GeoJSON dari array kolom (tanpa iterrows)"""
+    lon = np.round(data['Longitude'].to_numpy(dtype='float64'), 6)
+    lat = np.round(data['Latitude'].to_numpy(dtype='float64'), 6)
+
+    segmen = np.char.add(
+        np.char.add(data['Start Point (m)'].to_numpy().astype(str), ' - '),
+        np.char.add(data['End Point (m)'].to_numpy().astype(str), ' m'))
+    iri = _format_column(data['IRI (m/km)'].to_numpy(dtype='float64'), '%.2f m/km')
+    kondisi = data['Roughness Condition'].astype(str).to_numpy()
+    retak = _format_column(data['Total Crack Area (%)'].to_numpy(dtype='float64'), '%.2f%%')
+    lubang = np.char.add(data['Number of Potholes (per km)'].to_numpy().astype(str), ' per km')
+
+    columns = zip(lon.tolist(), lat.tolist(), segmen.tolist(), iri.tolist(),
+                  kondisi.tolist(), retak.tolist(), lubang.tolist())
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [x, y]},
+            'properties': {'segmen': s, 'iri': i, 'kondisi': k, 'retak': r, 'lubang': l},
+        }
+        for x, y, s, i, k, r, l in columns
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def segment_layer(features, name='Segmen Jalan'):
+    """Satu layer GeoJSON untuk semua segmen, diwarnai sesuai Roughness Condition"""
+    return folium.GeoJson(
+        features,
+        name=name,
+        marker=folium.Circle(radius=50, fill=True),
+        style=folium.JsCode(_STYLE_JS),
+        tooltip=folium.GeoJsonTooltip(fields=TOOLTIP_FIELDS, aliases=TOOLTIP_ALIASES,
+                                      localize=False, labels=True),
+    )
+
+
+def base_map(data, zoom_start=14, canvas_threshold=None):
+    """Peta dasar; renderer canvas dipakai bila data melebihi canvas_threshold"""
+    if canvas_threshold is None:
+        canvas_threshold = CANVAS_THRESHOLD
+    return folium.Map(location=[data['Latitude'].mean(), data['Longitude'].mean()],
+                      zoom_start=zoom_start,
+                      prefer_canvas=len(data) > canvas_threshold)
+
+
+def cell_features(cells):
+    """FeatureCollection persegi untuk sel agregat LOD"""
+    jumlah = np.char.add(cells['count'].to_numpy().astype(str), ' segmen')
+    iri_mean = _format_column(cells['iri_mean'].to_numpy(dtype='float64'), '%.2f m/km')
+    iri_max = _format_column(cells['iri_max'].to_numpy(dtype='float64'), '%.2f m/km')
+    kondisi = cells['kondisi'].astype(str).to_numpy()
+    bounds = np.round(cells[['west', 'south', 'east', 'north']].to_numpy(dtype='float64'), 6)
+
+    columns = zip(bounds.tolist(), jumlah.tolist(), iri_mean.tolist(), iri_max.tolist(),
+                  kondisi.tolist())
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon',
+                         'coordinates': [[[w, s], [e, s], [e, n], [w, n], [w, s]]]},
+            'properties': {'jumlah': j, 'iri_mean': im, 'iri_max': ix, 'kondisi': k},
+        }
+        for (w, s, e, n), j, im, ix, k in columns
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def cell_layer(features, name='Agregat Segmen'):
+    """Layer GeoJSON untuk sel LOD, diwarnai sesuai kondisi terburuk di sel"""
+    return folium.GeoJson(
+        features,
+        name=name,
+        style=folium.JsCode(_STYLE_JS),
+        tooltip=folium.GeoJsonTooltip(fields=['jumlah', 'iri_mean', 'iri_max', 'kondisi'],
+                                      aliases=['Jumlah:', 'IRI rata-rata:', 'IRI maksimum:',
+                                               'Kondisi terburuk:'],
+                                      localize=False, labels=True),
+    )
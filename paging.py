@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import shared_cache
+
+
+PAGE_SIZES = [50, 100, 500]
+CACHE_SIZE = 8
+
+_tables = shared_cache.SharedCache('paging', CACHE_SIZE)
+
+
+def sort_values(series):
+    """Nilai float64 yang urutannya sama dengan kolom; nilai kosong menjadi NaN (selalu di akhir)"""
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    codes, _ = pd.factorize(series, sort=True)
+    codes = codes.astype('float64')
+    codes[codes < 0] = np.nan
+    return codes
+
+
+class PagedTable:
+    """Tabel berhalaman di sisi server untuk data (atau sebagian barisnya).
+
+    Urutan per kolom (naik/turun) dihitung sekali saat pertama dipakai lalu
+    disimpan, jadi ganti halaman hanya memotong array posisi dan mengambil
+    baris halaman itu dengan iloc. Yang dikirim ke browser hanya satu halaman.
+    """
+
+    def __init__(self, data, rows=None):
+        self.data = data
+        self.rows = np.arange(len(data), dtype='int64') if rows is None else np.asarray(rows, dtype='int64')
+        self.n = len(self.rows)
+        self._orders = {}
+
+    def order(self, column=None, descending=False):
+        """Posisi baris (iloc pada data) terurut menurut column; None = urutan asli"""
+        key = (column, descending)
+        order = self._orders.get(key)
+        if order is None:
+            if column is None:
+                order = self.rows[::-1] if descending else self.rows
+            else:
+                values = sort_values(self.data[column])[self.rows]
+                order = self.rows[np.argsort(-values if descending else values, kind='stable')]
+            self._orders[key] = order
+        return order
+
+    def page_count(self, size):
+        return max(1, math.ceil(self.n / size))
+
+    def page(self, number, size, column=None, descending=False, columns=None):
+        """Frame halaman ke-number (mulai 0) berisi paling banyak size baris"""
+        positions = self.order(column, descending)[number * size:(number + 1) * size]
+        frame = self.data.iloc[positions]
+        return frame if columns is None else frame[list(columns)]
+
+
+def get_table(key, data, rows=None):
+    """PagedTable untuk data, dibangun sekali per key (dataset + filter) lalu di-cache"""
+    return _tables.get_or_build(key, lambda: PagedTable(data, rows))
@@ -0,0 +1,34 @@
+"""Siapkan artefak data saat deploy agar pod baru tidak mem-parse CSV.
+
+Contoh:
+    python prepare.py dummy_data_yogyakarta.csv
+"""
+import argparse
+import compileall
+import os
+import sys
+import time
+
+import data_store
+
+
+def prepare(file_path):
+    """Bangun sidecar Parquet bertipe tetap untuk satu file survei"""
+    start = time.perf_counter()
+    data = data_store.load_dataset(file_path)
+    elapsed = time.perf_counter() - start
+    print(f"{file_path}: {len(data)} segmen, sidecar {data_store.sidecar_path(file_path)} ({elapsed:.2f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', default=[os.environ.get('ROAD_DATA_FILE', 'dummy_data_yogyakarta.csv')])
+    args = parser.parse_args()
+
+    compileall.compile_dir(os.path.dirname(os.path.abspath(__file__)), maxlevels=1, quiet=1)
+    for file_path in args.files:
+        prepare(file_path)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
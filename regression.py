@@ -0,0 +1,174 @@
+import numpy as np
+
+import shared_cache
+
+
+METHODS = {
+    'ols': 'OLS',
+    'huber': 'Huber',
+    'theilsen': 'Theil-Sen',
+    'lowess': 'LOWESS',
+}
+
+HUBER_K = 1.345
+HUBER_ITERATIONS = 10
+THEILSEN_MAX_POINTS = 1000
+LOWESS_BINS = 200
+LOWESS_POINTS = 50
+LOWESS_FRAC = 0.3
+CACHE_SIZE = 64
+
+_fits = shared_cache.SharedCache('regression', CACHE_SIZE)
+
+
+def _group_sums(codes, n_groups, *columns):
+    return [np.bincount(codes, weights=column, minlength=n_groups) for column in columns]
+
+
+def _group_median(values, codes, n_groups):
+    """Median per grup dari satu lexsort"""
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    medians = np.full(n_groups, np.nan)
+    for g in range(n_groups):
+        group = sorted_values[bounds[g]:bounds[g + 1]]
+        if len(group):
+            medians[g] = np.median(group)
+    return medians
+
+
+def _r2(x, y, codes, n_groups, slope, intercept):
+    """R² = 1 - SS_res / SS_tot per grup untuk garis slope/intercept"""
+    count, sy = _group_sums(codes, n_groups, np.ones_like(y), y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        residual = y - (intercept[codes] + slope[codes] * x)
+        deviation = y - (sy / count)[codes]
+        ss_res, ss_tot = _group_sums(codes, n_groups, residual * residual, deviation * deviation)
+        return np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+
+def ols(x, y, codes, n_groups, weights=None):
+    """Slope, intercept, R² dan n untuk semua grup sekaligus (jumlahan tertutup)"""
+    w = np.ones_like(x) if weights is None else weights
+    sw, swx, swy = _group_sums(codes, n_groups, w, w * x, w * y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x, mean_y = swx / sw, swy / sw
+        dx = x - mean_x[codes]
+        dy = y - mean_y[codes]
+        sxx, sxy, syy = _group_sums(codes, n_groups, w * dx * dx, w * dx * dy, w * dy * dy)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = mean_y - slope * mean_x
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), np.nan)
+    n = np.bincount(codes, minlength=n_groups)
+    return {'slope': slope, 'intercept': intercept, 'r2': r2, 'n': n}
+
+
+def huber(x, y, codes, n_groups):
+    """Regresi robust Huber lewat IRLS, tervektorisasi untuk semua grup"""
+    fit = ols(x, y, codes, n_groups)
+    for _ in range(HUBER_ITERATIONS):
+        residual = y - (fit['intercept'][codes] + fit['slope'][codes] * x)
+        scale = 1.4826 * _group_median(np.abs(residual), codes, n_groups)
+        scale = np.where(scale > 0, scale, 1.0)
+        u = np.abs(residual) / scale[codes]
+        weights = np.where(u <= HUBER_K, 1.0, HUBER_K / np.maximum(u, 1e-12))
+        fit = ols(x, y, codes, n_groups, weights)
+    return fit
+
+
+def theil_sen(x, y, codes, n_groups, seed=0):
+    """Median kemiringan pasangan titik per grup (disampel bila grup besar)"""
+    rng = np.random.default_rng(seed)
+    slope = np.zeros(n_groups)
+    intercept = np.zeros(n_groups)
+    for g in range(n_groups):
+        idx = np.flatnonzero(codes == g)
+        if len(idx) > THEILSEN_MAX_POINTS:
+            idx = rng.choice(idx, THEILSEN_MAX_POINTS, replace=False)
+        if len(idx) < 2:
+            continue
+        i, j = np.triu_indices(len(idx), k=1)
+        dx = x[idx][j] - x[idx][i]
+        valid = dx != 0
+        if valid.any():
+            slope[g] = np.median((y[idx][j] - y[idx][i])[valid] / dx[valid])
+        intercept[g] = np.median(y[idx] - slope[g] * x[idx])
+    return {'slope': slope, 'intercept': intercept, 'r2': _r2(x, y, codes, n_groups, slope, intercept),
+            'n': np.bincount(codes, minlength=n_groups)}
+
+
+def lowess(x, y, codes, n_groups):
+    """Kurva regresi lokal (tricube) per grup di atas agregat bin, bukan titik mentah"""
+    curves = {}
+    for g in range(n_groups):
+        mask = codes == g
+        if mask.sum() < 3:
+            continue
+        gx, gy = x[mask], y[mask]
+        lo, hi = gx.min(), gx.max()
+        if hi <= lo:
+            continue
+        bins = np.minimum(((gx - lo) / (hi - lo) * LOWESS_BINS).astype('int64'), LOWESS_BINS - 1)
+        count, sx, sy = _group_sums(bins, LOWESS_BINS, np.ones_like(gx), gx, gy)
+        filled = count > 0
+        bx, by, bw = sx[filled] / count[filled], sy[filled] / count[filled], count[filled]
+
+        grid = np.linspace(lo, hi, LOWESS_POINTS)
+        distance = np.abs(grid[:, None] - bx[None, :])
+        bandwidth = np.maximum(LOWESS_FRAC * (hi - lo), 1e-12)
+        tricube = np.clip(1 - (distance / bandwidth) ** 3, 0, None) ** 3
+        weights = tricube * bw[None, :]
+
+        sw = weights.sum(axis=1)
+        mx = (weights * bx).sum(axis=1) / sw
+        my = (weights * by).sum(axis=1) / sw
+        sxx = (weights * (bx - mx[:, None]) ** 2).sum(axis=1)
+        sxy = (weights * (bx - mx[:, None]) * (by - my[:, None])).sum(axis=1)
+        slope = np.where(sxx > 0, sxy / np.where(sxx > 0, sxx, 1), 0.0)
+        curves[g] = (grid, my + slope * (grid - mx))
+    return {'curves': curves, 'n': np.bincount(codes, minlength=n_groups)}
+
+
+def fit_groups(data, x, y, method='ols', by='Roughness Condition'):
+    """Fit tren y terhadap x untuk setiap kategori by; hasil berupa dict per kategori"""
+    categorical = data[by].astype('category')
+    codes = categorical.cat.codes.to_numpy().astype('int64')
+    xs = data[x].to_numpy(dtype='float64')
+    ys = data[y].to_numpy(dtype='float64')
+    valid = (codes >= 0) & ~np.isnan(xs) & ~np.isnan(ys)
+    codes, xs, ys = codes[valid], xs[valid], ys[valid]
+    n_groups = len(categorical.cat.categories)
+
+    if method == 'lowess':
+        fit = lowess(xs, ys, codes, n_groups)
+        return {
+            categorical.cat.categories[g]: {'x': curve[0], 'y': curve[1], 'n': int(fit['n'][g])}
+            for g, curve in fit['curves'].items()
+        }
+
+    fitter = {'ols': ols, 'huber': huber, 'theilsen': theil_sen}[method]
+    fit = fitter(xs, ys, codes, n_groups)
+    result = {}
+    for g, category in enumerate(categorical.cat.categories):
+        if fit['n'][g] < 2:
+            continue
+        group_x = xs[codes == g]
+        line_x = np.array([group_x.min(), group_x.max()])
+        result[category] = {
+            'x': line_x,
+            'y': fit['intercept'][g] + fit['slope'][g] * line_x,
+            'slope': float(fit['slope'][g]),
+            'intercept': float(fit['intercept'][g]),
+            'r2': float(fit['r2'][g]),
+            'n': int(fit['n'][g]),
+        }
+    return result
+
+
+def get_fits(key, data, x, y, method='ols'):
+    """fit_groups dengan cache per key (dataset + filter) dan kolom/metode"""
+    if key is None:
+        return fit_groups(data, x, y, method)
+    key = key + (x, y, method)
+    return _fits.get_or_build(key, lambda: fit_groups(data, x, y, method))
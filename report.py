@@ -0,0 +1,93 @@
+from lazy import lazy_import
+
+go = lazy_import('plotly.graph_objects')
+
+
+# Prioritas perbaikan (urutan tampil), kriteria IRI dan tindakan yang disarankan.
+PRIORITY_ACTIONS = [
+    ('tinggi', 'Prioritas Tinggi', 'IRI > 8 m/km', 'Rekonstruksi jalan atau overlay tebal'),
+    ('menengah', 'Prioritas Menengah', '5 < IRI ≤ 8 m/km', 'Overlay tipis atau penambalan lubang masif'),
+    ('rendah', 'Prioritas Rendah', '3 < IRI ≤ 5 m/km', 'Pemeliharaan rutin, penambalan lubang'),
+]
+
+RADAR_COLUMNS = ['IRI (m/km)', 'Total Crack Area (%)', 'Average Crack Width (mm)',
+                 'Number of Potholes (per km)', 'Average Rut Depth (cm)']
+
+
+def radar_figure(stats):
+    """Radar rata-rata kerusakan per Roughness Condition (dari Summary)"""
+    fig = go.Figure()
+    
+    categories = ['IRI (m/km)', 'Total Crack Area (%)', 'Avg Crack Width (mm)', 
+                 'Potholes (per km)', 'Rut Depth (cm)']
+    
+    for kondisi in ['Sangat Baik', 'Baik', 'Sedang', 'Buruk']:
+        if stats.kondisi_counts.get(kondisi, 0) > 0:
+            values = [stats.by_condition[kondisi][column]['mean'] for column in RADAR_COLUMNS]
+            
+            fig.add_trace(go.Scatterpolar(
+                r=values,
+                theta=categories,
+                fill='toself',
+                name=kondisi
+            ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max([
+                    stats.overall['IRI (m/km)']['max'],
+                    stats.overall['Total Crack Area (%)']['max'] / 3,
+                    stats.overall['Average Crack Width (mm)']['max'],
+                    stats.overall['Number of Potholes (per km)']['max'] / 5,
+                    stats.overall['Average Rut Depth (cm)']['max']
+                ])]
+            )),
+        showlegend=True,
+        height=500
+    )
+    return fig
+
+
+def repair_gauge_figure(stats):
+    """Gauge persentase segmen dengan IRI > 8 (dari Summary)"""
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = stats.repair_percent,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Segmen Memerlukan Perbaikan (%)"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "#e74c3c"},
+            'steps': [
+                {'range': [0, 20], 'color': "#2ecc71"},
+                {'range': [20, 40], 'color': "#f1c40f"},
+                {'range': [40, 60], 'color': "#f39c12"},
+                {'range': [60, 100], 'color': "#e74c3c"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 30
+            }
+        }
+    ))
+    
+    fig.update_layout(height=300)
+    return fig
+
+
+def priority_markdown(package_stats):
+    """Markdown rekomendasi perbaikan per prioritas dari intervals.package_summary"""
+    lines = ["### Prioritas Perbaikan", ""]
+    for i, (name, label, criteria, action) in enumerate(PRIORITY_ACTIONS, start=1):
+        stats = package_stats[name]
+        lines += [
+            f"{i}. **{label}** ({criteria}):",
+            f"   - Jumlah Paket: {stats['packages']} ({stats['segments']} segmen)",
+            f"   - Panjang Total: {stats['length_m'] / 1000:.2f} km",
+            f"   - Tindakan: {action}",
+            "",
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Batas total memori satu proses server: semua SharedCache (termasuk cache
+# figur) ditambah memori resident (dataset yang dimuat, FilterIndex).
+MAX_BYTES = int(float(os.environ.get('ROAD_SHARED_CACHE_MB', 1024)) * 1024 * 1024)
+
+_lock = threading.RLock()
+_caches = OrderedDict()
+_clock = 0
+# nama -> (byte, frame) memori yang dipegang di luar cache dan tidak bisa dibuang.
+_residents = {}
+
+
+def _buffer(series):
+    values = series.array
+    return values.codes if isinstance(values, pd.Categorical) else series.to_numpy()
+
+
+def _shares_resident(series):
+    """True bila kolom memakai buffer yang sama dengan kolom frame resident (mis. pilihan kolom dataset)"""
+    buffer = _buffer(series)
+    for _, frames in list(_residents.values()):
+        for frame in frames:
+            column = frame.get(series.name) if isinstance(frame, pd.DataFrame) else None
+            if column is not None and np.may_share_memory(buffer, _buffer(column)):
+                return True
+    return False
+
+
+def _frame_size(value):
+    """Byte frame/Series; kolom yang berbagi buffer dengan dataset resident tidak dihitung"""
+    if isinstance(value, pd.Series):
+        return 0 if _shares_resident(value) else int(value.memory_usage(index=True, deep=True))
+    usage = value.memory_usage(index=True, deep=True)
+    return int(sum(size for name, size in usage.items()
+                   if name == 'Index' or not _shares_resident(value[name])))
+
+
+def sizeof(value, depth=0):
+    """Perkiraan byte milik value: array numpy, frame dan string di dalamnya.
+
+    Frame yang hanya direferensikan objek lain (mis. data sumber sebuah index)
+    tidak dihitung karena dimiliki cache lain, begitu pula kolom yang berbagi
+    buffer dengan dataset resident. Objek yang menyimpan struktur tanpa
+    __dict__ (KD-tree, frame level piramida) melaporkan ukurannya sendiri
+    lewat atribut nbytes.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return _frame_size(value) if depth == 0 else 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if depth > 4:
+        return 0
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        if len(value) > 100:
+            return sum(sizeof(item, depth + 1) for item in value[:100]) * len(value) // 100
+        return sum(sizeof(item, depth + 1) for item in value)
+    if hasattr(value, '__dict__'):
+        return sizeof(vars(value), depth + 1)
+    return 0
+
+
+class SharedCache:
+    """Cache LRU yang dipakai bersama semua sesi Streamlit dalam satu proses.
+
+    Aman dipakai dari banyak thread sesi. Build per key hanya berjalan sekali:
+    sesi lain yang meminta key yang sama menunggu hasilnya, bukan ikut
+    membangun. Ukuran semua SharedCache dijumlahkan; bila melewati MAX_BYTES,
+    entri yang paling lama tidak dipakai (dari cache mana pun) dibuang.
+    """
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._pending = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with _lock:
+            _caches[name] = self
+
+    def get_or_build(self, key, build):
+        """Nilai untuk key; build() hanya dipanggil bila belum ada (None = tanpa cache)"""
+        global _clock
+        if key is None:
+            return build()
+        while True:
+            with _lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    _clock += 1
+                    self._entries[key] = (entry[0], entry[1], _clock)
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Build oleh sesi lain; bila gagal atau terlalu besar, build sendiri.
+            event.wait()
+
+        try:
+            value = build()
+            self.put(key, value)
+        finally:
+            with _lock:
+                self._pending.pop(key).set()
+        return value
+
+    def get(self, key):
+        """Nilai untuk key, None bila tidak ada (tanpa build)"""
+        global _clock
+        with _lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            _clock += 1
+            self._entries[key] = (entry[0], entry[1], _clock)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Simpan value untuk key (mengganti nilai lama), lalu tegakkan batas entri dan MAX_BYTES"""
+        global _clock
+        size = sizeof(value)
+        if size > MAX_BYTES:
+            return
+        with _lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            _clock += 1
+            self._entries[key] = (value, size, _clock)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries:
+                self._evict()
+            _enforce_budget()
+
+    def size(self, key):
+        """Ukuran (byte) tercatat untuk key, None bila tidak ada"""
+        with _lock:
+            entry = self._entries.get(key)
+        return None if entry is None else entry[1]
+
+    def _evict(self):
+        _, (_, size, _) = self._entries.popitem(last=False)
+        self.current_bytes -= size
+        self.evictions += 1
+
+    def clear(self):
+        with _lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+def _enforce_budget():
+    """Buang entri global tertua sampai total ukuran di bawah MAX_BYTES (dipanggil dengan _lock)"""
+    while total_bytes() > MAX_BYTES:
+        caches = [cache for cache in _caches.values() if cache._entries]
+        if not caches:
+            return
+        oldest = min(caches, key=lambda cache: next(iter(cache._entries.values()))[2])
+        oldest._evict()
+
+
+def set_resident(name, nbytes, frames=()):
+    """Catat memori resident bernama (mis. dataset yang dimuat) terhadap MAX_BYTES.
+
+    Memori resident tidak bisa dibuang; entri cache yang dibuang untuk memberi
+    tempat. Kolom di frames dianggap milik resident, jadi entri cache yang
+    berbagi buffer dengannya tidak dihitung dua kali.
+    """
+    with _lock:
+        _residents[name] = (int(nbytes), tuple(frames))
+        _enforce_budget()
+
+
+def resident_bytes():
+    """{nama: byte} memori resident"""
+    with _lock:
+        return {name: nbytes for name, (nbytes, _) in _residents.items()}
+
+
+def get_cache(name, max_entries):
+    """SharedCache bernama, dibuat sekali per proses (aman dipanggil dari script yang di-rerun)"""
+    with _lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = SharedCache(name, max_entries)
+        return cache
+
+
+def total_bytes():
+    return sum(cache.current_bytes for cache in _caches.values()) + sum(
+        nbytes for nbytes, _ in _residents.values())
+
+
+def stats():
+    """Statistik per cache: {nama: {entries, bytes, hits, misses, evictions}}"""
+    with _lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear():
+    for cache in list(_caches.values()):
+        cache.clear()
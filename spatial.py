@@ -0,0 +1,106 @@
+import math
+
+import numpy as np
+
+import shared_cache
+from lazy import lazy_import
+
+scipy_spatial = lazy_import('scipy.spatial')
+
+
+EARTH_RADIUS_M = 6371008.8
+# Ukuran sel grid (meter) untuk query bbox.
+GRID_CELL_M = 250.0
+CACHE_SIZE = 8
+
+_indexes = shared_cache.SharedCache('spatial', CACHE_SIZE)
+
+
+class SpatialIndex:
+    """Index titik segmen (Latitude/Longitude) untuk query bbox, radius dan k-terdekat.
+
+    Koordinat diproyeksikan equirectangular (meter) di sekitar lintang rata-rata
+    data; cukup akurat untuk jaringan jalan setingkat kota/provinsi. Radius dan
+    k-terdekat memakai KD-tree; bbox memakai grid sel terurut (baris sel =
+    satu potongan kontigu), jadi biayanya sebanding dengan jumlah hasil. Semua
+    hasil berupa posisi baris (iloc) pada data yang dipakai membangun index.
+    """
+
+    def __init__(self, data):
+        self.n = len(data)
+        lat = data['Latitude'].to_numpy(dtype='float64')
+        lon = data['Longitude'].to_numpy(dtype='float64')
+        self.lat0 = float(lat.mean()) if self.n else 0.0
+        self._kx = EARTH_RADIUS_M * math.radians(1) * math.cos(math.radians(self.lat0))
+        self._ky = EARTH_RADIUS_M * math.radians(1)
+        self.xy = np.column_stack(self.project(lat, lon))
+        self.tree = scipy_spatial.cKDTree(self.xy) if self.n else None
+        if self.n:
+            self._origin = self.xy.min(axis=0)
+            cells = np.floor((self.xy - self._origin) / GRID_CELL_M).astype('int64')
+            self._shape = cells.max(axis=0) + 1
+            keys = cells[:, 1] * self._shape[0] + cells[:, 0]
+            self._order = np.argsort(keys, kind='stable')
+            self._keys = keys[self._order]
+
+    @property
+    def nbytes(self):
+        """Byte array koordinat, grid dan KD-tree (untuk batas memori shared_cache)"""
+        if self.tree is None:
+            return self.xy.nbytes
+        # Node cKDTree (~72 byte per node) tidak terlihat sebagai array.
+        return (self.xy.nbytes + self._order.nbytes + self._keys.nbytes
+                + self.tree.data.nbytes + self.tree.indices.nbytes + self.tree.size * 72)
+
+    def project(self, lat, lon):
+        """(x, y) dalam meter untuk lat/lon (skalar atau array)"""
+        return np.asarray(lon) * self._kx, np.asarray(lat) * self._ky
+
+    def bbox(self, bounds):
+        """Posisi (terurut naik) segmen di dalam bounds (south, west, north, east)"""
+        if self.tree is None:
+            return np.zeros(0, dtype='int64')
+        south, west, north, east = bounds
+        (x0, x1), (y0, y1) = self.project([south, north], [west, east])
+        cell_lo = np.floor((np.array([x0, y0]) - self._origin) / GRID_CELL_M)
+        cell_hi = np.floor((np.array([x1, y1]) - self._origin) / GRID_CELL_M)
+        cx0, cy0 = np.maximum(cell_lo, 0).astype('int64')
+        cx1, cy1 = np.minimum(cell_hi, self._shape - 1).astype('int64')
+        if cx0 > cx1 or cy0 > cy1:
+            return np.zeros(0, dtype='int64')
+
+        rows = np.arange(cy0, cy1 + 1) * self._shape[0]
+        lo = np.searchsorted(self._keys, rows + cx0, side='left')
+        hi = np.searchsorted(self._keys, rows + cx1, side='right')
+        counts = hi - lo
+        offsets = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        candidates = self._order[offsets + np.arange(counts.sum())]
+        xy = self.xy[candidates]
+        inside = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+        return np.sort(candidates[inside])
+
+    def radius(self, lat, lon, meters):
+        """(posisi, jarak meter) segmen dalam radius, terurut dari yang terdekat"""
+        if self.tree is None:
+            return np.zeros(0, dtype='int64'), np.zeros(0)
+        point = np.array(self.project(lat, lon))
+        positions = np.asarray(self.tree.query_ball_point(point, meters), dtype='int64')
+        distances = np.hypot(*(self.xy[positions] - point).T)
+        order = np.argsort(distances, kind='stable')
+        return positions[order], distances[order]
+
+    def nearest(self, lat, lon, k=1, max_distance=np.inf):
+        """(posisi, jarak meter) k segmen terdekat, dibatasi max_distance"""
+        if self.tree is None:
+            return np.zeros(0, dtype='int64'), np.zeros(0)
+        k = min(k, self.n)
+        distances, positions = self.tree.query(self.project(lat, lon), k=k,
+                                               distance_upper_bound=max_distance)
+        distances, positions = np.atleast_1d(distances), np.atleast_1d(positions)
+        found = positions < self.n
+        return positions[found].astype('int64'), distances[found]
+
+
+def get_index(key, data):
+    """SpatialIndex untuk data, dibangun sekali per key (dataset + filter) lalu di-cache"""
+    return _indexes.get_or_build(key, lambda: SpatialIndex(data))
@@ -0,0 +1,289 @@
+"""Backend SQLite opsional: filter sidebar dijalankan sebagai query ber-index.
+
+Contoh:
+    python sql_store.py survey_store --db road_network.sqlite
+    ROAD_DATA_FILE=road_network.sqlite streamlit run app.py
+
+Database dibangun dari CSV survei atau store hasil ingest.py, chunk demi
+chunk, sehingga jaringan jalan yang lebih besar dari RAM tetap bisa dimuat;
+dashboard hanya membaca baris yang lolos filter.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import ingest
+import shared_cache
+
+
+DB_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+CACHE_SIZE = 8
+# Batas baris hasil satu query; filter yang lebih lebar harus dipersempit (rute/IRI).
+MAX_ROWS = int(os.environ.get('ROAD_SQL_MAX_ROWS', 2_000_000))
+# Baris per fetchmany saat hasil query diubah ke array.
+FETCH_ROWS = 50_000
+# Index IRI hanya dipakai bila rentang filter <= fraksi ini dari rentang IRI data.
+INDEX_MAX_COVERAGE = 0.25
+
+# Kolom SCHEMA -> nama kolom SQL. Roughness Condition disimpan sebagai kode
+# urut KONDISI_ORDER (INTEGER).
+COLUMNS = {
+    'No': 'no',
+    'Start Point (m)': 'start_m',
+    'End Point (m)': 'end_m',
+    'Latitude': 'lat',
+    'Longitude': 'lon',
+    'IRI (m/km)': 'iri',
+    'Roughness Condition': 'kondisi',
+    'Speed (km/h)': 'speed',
+    'Total Crack Area (%)': 'crack_area',
+    'Average Crack Width (mm)': 'crack_width',
+    'Number of Potholes (per km)': 'potholes',
+    'Average Rut Depth (cm)': 'rut_depth',
+}
+
+_SQL_TYPES = {'int32': 'INTEGER', 'float32': 'REAL', 'float64': 'REAL'}
+
+_DDL = f"""
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE routes (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE segments (
+    route_id INTEGER NOT NULL REFERENCES routes(id),
+    survey_date INTEGER NOT NULL,
+    {', '.join(f"{sql} {_SQL_TYPES.get(str(data_store.SCHEMA[col]), 'INTEGER')} NOT NULL"
+               for col, sql in COLUMNS.items())}
+);
+"""
+
+# (kondisi, iri) melayani filter kondisi saja maupun kondisi + rentang IRI.
+_INDEXES = """
+CREATE INDEX idx_segments_kondisi_iri ON segments (kondisi, iri);
+CREATE INDEX idx_segments_iri ON segments (iri);
+CREATE INDEX idx_segments_route_chainage ON segments (route_id, survey_date, start_m);
+"""
+
+_databases = {}
+_results = shared_cache.SharedCache('sql', CACHE_SIZE)
+
+
+class QueryTooLarge(ValueError):
+    """Hasil query melebihi max_rows"""
+
+
+def is_database(path):
+    return str(path).lower().endswith(DB_SUFFIXES)
+
+
+def _source_chunks(source, chunk_rows):
+    """(rute, tanggal, chunk bertipe SCHEMA) dari CSV atau store ingest.py"""
+    if os.path.isdir(source):
+        for part in data_store.read_manifest(source)['parts']:
+            data = data_store.apply_schema(pd.read_parquet(os.path.join(source, part['path'])))
+            yield part['route'], part['date'], data
+        return
+    route, survey_date = ingest.partition_for(source)
+    reader = pd.read_csv(source, usecols=list(data_store.SCHEMA), chunksize=chunk_rows,
+                         dtype={'Roughness Condition': 'string'}, skipinitialspace=True)
+    for chunk in reader:
+        data, _ = ingest.validate_chunk(chunk)
+        yield route, survey_date, data
+
+
+def build_database(sources, db_path, chunk_rows=ingest.CHUNK_ROWS):
+    """Bangun database SQLite dari CSV/store survei; ditulis ke file sementara lalu diganti atomik"""
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    fingerprint = hashlib.blake2b(digest_size=16)
+    insert = (f"INSERT INTO segments (route_id, survey_date, {', '.join(COLUMNS.values())}) "
+              f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))})")
+    rows = 0
+    try:
+        with closing(sqlite3.connect(tmp_path)) as conn:
+            conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + _DDL)
+            route_ids = {}
+            iri_min, iri_max = np.inf, -np.inf
+            for source in sources:
+                if os.path.isdir(source):
+                    fingerprint.update((data_store.read_manifest(source)['fingerprint'] or '').encode())
+                else:
+                    fingerprint.update(data_store.file_hash(source).encode())
+                for route, survey_date, data in _source_chunks(source, chunk_rows):
+                    if route not in route_ids:
+                        route_ids[route] = len(route_ids) + 1
+                        conn.execute("INSERT INTO routes (id, name) VALUES (?, ?)", (route_ids[route], route))
+                    columns = [data[col].cat.codes.to_numpy() if col == 'Roughness Condition'
+                               else data[col].to_numpy() for col in COLUMNS]
+                    n = len(data)
+                    day = int(np.datetime64(survey_date, 'D').astype('int64'))
+                    records = zip([route_ids[route]] * n, [day] * n, *(c.tolist() for c in columns))
+                    conn.executemany(insert, records)
+                    rows += n
+                    if n:
+                        iri_min = min(iri_min, float(data['IRI (m/km)'].min()))
+                        iri_max = max(iri_max, float(data['IRI (m/km)'].max()))
+            conn.executescript(_INDEXES)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ('fingerprint', fingerprint.hexdigest()),
+                ('iri_min', repr(iri_min)),
+                ('iri_max', repr(iri_max)),
+            ])
+            conn.execute("ANALYZE")
+            conn.commit()
+        os.replace(tmp_path, db_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+def _connect(db_path):
+    return closing(sqlite3.connect(f"file:{db_path}?mode=ro", uri=True))
+
+
+def _database_meta(db_path):
+    """Isi tabel meta + daftar rute; dibaca ulang hanya bila file database berubah"""
+    key = os.path.abspath(db_path)
+    signature = data_store.file_signature(key)
+    cached = _databases.get(key)
+    if cached is None or cached[0] != signature:
+        with _connect(key) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            meta['routes'] = [name for name, in conn.execute("SELECT name FROM routes ORDER BY id")]
+            # (route_id, hari) setiap survei; GROUP BY cukup membaca index route/chainage.
+            meta['surveys'] = conn.execute(
+                "SELECT route_id, survey_date FROM segments GROUP BY route_id, survey_date").fetchall()
+        cached = (signature, meta)
+        _databases[key] = cached
+    return cached[1]
+
+
+def database_info(db_path):
+    """(fingerprint, daftar rute) database"""
+    meta = _database_meta(db_path)
+    return meta['fingerprint'], meta['routes']
+
+
+def survey_dates(db_path):
+    """Tanggal survei (ISO, terurut) di database"""
+    days = sorted({day for _, day in _database_meta(db_path)['surveys']})
+    return [str(np.datetime64(day, 'D')) for day in days]
+
+
+def _survey_predicate(meta, survey):
+    """(SQL, params) yang membatasi ke survei terpilih (lihat data_store.survey_mask)"""
+    if survey != data_store.LATEST_SURVEY:
+        return "survey_date = ?", [int(np.datetime64(survey, 'D').astype('int64'))]
+    latest = {}
+    for route_id, day in meta['surveys']:
+        latest[route_id] = max(day, latest.get(route_id, day))
+    if not latest:
+        return "0", []
+    return (f"(route_id, survey_date) IN (VALUES {', '.join(['(?, ?)'] * len(latest))})",
+            [value for pair in latest.items() for value in pair])
+
+
+def query(db_path, kondisi=None, iri_range=None, routes=None, columns=None, max_rows=None, survey=None):
+    """Baris yang lolos filter sebagai DataFrame bertipe SCHEMA (+ Route, Survey Date).
+
+    kondisi/routes/survey None berarti semua; iri_range (lo, hi) inklusif;
+    survey seperti data_store.survey_mask. Hanya
+    kolom di columns (default semua kolom SCHEMA) yang dibaca dari database.
+    Predikat yang mencakup seluruh isi database tidak dikirim, supaya SQLite
+    bebas memilih index yang paling selektif. Baris dibaca per FETCH_ROWS
+    langsung ke array bertipe; lebih dari max_rows baris -> QueryTooLarge.
+    """
+    columns = list(columns or data_store.SCHEMA)
+    meta = _database_meta(db_path)
+    route_names = meta['routes']
+    where, params = [], []
+    if kondisi is not None and not set(data_store.KONDISI_ORDER) <= set(kondisi):
+        codes = [data_store.KONDISI_ORDER.index(k) for k in kondisi if k in data_store.KONDISI_ORDER]
+        where.append(f"kondisi IN ({', '.join('?' * len(codes))})" if codes else "0")
+        params += codes
+    if iri_range is not None:
+        # Batas di-cast ke float32 seperti kolom IRI pada jalur pandas.
+        lo, hi = (float(np.float32(v)) for v in iri_range)
+        iri_min, iri_max = float(meta['iri_min']), float(meta['iri_max'])
+        if lo > iri_min or hi < iri_max:
+            # Rentang lebar: scan tabel lebih murah daripada lookup index per baris
+            # ("+iri" mematikan index IRI untuk predikat ini).
+            coverage = (min(hi, iri_max) - max(lo, iri_min)) / max(iri_max - iri_min, 1e-9)
+            where.append(f"{'+' if coverage > INDEX_MAX_COVERAGE else ''}iri BETWEEN ? AND ?")
+            params += [lo, hi]
+    if routes is not None and not set(route_names) <= set(routes):
+        ids = [route_names.index(r) + 1 for r in routes if r in route_names]
+        where.append(f"route_id IN ({', '.join('?' * len(ids))})" if ids else "0")
+        params += ids
+    if survey is not None:
+        predicate, values = _survey_predicate(meta, survey)
+        where.append(predicate)
+        params += values
+
+    sql = (f"SELECT rowid, route_id, survey_date, {', '.join(COLUMNS[col] for col in columns)} "
+           f"FROM segments {'WHERE ' + ' AND '.join(where) if where else ''}")
+    if max_rows is not None:
+        sql += f" LIMIT {int(max_rows) + 1}"
+    dtypes = ['int64', 'int32', 'int64'] + [
+        'int8' if col == 'Roughness Condition' else str(data_store.SCHEMA[col]) for col in columns]
+    chunks = []
+    n = 0
+    with _connect(os.path.abspath(db_path)) as conn:
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                break
+            n += len(rows)
+            if max_rows is not None and n > max_rows:
+                raise QueryTooLarge(f"Hasil query lebih dari {max_rows:,} segmen; persempit filter rute atau IRI")
+            block = np.array(rows, dtype='float64')
+            chunks.append([block[:, i].astype(dtype) for i, dtype in enumerate(dtypes)])
+    if chunks:
+        values = [np.concatenate(parts) for parts in zip(*chunks)]
+    else:
+        values = [np.zeros(0, dtype=dtype) for dtype in dtypes]
+    # Urutan baris mengikuti urutan insert (rowid), sama dengan jalur pandas;
+    # diurutkan di numpy agar SQLite tidak perlu B-tree sementara.
+    order = np.argsort(values[0], kind='stable')
+    if not (order[1:] > order[:-1]).all():
+        values = [v[order] for v in values]
+    data = pd.DataFrame({
+        col: pd.Categorical.from_codes(v.astype('int8'), dtype=data_store.KONDISI_DTYPE)
+        if col == 'Roughness Condition' else v
+        for col, v in zip(columns, values[3:])
+    }).astype({col: data_store.SCHEMA[col] for col in columns})
+    data['Route'] = pd.Categorical.from_codes(values[1].astype('int32') - 1, categories=route_names)
+    data['Survey Date'] = values[2].astype('int64').astype('datetime64[D]').astype('datetime64[us]')
+    return data
+
+
+def get_filtered(db_path, kondisi=None, iri_range=None, routes=None, columns=None, survey=None):
+    """query() dengan cache LRU per (fingerprint database, filter, kolom), dibatasi MAX_ROWS baris"""
+    fingerprint, _ = database_info(db_path)
+    key = (fingerprint, None if kondisi is None else tuple(kondisi), iri_range,
+           None if routes is None else tuple(routes), None if columns is None else tuple(columns), survey)
+    return _results.get_or_build(key, lambda: query(db_path, kondisi, iri_range, routes, columns, MAX_ROWS,
+                                                    survey))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sources', nargs='+', help='CSV survei dan/atau direktori store ingest.py')
+    parser.add_argument('--db', default='road_network.sqlite')
+    parser.add_argument('--chunk-rows', type=int, default=ingest.CHUNK_ROWS)
+    args = parser.parse_args()
+
+    rows = build_database(args.sources, args.db, args.chunk_rows)
+    print(f"{args.db}: {rows} segmen dari {len(args.sources)} sumber")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import numpy as np
+
+import shared_cache
+from aggregates import sort_by_group
+
+
+METRIC_COLUMNS = [
+    'IRI (m/km)',
+    'Total Crack Area (%)',
+    'Average Crack Width (mm)',
+    'Number of Potholes (per km)',
+    'Average Rut Depth (cm)',
+    'Speed (km/h)',
+]
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Prioritas perbaikan = bucket np.digitize(IRI, PRIORITY_EDGES, right=True):
+# rendah 3 < IRI <= 5, menengah 5 < IRI <= 8, tinggi IRI > 8. Panjang dan
+# paket per prioritas dihitung di intervals.py.
+PRIORITY_EDGES = [3, 5, 8]
+PRIORITIES = ['rendah', 'menengah', 'tinggi']
+
+CACHE_SIZE = 32
+
+_summaries = shared_cache.SharedCache('summary', CACHE_SIZE)
+
+
+def _stats(sorted_values, total):
+    """count/sum/min/max/mean/kuantil dari nilai yang sudah terurut"""
+    n = len(sorted_values)
+    if n == 0:
+        return {'count': 0, 'sum': 0.0, 'min': np.nan, 'max': np.nan, 'mean': np.nan,
+                **{f'q{int(q * 100)}': np.nan for q in QUANTILES}}
+    positions = np.asarray(QUANTILES) * (n - 1)
+    lower = np.floor(positions).astype('int64')
+    upper = np.minimum(lower + 1, n - 1)
+    quantiles = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (positions - lower)
+    return {
+        'count': n,
+        'sum': float(total),
+        'min': float(sorted_values[0]),
+        'max': float(sorted_values[-1]),
+        'mean': float(total / n),
+        **{f'q{int(q * 100)}': float(v) for q, v in zip(QUANTILES, quantiles)},
+    }
+
+
+class Summary:
+    """Statistik ringkas per Roughness Condition dan keseluruhan.
+
+    Dihitung sekali per data terfilter: satu sort per kolom metrik memberi
+    min/max/kuantil untuk semua kondisi, jumlahan memakai bincount, dan
+    bucket prioritas IRI dihitung dari satu np.digitize.
+    """
+
+    def __init__(self, data, columns=METRIC_COLUMNS, by='Roughness Condition'):
+        categorical = data[by].astype('category')
+        codes = categorical.cat.codes.to_numpy().astype('int64')
+        self.conditions = list(categorical.cat.categories)
+        n_groups = len(self.conditions)
+
+        self.n = len(data)
+        counts = np.bincount(codes[codes >= 0], minlength=n_groups)
+        self.kondisi_counts = dict(zip(self.conditions, counts.tolist()))
+
+        start = data['Start Point (m)'].to_numpy()
+        end = data['End Point (m)'].to_numpy()
+        self.length_m = float(end.max() - start.min()) if self.n else 0.0
+
+        self.overall = {}
+        self.by_condition = {kondisi: {} for kondisi in self.conditions}
+        for column in columns:
+            values = data[column].to_numpy(dtype='float64')
+            valid = ~np.isnan(values)
+            values, column_codes = values[valid], codes[valid]
+            sorted_values, grouped, bounds = sort_by_group(values, column_codes, n_groups)
+            sums = np.bincount(column_codes[column_codes >= 0], weights=values[column_codes >= 0],
+                               minlength=n_groups)
+            self.overall[column] = _stats(sorted_values, values.sum())
+            for g, kondisi in enumerate(self.conditions):
+                self.by_condition[kondisi][column] = _stats(grouped[bounds[g]:bounds[g + 1]], sums[g])
+
+        iri = data['IRI (m/km)'].to_numpy(dtype='float64')
+        bucket = np.digitize(iri, PRIORITY_EDGES, right=True)
+        bucket[np.isnan(iri)] = 0
+        n_buckets = len(PRIORITY_EDGES) + 1
+        bucket_counts = np.bincount(bucket, minlength=n_buckets)
+        self.priority = {name: {'count': int(bucket_counts[b])} for b, name in enumerate(PRIORITIES, start=1)}
+
+    def kondisi_percent(self, kondisi):
+        return round(self.kondisi_counts.get(kondisi, 0) / self.n * 100, 2) if self.n else 0
+
+    @property
+    def repair_percent(self):
+        """Persentase segmen prioritas tinggi (IRI > 8)"""
+        return self.priority['tinggi']['count'] / self.n * 100 if self.n else 0.0
+
+
+def get_summary(key, data):
+    """Summary untuk data, di-cache per key (dataset + filter)"""
+    return _summaries.get_or_build(key, lambda: Summary(data))
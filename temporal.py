@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+import shared_cache
+
+
+# Kolom yang dibandingkan antar survei dan label pendeknya di tabel hasil.
+METRICS = {
+    'IRI (m/km)': 'IRI',
+    'Total Crack Area (%)': 'Retak',
+    'Number of Potholes (per km)': 'Lubang',
+    'Average Rut Depth (cm)': 'Alur',
+}
+# Segmen dua survei dipasangkan bila titik tengahnya berselisih paling jauh sejauh ini.
+DEFAULT_TOLERANCE_M = 50
+CACHE_SIZE = 16
+
+_cache = shared_cache.SharedCache('temporal', CACHE_SIZE)
+
+
+def survey_dates(data):
+    """Tanggal survei (ISO, terurut) yang ada di data; kosong bila data tidak punya Survey Date"""
+    if 'Survey Date' not in data:
+        return []
+    dates = np.unique(data['Survey Date'].dropna().to_numpy().astype('datetime64[D]'))
+    return [str(date) for date in dates]
+
+
+def _survey(data, date):
+    """Segmen satu survei, terurut menurut titik tengah (syarat merge_asof)"""
+    rows = np.flatnonzero(data['Survey Date'].to_numpy() == np.datetime64(date))
+    columns = [column for column in ['Route', 'Start Point (m)', 'End Point (m)', 'Roughness Condition']
+               if column in data] + list(METRICS)
+    survey = data.iloc[rows][columns]
+    start = survey['Start Point (m)'].to_numpy(dtype='float64')
+    end = survey['End Point (m)'].to_numpy(dtype='float64')
+    survey = survey.assign(Midpoint=(start + end) / 2)
+    return survey.sort_values('Midpoint', kind='stable', ignore_index=True)
+
+
+def compare_surveys(before, after, years, tolerance_m=DEFAULT_TOLERANCE_M):
+    """Pasangkan segmen survei akhir dengan segmen survei awal terdekat di chainage.
+
+    before/after adalah hasil _survey. Satu merge_asof (per Route bila ada)
+    mencari segmen awal dengan titik tengah terdekat dalam tolerance_m, jadi
+    O(n log n) tanpa membandingkan semua pasangan. Segmen tanpa pasangan
+    dibuang. Laju kerusakan = (akhir - awal) / years per tahun.
+    """
+    by = 'Route' if 'Route' in after and 'Route' in before else None
+    left = after.rename(columns={column: f'{label} Akhir' for column, label in METRICS.items()})
+    right = before[([by] if by else []) + ['Midpoint'] + list(METRICS)].rename(
+        columns={column: f'{label} Awal' for column, label in METRICS.items()})
+    if by:
+        # merge_asof butuh kategori yang sama di kedua sisi.
+        routes = pd.api.types.union_categoricals([left[by], right[by]]).categories
+        left[by] = left[by].cat.set_categories(routes)
+        right[by] = right[by].cat.set_categories(routes)
+    aligned = pd.merge_asof(left, right, on='Midpoint', by=by, direction='nearest',
+                            tolerance=float(tolerance_m))
+    aligned = aligned[aligned[f"{METRICS['IRI (m/km)']} Awal"].notna()].drop(columns='Midpoint')
+
+    columns = {}
+    for label in METRICS.values():
+        old = aligned[f'{label} Awal'].to_numpy(dtype='float64')
+        new = aligned[f'{label} Akhir'].to_numpy(dtype='float64')
+        columns[f'{label} Awal'] = old
+        columns[f'{label} Akhir'] = new
+        columns[f'Laju {label} (/tahun)'] = (new - old) / years
+    keys = [column for column in ['Route', 'Start Point (m)', 'End Point (m)', 'Roughness Condition']
+            if column in aligned]
+    return pd.concat([aligned[keys].reset_index(drop=True), pd.DataFrame(columns)], axis=1)
+
+
+def get_survey(key, data, date):
+    """_survey di-cache per key (dataset + filter) dan tanggal"""
+    return _cache.get_or_build(None if key is None else key + ('survei', date), lambda: _survey(data, date))
+
+
+def get_comparison(key, data, before_date, after_date, tolerance_m=DEFAULT_TOLERANCE_M):
+    """Perbandingan dua survei, di-cache per pasangan; survei terurut dipakai ulang antar pasangan"""
+    def build():
+        years = (pd.Timestamp(after_date) - pd.Timestamp(before_date)).days / 365.25
+        return compare_surveys(get_survey(key, data, before_date), get_survey(key, data, after_date),
+                               years, tolerance_m)
+    return _cache.get_or_build(None if key is None else key + ('banding', before_date, after_date, tolerance_m),
+                               build)